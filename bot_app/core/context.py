@@ -0,0 +1,101 @@
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from bot_app.core.metrics import metrics
+
+MISSING = object()   # kontekstda hali yuklanmagan
+
+
+class UpdateContext:
+    """
+    Bitta update davomida kerak bo'ladigan foydalanuvchi ma'lumotlari.
+
+    `UserMiddleware` uni yaratadi; `BotUserService.get/get_lang`,
+    `passenger_manager.get_passenger` avval shu yerdan o'qiydi — handler,
+    send_msg va edit_msg bir xil foydalanuvchini qayta-qayta keshdan olmaydi.
+    `RedisStateStorage` ham suhbat holatini shu update davomida shu yerda saqlaydi.
+    Oldingi manzillar ro'yxati ham bir update'da bir marta so'raladi.
+    """
+    __slots__ = ("tg_id", "user", "passenger", "locations", "states")
+
+    def __init__(self, tg_id: int, user=None):
+        self.tg_id = tg_id
+        self.user = user
+        self.passenger = MISSING   # yo'lovchi — birinchi murojaatda yuklanadi
+        self.locations = MISSING   # location API javobi (oldingi manzillar)
+        self.states = {}           # holat kaliti -> StateRecord yoki None (yo'q)
+
+    @property
+    def lang(self) -> Optional[str]:
+        return getattr(self.user, "language_code", None)
+
+
+_current: ContextVar[Optional[UpdateContext]] = ContextVar("update_context", default=None)
+
+
+def begin_update(tg_id: int, user=None) -> UpdateContext:
+    context = UpdateContext(tg_id, user)
+    _current.set(context)
+    return context
+
+
+def end_update():
+    _current.set(None)
+
+
+def current_update(tg_id: int) -> Optional[UpdateContext]:
+    """Joriy update shu foydalanuvchiga tegishli bo'lsa — uning konteksti."""
+    context = _current.get()
+    if context is not None and context.tg_id == tg_id:
+        metrics.incr("update_context.hits")
+        return context
+    return None
+
+
+def context_user(tg_id: int):
+    context = current_update(tg_id)
+    return context.user if context is not None else None
+
+
+def set_context_user(user):
+    context = _current.get()
+    if context is not None and context.tg_id == user.tg_id:
+        context.user = user
+
+
+def context_passenger(tg_id: int) -> Any:
+    """Yo'lovchi yozuvi yoki `MISSING` (kontekstda hali yuklanmagan)."""
+    context = current_update(tg_id)
+    return context.passenger if context is not None else MISSING
+
+
+def set_context_passenger(tg_id: int, passenger):
+    context = _current.get()
+    if context is not None and context.tg_id == tg_id:
+        context.passenger = passenger
+
+
+def context_locations(tg_id: int) -> Any:
+    """Oldingi manzillar (API javobi) yoki `MISSING`."""
+    context = current_update(tg_id)
+    return context.locations if context is not None else MISSING
+
+
+def set_context_locations(tg_id: int, locations):
+    context = _current.get()
+    if context is not None and context.tg_id == tg_id:
+        context.locations = locations
+
+
+def context_state(key: str) -> Any:
+    """Joriy update'da o'qilgan holat yozuvi, None (yo'q) yoki `MISSING`."""
+    context = _current.get()
+    if context is None:
+        return MISSING
+    return context.states.get(key, MISSING)
+
+
+def set_context_state(key: str, record):
+    context = _current.get()
+    if context is not None:
+        context.states[key] = record
@@ -0,0 +1,95 @@
+import logging
+import re
+from collections import OrderedDict
+from threading import Lock
+
+from django_redis import get_redis_connection
+
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Telegram update_id maydonini JSON boshida yuboradi — to'liq parse shart emas
+UPDATE_ID_RE = re.compile(rb'"update_id"\s*:\s*(\d+)')
+
+
+class UpdateDeduplicator:
+    """
+    Telegram qayta yuborgan (retry) update'larni aniqlaydi.
+
+    update_id'lar bloklarga bo'linadi, har bir blok — bitta Redis bitmap
+    (65536 ta update_id = 8 KB). SETBIT eski bitni qaytaradi, shuning uchun
+    "ko'rilganmi?" tekshiruvi bitta round-trip'da atomik va barcha gunicorn
+    worker'lari uchun umumiy. Har bir yozuvda TTL yangilanadi (sliding TTL).
+    """
+    PREFIX = "upd:seen:"
+    HITS_KEY = "upd:duplicates"
+    BLOCK_SIZE = 1 << 16
+    TTL = 60 * 60  # 1 soat — Telegram retry oynasidan ancha katta
+    LOCAL_SIZE = 10_000  # Redis ishlamay qolganda jarayon ichidagi zaxira
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._local = OrderedDict()
+        self._local_lock = Lock()
+
+    @staticmethod
+    def extract_update_id(body: bytes) -> int | None:
+        match = UPDATE_ID_RE.search(body, 0, 64) or UPDATE_ID_RE.search(body)
+        return int(match.group(1)) if match else None
+
+    def _key(self, update_id: int) -> str:
+        return f"{self.PREFIX}{update_id // self.BLOCK_SIZE}"
+
+    def seen(self, update_id: int) -> bool:
+        """update_id'ni belgilaydi. Avval ko'rilgan bo'lsa — True."""
+        try:
+            conn = get_redis_connection(self.alias)
+            key = self._key(update_id)
+            pipe = conn.pipeline(transaction=False)
+            pipe.setbit(key, update_id % self.BLOCK_SIZE, 1)
+            pipe.expire(key, self.TTL)
+            previous, _ = pipe.execute()
+            duplicate = bool(previous)
+            if duplicate:
+                conn.incr(self.HITS_KEY)
+        except Exception as e:
+            metrics.incr("dedupe.redis_errors")
+            logger.warning("Dedupe Redis xatosi, lokal zaxira ishlatiladi: %s", e)
+            duplicate = self._seen_local(update_id)
+
+        if duplicate:
+            metrics.incr("dedupe.hits")
+        return duplicate
+
+    def forget(self, update_id: int):
+        """
+        Belgini olib tashlaydi — update qabul qilinmagan bo'lsa (503/500),
+        Telegram'ning keyingi urinishi dublikat deb tashlanmasligi uchun.
+        """
+        with self._local_lock:
+            self._local.pop(update_id, None)
+        try:
+            get_redis_connection(self.alias).setbit(self._key(update_id), update_id % self.BLOCK_SIZE, 0)
+        except Exception as e:
+            logger.warning("Dedupe forget xatosi: %s", e)
+
+    def total_hits(self) -> int:
+        """Barcha worker'lar bo'yicha dublikatlar soni."""
+        try:
+            return int(get_redis_connection(self.alias).get(self.HITS_KEY) or 0)
+        except Exception:
+            return metrics.counter("dedupe.hits")
+
+    def _seen_local(self, update_id: int) -> bool:
+        with self._local_lock:
+            if update_id in self._local:
+                return True
+            self._local[update_id] = True
+            if len(self._local) > self.LOCAL_SIZE:
+                self._local.popitem(last=False)
+            return False
+
+
+# Singleton instance
+deduplicator = UpdateDeduplicator()
@@ -0,0 +1,127 @@
+import logging
+import time
+from queue import Queue, Full
+from threading import Thread
+from typing import Callable
+
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BoundedExecutor:
+    """
+    Cheklangan navbatli worker pool.
+
+    - Navbat to'lsa `submit` darhol False qaytaradi (backpressure), kutib qolmaydi.
+    - `shutdown` yangi vazifalarni qabul qilmaydi va navbatdagilarni oxirigacha bajaradi.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self._queue = Queue(maxsize=queue_size)
+        self._closed = False
+        self._threads = [
+            Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn: Callable, *args) -> bool:
+        """Vazifani navbatga qo'yadi. Navbat to'la yoki yopilgan bo'lsa — False."""
+        if self._closed:
+            metrics.incr(f"{self.name}.rejected")
+            return False
+
+        try:
+            self._queue.put_nowait((time.perf_counter(), fn, args))
+        except Full:
+            metrics.incr(f"{self.name}.rejected")
+            return False
+
+        metrics.incr(f"{self.name}.submitted")
+        return True
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+
+                enqueued_at, fn, args = item
+                started_at = time.perf_counter()
+                metrics.observe(f"{self.name}.wait", started_at - enqueued_at)
+                try:
+                    fn(*args)
+                except Exception as e:
+                    metrics.incr(f"{self.name}.failed")
+                    logger.exception("%s vazifasi xatosi: %s", self.name, e)
+                metrics.observe(f"{self.name}.run", time.perf_counter() - started_at)
+            finally:
+                self._queue.task_done()
+
+    def shutdown(self, timeout: float = 10.0) -> bool:
+        """
+        Navbatni bo'shatib (drain) worker'larni to'xtatadi.
+        Hammasi `timeout` ichida tugasa — True.
+        """
+        self._closed = True
+        deadline = time.monotonic() + timeout
+
+        for _ in self._threads:
+            try:
+                self._queue.put(_STOP, timeout=max(deadline - time.monotonic(), 0.001))
+            except Full:
+                break
+
+        for t in self._threads:
+            t.join(max(deadline - time.monotonic(), 0))
+
+        return not any(t.is_alive() for t in self._threads)
+
+
+class ShardedExecutor:
+    """
+    Kalit (odatda chat_id) bo'yicha shard'larga bo'lingan executor.
+
+    Har bir shard — bitta worker'li navbat: bitta chat vazifalari qat'iy
+    tartibda bajariladi, turli chatlar esa N ta worker'da parallel ishlaydi.
+    Har bir shard chuqurligi va kechikishi `metrics`ga yoziladi.
+    """
+
+    def __init__(self, name: str, shards: int, queue_size: int):
+        self.name = name
+        self._shards = [
+            BoundedExecutor(f"{name}.shard{i}", workers=1, queue_size=max(1, queue_size // shards))
+            for i in range(shards)
+        ]
+
+    def shard_for(self, key) -> int:
+        return hash(key) % len(self._shards)
+
+    def submit(self, key, fn: Callable, *args) -> bool:
+        index = self.shard_for(key)
+        shard = self._shards[index]
+        accepted = shard.submit(fn, *args)
+        metrics.gauge(f"{shard.name}.depth", shard.qsize())
+        return accepted
+
+    def qsize(self) -> int:
+        return sum(shard.qsize() for shard in self._shards)
+
+    def depths(self) -> list:
+        return [shard.qsize() for shard in self._shards]
+
+    def shutdown(self, timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        return all([
+            shard.shutdown(max(deadline - time.monotonic(), 0.001))
+            for shard in self._shards
+        ])
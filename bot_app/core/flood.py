@@ -0,0 +1,153 @@
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.exceptions import NoScriptError
+
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+# update turi -> (burst, sekundiga to'ldirish)
+FLOOD_LIMITS: Dict[str, Tuple[float, float]] = getattr(settings, "FLOOD_LIMITS", {
+    "message": (3, 1.0),
+    "callback_query": (5, 2.0),
+})
+LOCAL_SIZE = getattr(settings, "FLOOD_LOCAL_SIZE", 10_000)
+
+# KEYS[1] — bucket; ARGV: burst, sekundiga to'ldirish. Qaytaradi: {ruxsat 0/1, qolgan token}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class FloodLimiter:
+    """
+    Foydalanuvchi bo'yicha token bucket: `burst` ta ketma-ket update, keyin
+    sekundiga `rate` ta. Hisob Redis'da Lua skript bilan — bitta round-trip,
+    barcha gunicorn worker'lari uchun atomik.
+
+    Jarayon ichida har bir bucket'ning oxirgi ma'lum holati saqlanadi. Boshqa
+    worker'lar faqat token sarflashi mumkin, shuning uchun haqiqiy qoldiq
+    lokal nusxadan katta bo'lmaydi: lokal bucket bo'sh bo'lsa update Redis'ga
+    bormasdan rad etiladi. Redis ishlamasa — ruxsat beriladi (fail open).
+    """
+    PREFIX = "flood:"
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]] = None, alias: str = "default",
+                 local_size: int = LOCAL_SIZE):
+        self.limits = limits or FLOOD_LIMITS
+        self.alias = alias
+        self.local_size = local_size
+        self._local = OrderedDict()  # (kind, tg_id) -> (tokens, monotonic, ogohlantirilgan)
+        self._lock = Lock()
+        self._script = None
+
+    def allow(self, kind: str, tg_id: int) -> Tuple[bool, bool]:
+        """
+        (ruxsat, ogohlantirish) qaytaradi. `ogohlantirish=True` — bucket
+        bo'shagandan keyingi birinchi rad etish (foydalanuvchiga bir marta aytiladi).
+        """
+        if kind not in self.limits:
+            return True, False
+        rejected = self.precheck(kind, tg_id)
+        if rejected is not None:
+            return rejected
+        try:
+            result = self.script(keys=[self.key(kind, tg_id)], args=list(self.limits[kind]))
+        except Exception as e:
+            logger.warning("Flood limiter Redis xatosi: %s", e)
+            return True, False
+        return self.settle(kind, tg_id, result)
+
+    def precheck(self, kind: str, tg_id: int) -> Optional[Tuple[bool, bool]]:
+        """Lokal bucket bo'sh bo'lsa — Redis'siz rad etish natijasi, aks holda None."""
+        limit = self.limits.get(kind)
+        if limit is None:
+            return None
+        key = (kind, tg_id)
+        tokens, warned = self._local_state(key, *limit)
+        if tokens >= 1:
+            return None
+        metrics.incr("flood.local_rejects")
+        self._remember(key, tokens, True)
+        return False, not warned
+
+    def queue(self, pipe, kind: str, tg_id: int) -> bool:
+        """Tekshiruvni boshqa buyruqlar bilan bitta pipeline'ga qo'shadi (EVALSHA)."""
+        limit = self.limits.get(kind)
+        if limit is None:
+            return False
+        pipe.evalsha(self.script.sha, 1, self.key(kind, tg_id), *limit)
+        return True
+
+    def settle(self, kind: str, tg_id: int, result) -> Tuple[bool, bool]:
+        """Skript natijasini (yoki pipeline'dagi xatoni) qayta ishlaydi."""
+        if isinstance(result, NoScriptError):
+            # Redis qayta ishga tushgan — skript yana yuklanadi (bir martalik qo'shimcha round-trip)
+            return self.allow(kind, tg_id)
+        if isinstance(result, Exception):
+            logger.warning("Flood limiter Redis xatosi: %s", result)
+            return True, False
+
+        key = (kind, tg_id)
+        warned = self._local_state(key, *self.limits[kind])[1]
+        allowed, tokens = result
+        if allowed:
+            self._remember(key, float(tokens), False)
+            return True, False
+        metrics.incr("flood.rejects")
+        self._remember(key, float(tokens), True)
+        return False, not warned
+
+    def key(self, kind: str, tg_id: int) -> str:
+        return f"{self.PREFIX}{kind}:{tg_id}"
+
+    @property
+    def script(self):
+        if self._script is None:
+            self._script = get_redis_connection(self.alias).register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    # =====================================================
+    #                   LOCAL MIRROR
+    # =====================================================
+    def _local_state(self, key, capacity: float, rate: float) -> Tuple[float, bool]:
+        with self._lock:
+            state = self._local.get(key)
+        if state is None:
+            return capacity, False
+        tokens, since, warned = state
+        return min(capacity, tokens + (time.monotonic() - since) * rate), warned
+
+    def _remember(self, key, tokens: float, warned: bool):
+        now = time.monotonic()
+        with self._lock:
+            self._local[key] = (tokens, now, warned)
+            self._local.move_to_end(key)
+            if len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+
+# Singleton instance
+flood_limiter = FloodLimiter()
@@ -0,0 +1,89 @@
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+
+from bot_app.core.metrics import metrics
+
+# ================= GLOBAL SETTINGS ================= #
+POOL_SIZE = getattr(settings, "TELEGRAM_HTTP_POOL_SIZE", 32)        # api.telegram.org'ga ochiq ulanishlar
+CONNECT_TIMEOUT = getattr(settings, "TELEGRAM_CONNECT_TIMEOUT", 3.05)
+READ_TIMEOUT = getattr(settings, "TELEGRAM_READ_TIMEOUT", 10)
+
+# Fayl yuklovchi metodlarga uzunroq read timeout
+METHOD_READ_TIMEOUTS = {
+    "sendPhoto": 30,
+    "sendDocument": 60,
+    "sendVideo": 60,
+}
+
+
+class TelegramHTTP:
+    """
+    Telegram Bot API uchun umumiy (barcha thread'lar uchun bitta) keep-alive session.
+
+    telebot standart holatda har bir thread uchun alohida session ochadi va
+    uni har 10 daqiqada yangilaydi — shard/worker thread'lar soniga teng TLS
+    handshake va qayta-qayta ulanish. Bu yerda:
+
+    - bitta `HTTPAdapter` pool (`pool_maxsize=POOL_SIZE`, `pool_block=True`):
+      ulanishlar qayta ishlatiladi, ularning soni pool hajmidan oshmaydi;
+    - har bir chaqiruv uchun (connect, read) timeout, metod bo'yicha;
+    - `apihelper.CUSTOM_REQUEST_SENDER` sifatida ulanadi (`core/loader.py`).
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, name: str = "telegram.http"):
+        self.name = name
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # Qayta urinishlar dispatcher'da (429/backoff) — bu yerda faqat ulanish
+        self.adapter = HTTPAdapter(
+            pool_connections=2, pool_maxsize=self.pool_size, pool_block=True, max_retries=0
+        )
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def timeout_for(self, url: str):
+        method_name = url.rsplit("/", 1)[-1]
+        return self.connect_timeout, METHOD_READ_TIMEOUTS.get(method_name, self.read_timeout)
+
+    def request(self, method, url, params=None, files=None, timeout=None, proxies=None):
+        """`apihelper.CUSTOM_REQUEST_SENDER` imzosi bilan mos."""
+        default = (apihelper.CONNECT_TIMEOUT, apihelper.READ_TIMEOUT)
+        if timeout is None or timeout == default:
+            # Chaqiruvchi `timeout=` bermagan (getUpdates long polling'dan tashqari)
+            timeout = self.timeout_for(url)
+
+        started_at = time.perf_counter()
+        try:
+            return self.session.request(
+                method, url, params=params, files=files, timeout=timeout, proxies=proxies
+            )
+        except requests.RequestException:
+            metrics.incr(f"{self.name}.errors")
+            raise
+        finally:
+            metrics.incr(f"{self.name}.requests")
+            metrics.observe(f"{self.name}.latency", time.perf_counter() - started_at)
+            metrics.gauge(f"{self.name}.connections", self.connections())
+
+    def connections(self) -> int:
+        """Shu paytgacha ochilgan ulanishlar (= TLS handshake'lar) soni."""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def close(self):
+        self.session.close()
+
+
+# Singleton instance
+telegram_http = TelegramHTTP()
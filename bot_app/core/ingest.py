@@ -0,0 +1,102 @@
+import atexit
+import json
+import logging
+from contextvars import Context
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.db import close_old_connections
+from telebot.types import Update
+
+from bot_app.core.executor import ShardedExecutor
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+WORKER_COUNT = getattr(settings, "WEBHOOK_WORKERS", 8)  # shard'lar soni
+MAX_QUEUE_SIZE = getattr(settings, "WEBHOOK_QUEUE_SIZE", 1_000)
+DRAIN_TIMEOUT = getattr(settings, "WEBHOOK_DRAIN_TIMEOUT", 25)
+
+
+def process_update(payload: Dict):
+    """Update'ni bot handler'lari orqali qayta ishlaydi (worker thread ichida)."""
+    from bot_app.core.loader import bot
+
+    bot.process_new_updates([Update.de_json(payload)])
+
+
+def routing_key(payload: Dict):
+    """
+    Update qaysi chatga tegishli ekanini aniqlaydi.
+    Bir chat update'lari bitta shard'ga tushadi va tartib bilan bajariladi.
+    """
+    for field in ("message", "edited_message", "my_chat_member", "chat_member"):
+        chat = (payload.get(field) or {}).get("chat")
+        if chat:
+            return chat.get("id")
+
+    callback = payload.get("callback_query")
+    if callback:
+        chat = (callback.get("message") or {}).get("chat")
+        return chat.get("id") if chat else callback.get("from", {}).get("id")
+
+    return payload["update_id"]
+
+
+class UpdateIngestor:
+    """
+    Webhook update'larini qabul qilib, fon worker'larga topshiradi.
+
+    View faqat JSON'ni tekshiradi va navbatga qo'yadi — handler zanjiri
+    (Nominatim, RideMain API) gunicorn worker'ini band qilmaydi.
+    Update'lar chat_id bo'yicha shard'larga bo'linadi: bitta chat ichida
+    tartib saqlanadi, turli chatlar parallel ishlaydi.
+    """
+
+    def __init__(
+            self,
+            process: Callable[[Dict], None] = process_update,
+            workers: int = WORKER_COUNT,
+            queue_size: int = MAX_QUEUE_SIZE,
+            name: str = "webhook"
+    ):
+        self.process = process
+        self.name = name
+        self.executor = ShardedExecutor(name, shards=workers, queue_size=queue_size)
+
+    @staticmethod
+    def parse(body: bytes) -> Dict:
+        """Update JSON'ini tekshiradi. Noto'g'ri bo'lsa — ValueError."""
+        payload = json.loads(body)
+        if not isinstance(payload, dict) or not isinstance(payload.get("update_id"), int):
+            raise ValueError("update_id topilmadi")
+        return payload
+
+    def accept(self, body: bytes) -> bool:
+        """
+        Update'ni navbatga qo'yadi.
+        False — navbat to'la (Telegram keyinroq qayta yuboradi).
+        """
+        payload = self.parse(body)
+        accepted = self.executor.submit(routing_key(payload), self._handle, payload)
+        metrics.gauge(f"{self.name}.queue_depth", self.executor.qsize())
+        return accepted
+
+    def _handle(self, payload: Dict):
+        try:
+            # Har bir update toza kontekstda — oldingi update'ning UpdateContext'i qolmaydi
+            Context().run(self.process, payload)
+        finally:
+            close_old_connections()
+
+    def shutdown(self, timeout: float = DRAIN_TIMEOUT) -> bool:
+        drained = self.executor.shutdown(timeout)
+        if not drained:
+            logger.warning("%s: navbat %s soniyada bo'shamadi", self.name, timeout)
+        return drained
+
+
+# Singleton instance
+ingestor = UpdateIngestor()
+atexit.register(ingestor.shutdown)
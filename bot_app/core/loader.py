@@ -1,9 +1,16 @@
-from telebot import TeleBot, StateMemoryStorage, custom_filters
+from telebot import TeleBot, apihelper, custom_filters
 from telebot.types import BotCommand
 
 from django.conf import settings
 
-state_storage = StateMemoryStorage()
+from bot_app.core.http import telegram_http
+from bot_app.core.state_storage import build_state_storage
+
+# Barcha Bot API so'rovlari bitta keep-alive pool orqali
+apihelper.CUSTOM_REQUEST_SENDER = telegram_http.request
+
+# Suhbat holatlari barcha worker'lar uchun umumiy (Redis)
+state_storage = build_state_storage()
 
 bot = TeleBot(
     settings.PASSENGER_BOT_TOKEN,
@@ -15,9 +22,10 @@ bot = TeleBot(
 
 bot.add_custom_filter(custom_filters.StateFilter(bot))
 
-from telebot.states.sync.middleware import StateMiddleware
+from bot_app.middlewares.state_middleware import UnitOfWorkStateMiddleware
 
-bot.setup_middleware(StateMiddleware(bot))
+# Holat update boshida bir marta o'qiladi, oxirida bir marta yoziladi
+bot.setup_middleware(UnitOfWorkStateMiddleware(bot))
 
 bot.set_my_commands(commands=[
     BotCommand("start", "🚀 Перезапуск"),
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+
+def percentiles(samples: Iterable[float], qs=(50, 95, 99)) -> Dict[str, float]:
+    """
+    Namuna (sekundlarda) bo'yicha p50/p95/p99 qiymatlarini millisekundda qaytaradi.
+    """
+    data = sorted(samples)
+    if not data:
+        return {f"p{q}": 0.0 for q in qs}
+
+    result = {}
+    for q in qs:
+        index = min(len(data) - 1, int(round(q / 100 * (len(data) - 1))))
+        result[f"p{q}"] = round(data[index] * 1000, 3)
+    return result
+
+
+class Metrics:
+    """
+    Jarayon (process) ichidagi yengil metrikalar:
+    hisoblagichlar (counter), joriy qiymatlar (gauge) va kechikishlar (timing).
+    """
+    RESERVOIR_SIZE = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._gauges = {}
+        self._timings = defaultdict(lambda: deque(maxlen=self.RESERVOIR_SIZE))
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Barcha metrikalarni JSON'ga tayyor ko'rinishda qaytaradi."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timings = {name: list(values) for name, values in self._timings.items()}
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "timings_ms": {
+                name: {"count": len(values), **percentiles(values)}
+                for name, values in timings.items()
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+# Singleton instance
+metrics = Metrics()
@@ -0,0 +1,108 @@
+import logging
+
+from django_redis import get_redis_connection
+
+from bot_app.core.context import MISSING
+from bot_app.core.flood import flood_limiter
+from bot_app.core.metrics import metrics
+from bot_app.repo.user_cache import user_cache
+from bot_app.services.passenger_manager import passenger_manager
+from msg_app.catalogue import catalogue
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetched:
+    """Bitta update uchun oldindan o'qilgan ma'lumotlar."""
+    __slots__ = ("allowed", "warn", "user", "passenger", "state")
+
+    def __init__(self):
+        self.allowed = True
+        self.warn = False
+        self.user = None            # CachedUser yoki None (kesh miss)
+        self.passenger = MISSING    # yo'lovchi keshi yoki MISSING
+        self.state = MISSING        # suhbat holatining xom qiymati (None — holat yo'q)
+
+
+class UpdatePrefetcher:
+    """
+    Update boshida kerak bo'ladigan Redis kalitlarini bitta pipeline'da o'qiydi:
+    flood bucket (EVALSHA), `tguser:` yozuvi (lokal LRU'da bo'lmasa),
+    yo'lovchi keshi, suhbat holati (Redis storage'da bo'lsa) va — tekshiruv
+    vaqti kelgan bo'lsa — katalog versiyasi.
+
+    Alohida-alohida so'rovlarda bu 3-4 round-trip edi. Lokal flood bucket
+    bo'sh bo'lsa Redis'ga umuman bormaydi. Pipeline xato bersa — bo'sh natija
+    qaytadi, har bir komponent keyin o'zi o'qiydi (fail open).
+    """
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+
+    def fetch(self, kind: str, tg_id: int, state_key: str = None) -> Prefetched:
+        result = Prefetched()
+        rejected = flood_limiter.precheck(kind, tg_id)
+        if rejected is not None:
+            result.allowed, result.warn = rejected
+            return result
+
+        result.user = user_cache.get_local(tg_id)
+        steps = []
+        try:
+            pipe = get_redis_connection(self.alias).pipeline(transaction=False)
+            if flood_limiter.queue(pipe, kind, tg_id):
+                steps.append(self._flood)
+            if result.user is None:
+                pipe.get(user_cache.key(tg_id))
+                steps.append(self._user)
+            pipe.get(passenger_manager.cache_key(tg_id))
+            steps.append(self._passenger)
+            if state_key is not None:
+                pipe.get(state_key)
+                steps.append(self._state)
+            if catalogue.due():
+                pipe.get(catalogue.VERSION_KEY)
+                steps.append(self._catalogue)
+            values = pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.warning("Update prefetch bajarilmadi: %s", e)
+            return result
+
+        metrics.incr("prefetch.roundtrips")
+        metrics.incr("prefetch.keys", len(steps))
+        for step, value in zip(steps, values):
+            step(result, kind, tg_id, value)
+        return result
+
+    # =====================================================
+    #                   STEPS
+    # =====================================================
+    @staticmethod
+    def _flood(result: Prefetched, kind: str, tg_id: int, value):
+        result.allowed, result.warn = flood_limiter.settle(kind, tg_id, value)
+
+    @staticmethod
+    def _user(result: Prefetched, kind: str, tg_id: int, value):
+        if not isinstance(value, Exception):
+            result.user = user_cache.accept(tg_id, value)
+
+    @staticmethod
+    def _passenger(result: Prefetched, kind: str, tg_id: int, value):
+        if value is not None and not isinstance(value, Exception):
+            passenger = passenger_manager.accept(value)
+            if passenger:
+                result.passenger = passenger
+
+    @staticmethod
+    def _state(result: Prefetched, kind: str, tg_id: int, value):
+        if not isinstance(value, Exception):
+            result.state = value
+
+    @staticmethod
+    def _catalogue(result: Prefetched, kind: str, tg_id: int, value):
+        if not isinstance(value, Exception):
+            catalogue.observe(value)
+
+
+# Singleton instance
+prefetcher = UpdatePrefetcher()
@@ -0,0 +1,227 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from telebot import StateMemoryStorage
+from telebot.states import resolve_context
+from telebot.storage.base_storage import StateDataContext, StateStorageBase
+
+from bot_app.core.context import MISSING, context_state, set_context_state
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+STATE_TTL = getattr(settings, "STATE_TTL", 60 * 60 * 24)  # sekund, oxirgi yozuvdan keyin
+FORMAT = 1
+
+# KEYS[1] — holat; ARGV: kutilgan rev, yangi qiymat ('' — o'chirish), TTL.
+# Rev mos kelmasa yozmaydi va joriy qiymatni qaytaradi: {1} yoki {0, joriy}
+COMPARE_AND_SET_LUA = """
+local current = redis.call('GET', KEYS[1])
+local rev = 0
+if current then
+    rev = tonumber(string.match(current, '^%[%d+,(%d+),')) or -1
+end
+if rev ~= tonumber(ARGV[1]) then
+    return {0, current or false}
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+end
+return {1}
+"""
+
+
+class StateRecord:
+    """
+    Bitta suhbat holati: holat nomi, ma'lumotlar va yozuv versiyasi (`rev`).
+    Redis'da ixcham JSON: `[format, rev, state, data]`.
+    """
+    __slots__ = ("state", "data", "rev")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], rev: int = 0):
+        self.state = state
+        self.data = data
+        self.rev = rev
+
+    def encode(self) -> bytes:
+        return json.dumps(
+            [FORMAT, self.rev, self.state, self.data], ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    @classmethod
+    def decode(cls, raw: Optional[bytes]) -> Optional["StateRecord"]:
+        """Noma'lum format yoki buzilgan yozuv — None (holat yo'q kabi)."""
+        if not raw:
+            return None
+        try:
+            version, rev, state, data = json.loads(raw)
+        except (ValueError, TypeError):
+            return None
+        if version != FORMAT:
+            return None
+        return cls(state, data, rev)
+
+
+class RedisStateStorage(StateStorageBase):
+    """
+    telebot holatlari uchun umumiy Redis storage — `StateMemoryStorage` o'rniga.
+
+    Har bir suhbat alohida kalit (`state:<bot_id>:<chat_id>:<user_id>`) va
+    o'z TTL'i bilan: tugallanmagan suhbatlar `STATE_TTL` dan keyin o'chadi.
+    Worker'lar bir xil holatni ko'radi.
+
+    O'qilgan yozuv joriy update kontekstida saqlanadi (read-through): bitta
+    update davomida holat Redis'dan ko'pi bilan bir marta o'qiladi, prefetch
+    esa uni UserMiddleware pipeline'ida oldindan yuklaydi. Update'lar orasida
+    jarayon ichida saqlanmaydi — keyingi update boshqa worker'da o'zgargan
+    holatni ko'rishi kerak.
+    """
+
+    def __init__(self, prefix: str = "state", separator: str = ":", ttl: int = STATE_TTL,
+                 alias: str = "default"):
+        super().__init__()
+        self.prefix = prefix
+        self.separator = separator
+        self.ttl = ttl
+        self.alias = alias
+        self._cas = None
+
+    @property
+    def conn(self):
+        return get_redis_connection(self.alias)
+
+    def key(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+            message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> str:
+        return self._get_key(
+            chat_id, user_id, self.prefix, self.separator, business_connection_id, message_thread_id, bot_id
+        )
+
+    def key_for(self, update, bot_id: int) -> Optional[str]:
+        """Update uchun holat kaliti — StateFilter/StateContext ishlatadigan bilan bir xil."""
+        chat_id, user_id, business_connection_id, bot_id, message_thread_id = resolve_context(update, bot_id)
+        if user_id is None:
+            return None
+        return self.key(chat_id if chat_id is not None else user_id, user_id,
+                        business_connection_id, message_thread_id, bot_id)
+
+    def accept(self, key: str, raw: Optional[bytes]):
+        """Boshqa joyda (prefetch pipeline'ida) o'qilgan qiymatni update kontekstiga qo'yadi."""
+        set_context_state(key, StateRecord.decode(raw))
+
+    def load(self, key: str) -> Optional[StateRecord]:
+        return self._load(key)
+
+    def compare_and_set(self, key: str, expected_rev: int,
+                        record: Optional[StateRecord]) -> Tuple[bool, Optional[StateRecord]]:
+        """
+        Yozuvni faqat Redis'dagi rev `expected_rev` bo'lsa yozadi (None — o'chiradi).
+        (muvaffaqiyat, joriy yozuv) qaytaradi; muvaffaqiyatsizlikda joriy yozuv — merge uchun.
+        """
+        if self._cas is None:
+            self._cas = self.conn.register_script(COMPARE_AND_SET_LUA)
+        result = self._cas(keys=[key], args=[expected_rev, record.encode() if record else b"", self.ttl])
+        if result[0]:
+            set_context_state(key, record)
+            return True, record
+        current = StateRecord.decode(result[1] if len(result) > 1 else None)
+        set_context_state(key, current)
+        return False, current
+
+    # =====================================================
+    #                   StateStorageBase
+    # =====================================================
+    def set_state(self, chat_id: int, user_id: int, state: Union[str, Any],
+                  business_connection_id: Optional[str] = None, message_thread_id: Optional[int] = None,
+                  bot_id: Optional[int] = None) -> bool:
+        if hasattr(state, "name"):
+            state = state.name
+        key = self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id)
+        record = self._load(key)
+        self._store(key, StateRecord(state, record.data if record else {}, record.rev if record else 0))
+        return True
+
+    def get_state(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+                  message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> Optional[str]:
+        record = self._load(self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id))
+        return record.state if record else None
+
+    def delete_state(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+                     message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> bool:
+        key = self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id)
+        deleted = self.conn.delete(key)
+        set_context_state(key, None)
+        return bool(deleted)
+
+    def set_data(self, chat_id: int, user_id: int, key: str, value: Any,
+                 business_connection_id: Optional[str] = None, message_thread_id: Optional[int] = None,
+                 bot_id: Optional[int] = None) -> bool:
+        state_key = self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id)
+        record = self._load(state_key)
+        if record is None:
+            raise RuntimeError(f"RedisStateStorage: key {state_key} does not exist.")
+        self._store(state_key, StateRecord(record.state, {**record.data, key: value}, record.rev))
+        return True
+
+    def get_data(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+                 message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> dict:
+        record = self._load(self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id))
+        return record.data if record else {}
+
+    def reset_data(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+                   message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> bool:
+        key = self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id)
+        record = self._load(key)
+        if record is None:
+            return False
+        self._store(key, StateRecord(record.state, {}, record.rev))
+        return True
+
+    def get_interactive_data(self, chat_id: int, user_id: int, business_connection_id: Optional[str] = None,
+                             message_thread_id: Optional[int] = None,
+                             bot_id: Optional[int] = None) -> StateDataContext:
+        return StateDataContext(
+            self, chat_id=chat_id, user_id=user_id, business_connection_id=business_connection_id,
+            message_thread_id=message_thread_id, bot_id=bot_id,
+        )
+
+    def save(self, chat_id: int, user_id: int, data: dict, business_connection_id: Optional[str] = None,
+             message_thread_id: Optional[int] = None, bot_id: Optional[int] = None) -> bool:
+        key = self.key(chat_id, user_id, business_connection_id, message_thread_id, bot_id)
+        record = self._load(key)
+        if record is None:
+            return False
+        self._store(key, StateRecord(record.state, data, record.rev))
+        return True
+
+    # =====================================================
+    #                   INTERNALS
+    # =====================================================
+    def _load(self, key: str) -> Optional[StateRecord]:
+        record = context_state(key)
+        if record is not MISSING:
+            metrics.incr("state.context.hits")
+            return record
+        metrics.incr("state.redis.reads")
+        record = StateRecord.decode(self.conn.get(key))
+        set_context_state(key, record)
+        return record
+
+    def _store(self, key: str, record: StateRecord):
+        record.rev += 1
+        self.conn.set(key, record.encode(), ex=self.ttl)
+        set_context_state(key, record)
+
+    def __str__(self) -> str:
+        return f"<RedisStateStorage: {self.prefix}>"
+
+
+def build_state_storage() -> StateStorageBase:
+    if getattr(settings, "STATE_STORAGE", "redis") == "redis":
+        return RedisStateStorage()
+    return StateMemoryStorage()
@@ -0,0 +1,161 @@
+import copy
+import logging
+from typing import Any, Dict, Optional, Union
+
+from telebot.states import State
+from telebot.states.sync.context import StateContext
+
+from bot_app.core.metrics import metrics
+from bot_app.core.state_storage import RedisStateStorage, StateRecord
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+MAX_COMMIT_ATTEMPTS = 3
+_DELETED = object()   # data kaliti o'chirilgan
+
+
+class StateUnit(StateContext):
+    """
+    Bitta update uchun suhbat holatining unit-of-work'i (`StateContext` o'rnida).
+
+    Holat birinchi murojaatda bir marta yuklanadi (odatda prefetch'dan —
+    Redis'ga bormaydi); `set`, `add_data`, `data()`, `reset_data`, `delete`
+    faqat xotiradagi nusxani o'zgartiradi va nima o'zgarganini yozib boradi.
+    Update oxirida `commit` o'zgarishlarni bitta CAS (rev bo'yicha) bilan yozadi.
+    Boshqa worker shu orada yozgan bo'lsa — yangi yozuv ustiga faqat bizning
+    o'zgargan maydonlarimiz qo'yiladi va qayta urinib ko'riladi.
+    """
+
+    def __init__(self, message, bot):
+        super().__init__(message, bot)
+        self.storage: RedisStateStorage = bot.current_states
+        self.key = self.storage.key_for(message, self.bot_id)
+        self._loaded = False
+        self._base: Optional[StateRecord] = None      # yuklangan holat (rev — CAS uchun)
+        self._record: Optional[StateRecord] = None    # update davomidagi ishchi nusxa
+        self._state_dirty = False
+        self._cleared = False
+        self._deleted = False
+        self._changes: Dict[str, Any] = {}
+
+    # =====================================================
+    #                   StateContext API
+    # =====================================================
+    def set(self, state: Union[State, str]) -> bool:
+        if isinstance(state, State):
+            state = state.name
+        record = self._working()
+        if record is None:
+            record = self._record = StateRecord(None, {})
+        record.state = state
+        self._state_dirty = True
+        return True
+
+    def get(self) -> Optional[str]:
+        record = self._working()
+        return record.state if record else None
+
+    def delete(self) -> bool:
+        existed = self._working() is not None
+        self._record = None
+        self._deleted = True
+        self._cleared = True
+        self._state_dirty = False
+        self._changes.clear()
+        return existed
+
+    def reset_data(self) -> bool:
+        record = self._working()
+        if record is None:
+            return False
+        record.data = {}
+        self._cleared = True
+        self._changes.clear()
+        return True
+
+    def data(self) -> "_DataScope":
+        return _DataScope(self)
+
+    def add_data(self, **kwargs) -> None:
+        record = self._working()
+        if record is None:
+            raise RuntimeError(f"StateUnit: key {self.key} does not exist.")
+        record.data.update(kwargs)
+        self._changes.update(kwargs)
+
+    # =====================================================
+    #                   COMMIT
+    # =====================================================
+    @property
+    def dirty(self) -> bool:
+        return self._state_dirty or self._cleared or self._deleted or bool(self._changes)
+
+    def commit(self) -> bool:
+        """O'zgarishlarni bitta CAS bilan yozadi. Yozish kerak bo'lmasa — Redis'ga bormaydi."""
+        if not self.dirty:
+            return True
+        base = self._base
+        for _attempt in range(MAX_COMMIT_ATTEMPTS):
+            record = self._merge(base)
+            if record is None and base is None:
+                return True   # yozadigan narsa yo'q (allaqachon o'chirilgan)
+            ok, current = self.storage.compare_and_set(self.key, base.rev if base else 0, record)
+            if ok:
+                metrics.incr("state.commits")
+                return True
+            metrics.incr("state.conflicts")
+            base = current
+        logger.error("Holat yozilmadi (%s): %s marta parallel yozuv bilan to'qnashdi", self.key, MAX_COMMIT_ATTEMPTS)
+        metrics.incr("state.commit_failures")
+        return False
+
+    def _merge(self, base: Optional[StateRecord]) -> Optional[StateRecord]:
+        """Bizning o'zgarishlarimiz `base` (Redis'dagi joriy yozuv) ustiga."""
+        if self._record is None:
+            return None   # o'chirilgan
+        if base is None and not self._state_dirty:
+            return None   # boshqa worker o'chirgan — faqat data o'zgarishi uni tiriltirmaydi
+        data = {} if (self._cleared or base is None) else dict(base.data)
+        for key, value in self._changes.items():
+            if value is _DELETED:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        state = self._record.state if self._state_dirty else base.state
+        return StateRecord(state, data, (base.rev if base else 0) + 1)
+
+    # =====================================================
+    #                   INTERNALS
+    # =====================================================
+    def _working(self) -> Optional[StateRecord]:
+        if not self._loaded:
+            self._base = self.storage.load(self.key)
+            if self._base is not None:
+                self._record = StateRecord(self._base.state, copy.deepcopy(self._base.data), self._base.rev)
+            self._loaded = True
+        return self._record
+
+
+class _DataScope:
+    """`with state.data() as data:` — blok oxirida o'zgargan kalitlar qayd etiladi."""
+
+    def __init__(self, unit: StateUnit):
+        self.unit = unit
+        self.record = unit._working()
+        self.before = copy.deepcopy(self.record.data) if self.record else {}
+
+    def __enter__(self) -> dict:
+        # Holat yo'q bo'lsa StateDataContext kabi: vaqtinchalik dict, saqlanmaydi
+        return self.record.data if self.record else {}
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.record is None or self.record is not self.unit._record:
+            return False
+        after = self.record.data
+        for key in self.before.keys() | after.keys():
+            if key not in after:
+                self.unit._changes[key] = _DELETED
+            elif key not in self.before or after[key] != self.before[key]:
+                self.unit._changes[key] = after[key]
+        return False
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+
+from telebot.types import JsonSerializable
+
+from bot_app.core.metrics import metrics
+from msg_app.catalogue import catalogue
+
+MAX_KEYBOARDS = 512
+
+
+class CachedMarkup(JsonSerializable):
+    """Tayyor (serialize qilingan) reply_markup — telebot `to_json`ni qayta hisoblamaydi."""
+    __slots__ = ("json",)
+
+    def __init__(self, json: str):
+        self.json = json
+
+    def to_json(self) -> str:
+        return self.json
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class KeyboardCache:
+    """
+    (builder, lang, layout) -> serialize qilingan markup, LRU bilan cheklangan.
+
+    Matnlar katalogdan olinadi, shuning uchun katalog versiyasi o'zgarsa
+    butun kesh tozalanadi.
+    """
+
+    def __init__(self, max_size: int = MAX_KEYBOARDS):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+
+    def get_or_build(self, builder, lang: str, layout) -> CachedMarkup:
+        version = catalogue.current().version
+        key = (builder.__name__, lang, _freeze(layout))
+
+        with self._lock:
+            if version != self._version:
+                self._items.clear()
+                self._version = version
+            markup = self._items.get(key)
+            if markup is not None:
+                self._items.move_to_end(key)
+                metrics.incr("keyboards.hits")
+                return markup
+
+        metrics.incr("keyboards.misses")
+        markup = CachedMarkup(builder(lang, layout).to_json())
+        with self._lock:
+            if version == self._version:
+                self._items[key] = markup
+                if len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return markup
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Singleton instance
+keyboard_cache = KeyboardCache()
+
+
+def cached_keyboard(builder):
+    """Klaviatura builder'ini keshlaydi. Asl builder — `builder.__wrapped__`."""
+
+    @wraps(builder)
+    def wrapper(lang: str, buttons) -> CachedMarkup:
+        return keyboard_cache.get_or_build(builder, lang, buttons)
+
+    return wrapper
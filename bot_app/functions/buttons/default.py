@@ -2,7 +2,10 @@ from telebot.types import ReplyKeyboardMarkup, KeyboardButton
 from typing import List
 from msg_app.models import BotMessage
 
+from bot_app.functions.buttons.cache import cached_keyboard
 
+
+@cached_keyboard
 def create_btn(lang: str, buttons: List[List[str]]) -> ReplyKeyboardMarkup:
     """
     keyboard yaratadi.
@@ -28,6 +31,7 @@ def create_btn(lang: str, buttons: List[List[str]]) -> ReplyKeyboardMarkup:
         markup.row(*row_buttons)
     return markup
 
+@cached_keyboard
 def request_contact_btn(lang: str, buttons: List[List[str]]) -> ReplyKeyboardMarkup:
     markup = ReplyKeyboardMarkup(resize_keyboard=True)
     text = BotMessage.get_txt(lang, "send_number")
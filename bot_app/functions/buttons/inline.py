@@ -2,7 +2,10 @@ from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List
 from msg_app.models import BotMessage
 
+from bot_app.functions.buttons.cache import cached_keyboard
 
+
+@cached_keyboard
 def create_inl(lang: str, buttons: List[List[str]]) -> InlineKeyboardMarkup:
     """
     Inline keyboard yaratadi.
@@ -29,6 +32,7 @@ def create_inl(lang: str, buttons: List[List[str]]) -> InlineKeyboardMarkup:
 
 
 
+@cached_keyboard
 def travel_control_inl(lang: str, buttons: List[str]) -> InlineKeyboardMarkup:
     """
     Safar sozlamalari uchun adaptive (moslashuvchan) inline klaviatura.
@@ -0,0 +1,675 @@
+import atexit
+import hashlib
+import logging
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import List, Optional
+
+import requests
+from django.conf import settings
+from django_redis import get_redis_connection
+from telebot.apihelper import ApiException, ApiTelegramException
+
+from bot_app.core.executor import ShardedExecutor
+from bot_app.core.metrics import metrics
+from bot_app.functions.message_tracker import message_tracker
+from bot_app.functions.outbound_store import build_store, consumer_name
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+SHARD_COUNT = getattr(settings, "OUTBOUND_SHARDS", 8)
+MAX_QUEUE_SIZE = getattr(settings, "OUTBOUND_QUEUE_SIZE", 3_000)
+GLOBAL_RATE = getattr(settings, "TELEGRAM_GLOBAL_RATE", 30)     # xabar/sekund, butun bot
+CHAT_RATE = getattr(settings, "TELEGRAM_CHAT_RATE", 1)          # xabar/sekund, bitta chat
+CHAT_BURST = getattr(settings, "TELEGRAM_CHAT_BURST", 3)        # chat uchun ketma-ket ruxsat
+MAX_RETRIES = getattr(settings, "OUTBOUND_MAX_RETRIES", 4)
+BACKOFF_BASE = 0.5   # sekund
+BACKOFF_CAP = 10.0   # sekund
+MAX_CHAT_BUCKETS = 10_000
+
+BUFFER_SIZE = 1_000       # store'ga yozilishini kutayotgan job'lar (xotirada)
+BATCH_SIZE = 100          # bitta pipeline'dagi XADD / XREADGROUP soni
+READ_BLOCK_MS = 1_000
+LEASE_MS = 30_000         # partition egaligi; egasi o'lsa shundan keyin boshqa worker oladi
+KEEPALIVE_INTERVAL = 5    # sekund: lease yangilash va partition'larni qayta taqsimlash
+SHUTDOWN_WRITE_ATTEMPTS = 3
+SPILL_TIMEOUT = 5         # sekund: buffer to'la va store ishlamasa handler thread shundan ortiq kutmaydi
+
+# KEYS[1] — bucket; ARGV: sig'im, sekundiga to'ldirish, pauza (sekund, 0 — token band qilish).
+# Virtual scheduling: token qarzga olinadi, qaytaradi — kutish kerak bo'lgan sekundlar
+RESERVE_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local pause = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if pause > 0 then
+    tokens = math.min(tokens, 0) - pause * rate
+else
+    tokens = tokens - 1
+    if tokens < 0 then
+        wait = -tokens / rate
+    end
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket (virtual scheduling): `reserve` tokenni band qiladi va
+    qancha kutish kerakligini qaytaradi. Thread-safe, band kutish (busy loop) yo'q.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float):
+        """429 retry_after: keyingi `seconds` davomida token berilmaydi."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class SharedTokenBucket:
+    """
+    `TokenBucket` bilan bir xil interfeys, lekin holat Redis'da (Lua skript,
+    bitta round-trip) — barcha gunicorn worker'lari bitta limitni bo'lishadi.
+    Redis ishlamasa jarayon ichidagi bucket bilan davom etadi.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float, alias: str = "default"):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self.alias = alias
+        self.fallback = TokenBucket(rate, capacity)
+        self._script = None
+
+    def reserve(self) -> float:
+        try:
+            return float(self._run(0))
+        except Exception as e:
+            logger.warning("Global rate limit Redis xatosi: %s", e)
+            metrics.incr("dispatcher.global_bucket_errors")
+            return self.fallback.reserve()
+
+    def pause(self, seconds: float):
+        """429 retry_after: barcha worker'lar `seconds` davomida yubormaydi."""
+        self.fallback.pause(seconds)
+        try:
+            self._run(seconds)
+        except Exception as e:
+            logger.warning("Global rate limit Redis xatosi: %s", e)
+
+    def _run(self, pause: float):
+        if self._script is None:
+            self._script = get_redis_connection(self.alias).register_script(RESERVE_LUA)
+        return self._script(keys=[self.key], args=[self.capacity, self.rate, pause])
+
+
+@dataclass
+class OutboundJob:
+    kind: str                       # send | edit | delete
+    chat_id: int
+    text: Optional[str] = None
+    message_id: Optional[int] = None
+    message_ids: Optional[List[int]] = None   # delete: bitta delete_messages so'rovi
+    recent: int = 0                 # delete: message_id'dan oldingi shuncha bot xabari ham (navbatda aniqlanadi)
+    reply_markup: Optional[str] = None
+    dedupe_key: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    entry_id: Optional[str] = None      # store'dagi yozuv id'si (ACK uchun)
+    redelivered: bool = False
+
+    def digest(self) -> str:
+        """Matn + markup izi: xabarning ko'rinishi o'zgarganini solishtirish uchun."""
+        payload = f"{self.text or ''}\0{self.reply_markup or ''}".encode()
+        return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+    def to_dict(self) -> dict:
+        """Store'ga yoziladigan maydonlar (ish vaqtidagi holatsiz)."""
+        data = asdict(self)
+        for key in ("attempts", "entry_id", "redelivered"):
+            data.pop(key)
+        return data
+
+
+def serialize_markup(markup) -> Optional[str]:
+    """Markup'ni navbatga qo'yishdan oldin JSON satrga aylantiradi."""
+    if markup is None or isinstance(markup, str):
+        return markup
+    return markup.to_json()
+
+
+class MessageDispatcher:
+    """
+    Telegram'ga chiquvchi barcha so'rovlar (send / edit / delete) uchun yagona dispatcher.
+
+    - job'lar doimiy navbatga (Redis Streams) batch bilan yoziladi — deploy yoki
+      worker o'lishida yo'qolmaydi; xotiradagi buffer to'lsa job tashlanmaydi:
+      buffer'dagi oldingi job'lar bilan birga, tartibda store'ga yoziladi;
+      store ishlamasa yozish qayta uriniladi (backpressure), navbatni aylanib
+      o'tib yuborilmaydi; handler thread esa ko'pi bilan `SPILL_TIMEOUT` kutadi,
+      keyin job tashlanadi (`submit` False, `dropped` metrikasi);
+    - navbat chat_id bo'yicha partition'larga bo'lingan, har bir partition'ni
+      bir vaqtda bitta worker o'qiydi (lease), u esa chat_id bo'yicha shard'larga
+      beradi: bitta chat ichida tartib barcha worker'lar bo'yicha saqlanadi;
+      worker'lar partition'larni teng bo'lishadi, o'lgan worker'ning
+      partition'lari (ACK'siz yozuvlari bilan) lease tugagach boshqasiga o'tadi;
+    - yuborilgach ACK + dedupe kaliti (at-least-once, qayta yetkazilgan job
+      ikkinchi marta yuborilmaydi); o'qib bo'lmagan yozuv ACK qilinib tashlanadi,
+      o'qish xatosidan keyin esa consumer avval o'zining ACK'siz yozuvlarini
+      qayta o'qiydi — o'qilgan, lekin ishga tushmagan job'lar qolib ketmaydi;
+    - global (~30/s, Redis'da — barcha worker'lar uchun bitta) va har bir chat
+      (~1/s; chat'ni faqat partition egasi yuboradi) uchun token bucket;
+    - 429 kelsa `retry_after` chat va global bucket'da hurmat qilinadi
+      (limit qaysi biriniki ekanini Telegram aytmaydi), tarmoq/5xx xatolarida
+      jitter'li exponential backoff bilan qayta urinadi;
+    - bitta (chat_id, message_id) uchun eskirgan tahrirlar tashlanadi — faqat
+      oxirgi holat yuboriladi; oxirgi yuborilgan matn/markup bilan bir xil
+      tahrir umuman yuborilmaydi (oxirgi ko'rinish izi Redis'da — qaysi worker
+      yuborgan bo'lsa ham);
+    - navbat chuqurligi, yuborish kechikishi va tashlab yuborilganlar `metrics`da.
+    """
+
+    def __init__(
+            self,
+            bot=None,
+            store=None,
+            shards: int = SHARD_COUNT,
+            queue_size: int = MAX_QUEUE_SIZE,
+            global_rate: float = GLOBAL_RATE,
+            chat_rate: float = CHAT_RATE,
+            chat_burst: float = CHAT_BURST,
+            max_retries: int = MAX_RETRIES,
+            name: str = "dispatcher"
+    ):
+        self._bot = bot
+        self.store = store or build_store()
+        self.name = name
+        self.max_retries = max_retries
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        if getattr(self.store, "shared", False):
+            self.global_bucket = SharedTokenBucket(f"outbound:rate:{name}", global_rate, global_rate)
+        else:
+            self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = OrderedDict()
+        self._chat_lock = Lock()
+        self._buffer = Queue(maxsize=BUFFER_SIZE)
+        self._write_lock = Lock()    # buffer'dan olish va store'ga yozish tartibini saqlaydi
+        self._consumer = consumer_name()
+        self._owned = set()          # o'qilayotgan partition'lar
+        self._releasing = set()      # endi o'qilmaydi, in-flight job'lar tugagach bo'shatiladi
+        self._inflight = {}          # partition -> shard'lardagi tugallanmagan job'lar
+        self._inflight_entries = set()   # shard'larga berilgan, hali tugamagan yozuv id'lari
+        self._inflight_lock = Lock()
+        self._reread = False         # o'qish xatosi bo'ldi — o'z ACK'siz yozuvlarini qayta o'qish
+        self._fair_share = self.store.partitions
+        self._renewed_at = 0.0
+        self._stopping = False
+        self._running = True
+        self.executor = ShardedExecutor(name, shards=shards, queue_size=queue_size)
+
+        self._threads = [
+            Thread(target=self._write_loop, name=f"{name}-writer", daemon=True),
+            Thread(target=self._read_loop, name=f"{name}-reader", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            from bot_app.core.loader import bot
+            self._bot = bot
+        return self._bot
+
+    # =====================================================
+    #                   PUBLIC API
+    # =====================================================
+    def send(self, chat_id: int, text: str, reply_markup=None) -> bool:
+        return self.submit(OutboundJob("send", chat_id, text=text, reply_markup=serialize_markup(reply_markup)))
+
+    def edit(self, chat_id: int, message_id: int, text: str, reply_markup=None) -> bool:
+        return self.submit(OutboundJob(
+            "edit", chat_id, text=text, message_id=message_id, reply_markup=serialize_markup(reply_markup)
+        ))
+
+    def delete(self, chat_id: int, message_id: int) -> bool:
+        return self.submit(OutboundJob("delete", chat_id, message_id=message_id))
+
+    def delete_recent(self, chat_id: int, message_id: int, count: int) -> bool:
+        """
+        `message_id` va undan oldingi `count` ta bot xabarini o'chiradi. Id'lar
+        job chat navbatiga yetganda `message_tracker`dan olinadi — oldinroq
+        navbatga qo'yilgan, hali yuborilmagan send'lar ham o'chiriladi.
+        """
+        if count <= 0:
+            return self.delete(chat_id, message_id)
+        return self.submit(OutboundJob("delete", chat_id, message_id=message_id, recent=count))
+
+    def delete_many(self, chat_id: int, message_ids: List[int]) -> bool:
+        if len(message_ids) == 1:
+            return self.delete(chat_id, message_ids[0])
+        return self.submit(OutboundJob("delete", chat_id, message_ids=list(message_ids)))
+
+    def submit(self, job: OutboundJob) -> bool:
+        """Job'ni navbatga qo'yadi; False — store `SPILL_TIMEOUT` ichida yozilmadi, job tashlandi."""
+        accepted = True
+        try:
+            self._buffer.put_nowait(job)
+        except Full:
+            # Buffer to'la — shu thread'da yozamiz: avval buffer'dagi oldingi
+            # job'lar, keyin bu job (chat ichidagi tartib buzilmasin)
+            metrics.incr(f"{self.name}.spilled")
+            deadline = time.monotonic() + SPILL_TIMEOUT
+            if self._write_lock.acquire(timeout=SPILL_TIMEOUT):
+                try:
+                    accepted = self._write(self._drain() + [job], deadline)
+                finally:
+                    self._write_lock.release()
+            else:
+                # Writer store'ni kutib turibdi — handler thread cheksiz bloklanmasin
+                metrics.incr(f"{self.name}.dropped")
+                logger.error("%s store %s s ichida bo'shamadi, %s job tashlandi", self.name, SPILL_TIMEOUT, job.kind)
+                accepted = False
+        metrics.gauge(f"{self.name}.buffer_depth", self._buffer.qsize())
+        return accepted
+
+    def shutdown(self, timeout: float = 10.0) -> bool:
+        """
+        Buffer'ni store'ga yozadi va olingan job'larni tugatadi. Hammasi tugasa
+        partition'lar darhol bo'shatiladi, aks holda ACK'siz qolganlarni lease
+        tugagach boshqa worker oladi.
+        """
+        self._stopping = True
+        with self._write_lock:
+            self._write(self._drain())
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=READ_BLOCK_MS / 1000 + 1)
+        drained = self.executor.shutdown(timeout)
+        if drained:
+            try:
+                for partition in self._owned | self._releasing:
+                    self.store.release(partition, self._consumer)
+                self.store.leave(self._consumer)
+            except Exception as e:
+                logger.warning("%s partition'lar bo'shatilmadi: %s", self.name, e)
+        return drained
+
+    # =====================================================
+    #                   STORE
+    # =====================================================
+    def _write(self, jobs: List[OutboundJob], deadline: Optional[float] = None) -> bool:
+        """
+        Job'larni tartibda store'ga yozadi; `_write_lock` ostida chaqiriladi.
+        Store ishlamasa qayta urinadi — navbatdagi oldingi job'larni aylanib
+        o'tib yuborish tartibni buzadi. Urinishlar `deadline` (monotonic;
+        handler thread'dan yozilganda) va shutdown'da cheklanadi.
+        """
+        for start in range(0, len(jobs), BATCH_SIZE):
+            batch = jobs[start:start + BATCH_SIZE]
+            attempt = 0
+            while True:
+                try:
+                    self.store.add_many([job.to_dict() for job in batch])
+                    metrics.incr(f"{self.name}.enqueued", len(batch))
+                    break
+                except Exception as e:
+                    attempt += 1
+                    metrics.incr(f"{self.name}.store_errors")
+                    expired = deadline is not None and time.monotonic() >= deadline
+                    if expired or (self._stopping and attempt >= SHUTDOWN_WRITE_ATTEMPTS):
+                        lost = len(jobs) - start
+                        metrics.incr(f"{self.name}.dropped", lost)
+                        logger.error("%s store ishlamayapti, %s job yozilmadi: %s", self.name, lost, e)
+                        return False
+                    logger.warning("%s store xatosi, qayta urinish: %s", self.name, e)
+                    pause = self._backoff(attempt)
+                    if deadline is not None:
+                        pause = min(pause, max(0.0, deadline - time.monotonic()))
+                    time.sleep(pause)
+        return True
+
+    def _drain(self) -> List[OutboundJob]:
+        batch = []
+        while True:
+            try:
+                batch.append(self._buffer.get_nowait())
+            except Empty:
+                return batch
+
+    def _write_loop(self):
+        while self._running:
+            # Lock buffer'dan olishdan oldin: olingan, lekin hali yozilmagan job'lar
+            # bor paytda boshqa thread keyingilarini oldinroq yoza olmaydi
+            with self._write_lock:
+                try:
+                    batch = [self._buffer.get(timeout=0.2)]
+                except Empty:
+                    continue
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        batch.append(self._buffer.get_nowait())
+                    except Empty:
+                        break
+                self._write(batch)
+
+    def _read_loop(self):
+        while self._running:
+            try:
+                self.store.ensure_groups()
+                break
+            except Exception as e:
+                logger.warning("%s consumer group xatosi: %s", self.name, e)
+                time.sleep(5)
+
+        while self._running:
+            try:
+                self._keepalive()
+                if not self._owned:
+                    time.sleep(READ_BLOCK_MS / 1000)
+                    continue
+                if self._reread:
+                    # Oldingi o'qish yozuvlarni olgan bo'lishi mumkin — yangilaridan oldin
+                    for partition in list(self._owned):
+                        self._reread_pending(partition)
+                    self._reread = False
+                entries = self.store.read(self._consumer, list(self._owned), BATCH_SIZE, READ_BLOCK_MS)
+                self._accept([(*entry, False) for entry in entries])
+            except Exception as e:
+                self._reread = True
+                metrics.incr(f"{self.name}.consumer_errors")
+                logger.warning("%s consumer xatosi: %s", self.name, e)
+                time.sleep(1)
+
+    # =====================================================
+    #                   PARTITIONS
+    # =====================================================
+    def _keepalive(self):
+        if time.monotonic() - self._renewed_at >= KEEPALIVE_INTERVAL:
+            self._renew()
+            self._rebalance()
+
+    def _renew(self):
+        """Tiriklik belgisi va lease'larni yangilaydi; boy berilgan partition'lar o'qilmaydi."""
+        self._renewed_at = time.monotonic()
+        live = self.store.heartbeat(self._consumer, LEASE_MS)
+        self._fair_share = math.ceil(self.store.partitions / max(live, 1))
+        held = self._owned | self._releasing
+        if held:
+            lost = held - self.store.renew(held, self._consumer, LEASE_MS)
+            if lost:
+                # Lease muddatida yangilanmagan (jarayon qotib qolgan) — endi boshqa worker'niki
+                metrics.incr(f"{self.name}.partitions_lost", len(lost))
+                logger.warning("%s partition'lar boy berildi: %s", self.name, sorted(lost))
+                self._owned -= lost
+                self._releasing -= lost
+
+    def _rebalance(self):
+        """Ulushdan ortiq partition'larni bo'shatadi, yetmaganini bo'sh partition'lardan oladi."""
+        while len(self._owned) > self._fair_share:
+            self._releasing.add(self._owned.pop())
+        for partition in list(self._releasing):
+            with self._inflight_lock:
+                busy = self._inflight.get(partition, 0)
+            if not busy:
+                # Hamma job'i tugagan — yangi egasi tartibni davom ettiradi
+                self.store.release(partition, self._consumer)
+                self._releasing.discard(partition)
+
+        candidates = [p for p in range(self.store.partitions) if p not in self._owned and p not in self._releasing]
+        random.shuffle(candidates)
+        for partition in candidates:
+            if len(self._owned) >= self._fair_share:
+                break
+            if self.store.acquire(partition, self._consumer, LEASE_MS):
+                self._recover(partition)
+                self._owned.add(partition)
+        metrics.gauge(f"{self.name}.partitions_owned", len(self._owned))
+
+    def _recover(self, partition: int):
+        """Oldingi egasi ACK qilmagan yozuvlar — yangilaridan oldin, id tartibida."""
+        start_id = "0-0"
+        while True:
+            start_id, entries = self.store.claim_pending(partition, self._consumer, BATCH_SIZE, start_id)
+            metrics.incr(f"{self.name}.redelivered", len(entries))
+            self._accept([(*entry, True) for entry in entries])
+            if start_id == "0-0":
+                return
+
+    def _reread_pending(self, partition: int):
+        """O'zimiz o'qigan, lekin shard'ga yetib bormagan (ACK'siz, in-flight emas) yozuvlar."""
+        start_id = "0-0"
+        while True:
+            entries = self.store.read_pending(self._consumer, partition, BATCH_SIZE, start_id)
+            if not entries:
+                return
+            start_id = entries[-1][1]
+            with self._inflight_lock:
+                entries = [entry for entry in entries if entry[1] not in self._inflight_entries]
+            metrics.incr(f"{self.name}.reread", len(entries))
+            self._accept([(*entry, True) for entry in entries])
+
+    def _accept(self, entries):
+        jobs = []
+        for partition, entry_id, data, redelivered in entries:
+            try:
+                job = OutboundJob(**data)
+            except (TypeError, ValueError) as e:
+                # Buzilgan yozuv — qayta o'qish ham yordam bermaydi, navbatni to'xtatmasin
+                metrics.incr(f"{self.name}.poison")
+                logger.error("%s yaroqsiz yozuv %s tashlandi: %s (%r)", self.name, entry_id, e, data)
+                self._discard(partition, entry_id)
+                continue
+            job.entry_id, job.redelivered = entry_id, redelivered
+            jobs.append(job)
+        if not jobs:
+            return
+
+        try:
+            latest = self.store.latest_edits([(job.chat_id, job.message_id) for job in jobs if job.kind == "edit"])
+        except Exception as e:
+            # Birlashtirmasdan yuboramiz — tahrirlar tartibda, oxirgisi baribir oxirgi ko'rinish
+            logger.warning("%s oxirgi tahrirlar o'qilmadi: %s", self.name, e)
+            latest = {}
+        for job in jobs:
+            newest = latest.get((job.chat_id, job.message_id)) if job.kind == "edit" else None
+            if newest and newest != job.dedupe_key:
+                # Shu xabar uchun yangiroq tahrir navbatda — bunisi eskirgan
+                metrics.incr(f"{self.name}.edits_coalesced")
+                self._finish(job, delivered=False)
+                continue
+            self._dispatch(job)
+
+    def _dispatch(self, job: OutboundJob):
+        partition = self.store.partition(job.chat_id)
+        with self._inflight_lock:
+            self._inflight[partition] = self._inflight.get(partition, 0) + 1
+            self._inflight_entries.add(job.entry_id)
+        while not self.executor.submit(job.chat_id, self._run, job):
+            if not self._running:
+                # Yozuv store'da ACK'siz qoladi — partition'ning keyingi egasi oladi
+                self._done(job)
+                return
+            # Shard navbati to'la — consumer kutadi (backpressure), lease'lar esa yangilanib turadi
+            if time.monotonic() - self._renewed_at >= KEEPALIVE_INTERVAL:
+                self._renew()
+            time.sleep(0.05)
+        metrics.gauge(f"{self.name}.queue_depth", self.executor.qsize())
+
+    def _done(self, job: OutboundJob):
+        with self._inflight_lock:
+            self._inflight[self.store.partition(job.chat_id)] -= 1
+            self._inflight_entries.discard(job.entry_id)
+
+    def _discard(self, partition: int, entry_id: str):
+        try:
+            self.store.discard(partition, entry_id)
+        except Exception as e:
+            # ACK'siz qoladi — keyingi qayta o'qishda yana tashlanadi
+            logger.warning("%s yozuv tashlanmadi: %s", self.name, e)
+
+    def _finish(self, job: OutboundJob, delivered: bool, shown_id: Optional[int] = None):
+        """ACK; `shown_id` — shu job matni endi ko'rinib turgan xabar (send/edit)."""
+        sent = (shown_id, job.digest()) if shown_id is not None else None
+        try:
+            self.store.finish(job.chat_id, job.entry_id, job.dedupe_key, delivered, sent)
+        except Exception as e:
+            logger.warning("%s ACK xatosi: %s", self.name, e)
+
+    # =====================================================
+    #                   PRIVATE METHODS
+    # =====================================================
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        with self._chat_lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+                self._chat_buckets[chat_id] = bucket
+                if len(self._chat_buckets) > MAX_CHAT_BUCKETS:
+                    self._chat_buckets.popitem(last=False)
+            else:
+                self._chat_buckets.move_to_end(chat_id)
+            return bucket
+
+    def _throttle(self, job: OutboundJob):
+        wait = self.global_bucket.reserve()
+        if job.kind != "delete":
+            # chat limiti faqat yangi/tahrirlangan xabarlarga tegishli
+            wait = max(wait, self._chat_bucket(job.chat_id).reserve())
+        if wait > 0:
+            metrics.observe(f"{self.name}.throttle_wait", wait)
+            time.sleep(wait)
+
+    def _call(self, job: OutboundJob):
+        metrics.incr("telegram.calls")
+        if job.kind == "send":
+            return self.bot.send_message(job.chat_id, job.text, reply_markup=job.reply_markup)
+        if job.kind == "edit":
+            return self.bot.edit_message_text(
+                job.text, job.chat_id, job.message_id, reply_markup=job.reply_markup
+            )
+        if job.kind == "delete" and job.message_ids:
+            return self.bot.delete_messages(job.chat_id, job.message_ids)
+        if job.kind == "delete":
+            return self.bot.delete_message(job.chat_id, job.message_id)
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+    def _is_unchanged(self, job: OutboundJob) -> bool:
+        """Matn va markup shu xabarning oxirgi yuborilgan ko'rinishi bilan bir xilmi."""
+        try:
+            return self.store.sent_digest(job.chat_id, job.message_id) == job.digest()
+        except Exception as e:
+            logger.warning("%s oxirgi ko'rinish o'qilmadi: %s", self.name, e)
+            return False   # shubha bo'lsa yuboramiz — Telegram "not modified" deydi
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def _run(self, job: OutboundJob):
+        try:
+            return self._process(job)
+        finally:
+            self._done(job)
+
+    def _process(self, job: OutboundJob):
+        if job.redelivered and self.store.is_done(job.dedupe_key):
+            # Oldingi worker yuborgan, lekin ACK qilishga ulgurmagan
+            metrics.incr(f"{self.name}.duplicates_skipped")
+            return self._finish(job, delivered=True)
+
+        if job.kind == "delete" and job.recent:
+            # Shu chatdagi oldingi send'lar allaqachon yuborilgan — id'lari tracker'da
+            job.message_ids = [job.message_id, *message_tracker.take(job.chat_id, job.message_id, job.recent)]
+            job.recent = 0
+
+        if job.kind == "edit" and self._is_unchanged(job):
+            metrics.incr(f"{self.name}.edits_skipped_unchanged")
+            return self._finish(job, delivered=False)
+
+        result, shown_id = None, None
+        try:
+            result, shown_id = self._deliver(job)
+        finally:
+            self._finish(job, delivered=result is not None, shown_id=shown_id)
+        return result
+
+    def _deliver(self, job: OutboundJob):
+        """(natija, endi shu job matnini ko'rsatayotgan message_id) qaytaradi."""
+        while True:
+            self._throttle(job)
+            started_at = time.perf_counter()
+            try:
+                result = self._call(job)
+            except ApiTelegramException as e:
+                if e.error_code == 429:
+                    retry_after = (e.result_json.get("parameters") or {}).get("retry_after", 1)
+                    metrics.incr(f"{self.name}.rate_limited")
+                    self._chat_bucket(job.chat_id).pause(retry_after)
+                    self.global_bucket.pause(retry_after)
+                elif "message is not modified" in e.description:
+                    metrics.incr(f"{self.name}.edits_not_modified")
+                    return None, job.message_id
+                elif e.error_code < 500:
+                    # 400/403: qayta urinish foyda bermaydi (masalan, xabar o'chirilgan)
+                    metrics.incr(f"{self.name}.failed.{job.kind}")
+                    logger.info("%s %s xatosi: %s", self.name, job.kind, e.description)
+                    return None, None
+                else:
+                    time.sleep(self._backoff(job.attempts))
+            except (ApiException, requests.RequestException) as e:
+                logger.warning("%s %s tarmoq xatosi: %s", self.name, job.kind, e)
+                time.sleep(self._backoff(job.attempts))
+            else:
+                metrics.incr(f"{self.name}.sent.{job.kind}")
+                metrics.observe(f"{self.name}.latency.{job.kind}", time.perf_counter() - started_at)
+                metrics.observe(f"{self.name}.end_to_end.{job.kind}", time.time() - job.created_at)
+                if job.kind == "edit":
+                    return result, job.message_id
+                if job.kind == "send" and getattr(result, "message_id", None):
+                    message_tracker.remember(job.chat_id, result.message_id)
+                    return result, result.message_id
+                return result, None
+
+            job.attempts += 1
+            metrics.incr(f"{self.name}.retries")
+            if job.attempts > self.max_retries:
+                metrics.incr(f"{self.name}.dropped")
+                metrics.incr(f"{self.name}.dropped.{job.kind}")
+                logger.error("%s %s %s urinishdan keyin tashlandi", self.name, job.kind, job.attempts)
+                return None, None
+
+
+# Singleton instance
+dispatcher = MessageDispatcher()
+atexit.register(dispatcher.shutdown)
@@ -1,11 +1,11 @@
 import time
 import json
 import requests
-import asyncio
 from typing import Dict, Any, Optional
 from threading import Lock
 from django.core.cache import cache
-from aiohttp import ClientSession
+
+from bot_app.services.api.aio import aio_transport
 
 USER_AGENT = "RideNowBot/1.0 (admin@ridenow.uz)"
 NOMINATIM_REVERSE = "https://nominatim.openstreetmap.org/reverse"
@@ -72,13 +72,12 @@ def parse_address(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def get_place_from_coords(lat: float, lon: float) -> Dict[str, Any]:
-    key = f"rev:{lat:.6f}:{lon:.6f}"
-    cached = _cache_get(key)
-    if cached:
-        return cached
+def _place_key(lat: float, lon: float) -> str:
+    return f"rev:{lat:.6f}:{lon:.6f}"
+
 
-    params = {
+def _place_params(lat: float, lon: float) -> Dict[str, Any]:
+    return {
         "lat": lat,
         "lon": lon,
         "format": "jsonv2",
@@ -86,60 +85,63 @@ def get_place_from_coords(lat: float, lon: float) -> Dict[str, Any]:
         "zoom": 18,
         "accept-language": "uz",
     }
+
+
+def unknown_place(lat: float, lon: float) -> Dict[str, Any]:
+    """Geocode ishlamaganda — manzil o'rniga koordinatalar."""
+    return {
+        "source": "error",
+        "display_name": f"Location at {lat:.6f}, {lon:.6f}",
+        "mahalla": None,
+        "shahar_tuman": None,
+        "viloyat": None,
+        "full_address": f"Koordinatalar: {lat:.6f}, {lon:.6f}",
+        "raw": {},
+    }
+
+
+def cached_place(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """Keshdagi manzil yoki None — tarmoqqa chiqmaydi."""
+    return _cache_get(_place_key(lat, lon))
+
+
+def remember_place(lat: float, lon: float, result: Dict[str, Any]):
+    _cache_set(_place_key(lat, lon), result)
+
+
+def get_place_from_coords(lat: float, lon: float) -> Dict[str, Any]:
+    cached = cached_place(lat, lon)
+    if cached:
+        return cached
+
     headers = {"User-Agent": USER_AGENT}
 
     try:
-        resp = requests.get(NOMINATIM_REVERSE, params=params, headers=headers, timeout=10)
+        resp = requests.get(NOMINATIM_REVERSE, params=_place_params(lat, lon), headers=headers, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         result = parse_address(data)
     except Exception as e:
-        result = {
-            "source": "error",
-            "display_name": f"Location at {lat:.6f}, {lon:.6f}",
-            "mahalla": None,
-            "shahar_tuman": None,
-            "viloyat": None,
-            "full_address": f"Koordinatalar: {lat:.6f}, {lon:.6f}",
-            "raw": {},
-        }
-
-    _cache_set(key, result)
+        result = unknown_place(lat, lon)
+
+    remember_place(lat, lon, result)
     return result
 
 
-# --- ASYNC VERSIYA (pyTelegramBotAPI(async) yoki aiogram uchun) ---
-async def aget_place_from_coords(lat: float, lon: float) -> Dict[str, Any]:
-    key = f"rev:{lat:.6f}:{lon:.6f}"
-    cached = _cache_get(key)
-    if cached:
-        return cached
-
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "format": "jsonv2",
-        "addressdetails": 1,
-        "zoom": 18,
-        "accept-language": "uz",
-    }
+# --- ASYNC VERSIYA (umumiy aio_transport session'i orqali) ---
+async def fetch_place(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """
+    Nominatim'dan manzilni olish, keshsiz — kesh chaqiruvchi thread'da
+    (`cached_place`/`remember_place`), event loop Redis'ni kutib qolmasin.
+    Xato yoki noto'g'ri javobda None — chaqiruvchi o'zi hal qiladi.
+    """
     headers = {"User-Agent": USER_AGENT}
 
     try:
-        async with ClientSession() as session:
-            async with session.get(NOMINATIM_REVERSE, params=params, headers=headers, timeout=10) as resp:
-                data = await resp.json()
-                result = parse_address(data)
+        resp = await aio_transport.request("GET", NOMINATIM_REVERSE, params=_place_params(lat, lon), headers=headers)
+        if resp.status_code != 200:
+            return None
+        return parse_address(resp.json())
     except Exception:
-        result = {
-            "source": "error",
-            "display_name": f"Location at {lat:.6f}, {lon:.6f}",
-            "mahalla": None,
-            "shahar_tuman": None,
-            "viloyat": None,
-            "full_address": f"Koordinatalar: {lat:.6f}, {lon:.6f}",
-            "raw": {},
-        }
-
-    _cache_set(key, result)
-    return result
+        return None
+
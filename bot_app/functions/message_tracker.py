@@ -0,0 +1,83 @@
+import logging
+from typing import List
+
+from django_redis import get_redis_connection
+
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] — ro'yxat; ARGV: before_id, count. `before_id`dan kichik eng so'nggi `count` ta id'ni
+# qaytaradi va ularni (hamda `before_id`ni) ro'yxatdan chiqaradi — bitta atomik qadamda
+TAKE_LUA = """
+local before = tonumber(ARGV[1])
+local count = tonumber(ARGV[2])
+local taken = {}
+for _, value in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    local id = tonumber(value)
+    if id == before then
+        redis.call('LREM', KEYS[1], 0, value)
+    elseif id < before and #taken < count then
+        taken[#taken + 1] = value
+        redis.call('LREM', KEYS[1], 0, value)
+    end
+end
+return taken
+"""
+
+
+class MessageTracker:
+    """
+    Har bir chat uchun bot yuborgan oxirgi xabar id'lari (ring buffer).
+
+    Redis list: LPUSH + LTRIM — eng yangi id boshida, uzunligi `RING_SIZE`dan
+    oshmaydi. Telegram bot xabarini faqat 48 soat ichida o'chira oladi,
+    shuning uchun kalit ham shuncha yashaydi. `del_msg` taxmin qilingan
+    `message_id - 1, - 2, ...` o'rniga faqat haqiqiy id'larni o'chiradi.
+
+    Ikkalasi ham dispatcher'ning chat navbatida chaqiriladi: `remember` — send
+    yuborilgach, `take` — delete job navbatga yetganda. Shuning uchun undan
+    oldin navbatga qo'yilgan send'lar ham hisobga olinadi.
+    """
+    PREFIX = "bot:msgs:"
+    RING_SIZE = 20
+    TTL = 60 * 60 * 48
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._take = None
+
+    def _key(self, chat_id: int) -> str:
+        return f"{self.PREFIX}{chat_id}"
+
+    def remember(self, chat_id: int, message_id: int):
+        """Dispatcher send natijasidan keyin chaqiriladi."""
+        try:
+            key = self._key(chat_id)
+            pipe = get_redis_connection(self.alias).pipeline(transaction=False)
+            pipe.lpush(key, message_id)
+            pipe.ltrim(key, 0, self.RING_SIZE - 1)
+            pipe.expire(key, self.TTL)
+            pipe.execute()
+        except Exception as e:
+            metrics.incr("message_tracker.redis_errors")
+            logger.warning("MessageTracker remember xatosi: %s", e)
+
+    def take(self, chat_id: int, before_id: int, count: int) -> List[int]:
+        """
+        `before_id`dan oldingi eng so'nggi `count` ta bot xabari id'sini
+        qaytaradi va ularni (hamda `before_id`ni) ro'yxatdan chiqaradi.
+        """
+        try:
+            if self._take is None:
+                self._take = get_redis_connection(self.alias).register_script(TAKE_LUA)
+            # Atomik: parallel ikki o'chirish bir xil id'larni ololmaydi
+            return [int(value) for value in self._take(keys=[self._key(chat_id)], args=[before_id, count])]
+        except Exception as e:
+            metrics.incr("message_tracker.redis_errors")
+            logger.warning("MessageTracker take xatosi: %s", e)
+            return []
+
+
+# Singleton instance
+message_tracker = MessageTracker()
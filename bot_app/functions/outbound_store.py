@@ -0,0 +1,344 @@
+import json
+import os
+import socket
+import time
+from collections import OrderedDict, deque
+from threading import Condition
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# ================= GLOBAL SETTINGS ================= #
+PARTITIONS = getattr(settings, "OUTBOUND_PARTITIONS", 16)   # chat_id % PARTITIONS -> stream
+STREAM_MAXLEN = 100_000
+DONE_TTL = 60 * 60 * 24   # yuborilgan job dedupe kaliti qancha saqlanadi
+EDIT_TTL = 60 * 60        # xabarning oxirgi tahriri belgisi va oxirgi yuborilgan ko'rinishi
+
+Entry = Tuple[int, str, Optional[Dict]]   # (partition, entry_id, job; None — o'qib bo'lmagan yozuv)
+
+# KEYS — partition egalik kalitlari; ARGV: consumer, lease (ms). Qaytaradi: har kalit uchun 1/0
+RENEW_LUA = """
+local kept = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+        kept[i] = 1
+    else
+        kept[i] = 0
+    end
+end
+return kept
+"""
+
+# KEYS[1] — partition egalik kaliti; ARGV[1] — consumer. Faqat egasi o'chira oladi
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def consumer_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class RedisStreamStore:
+    """
+    Redis Streams asosidagi doimiy (durable) outbound navbat.
+
+    - job'lar `chat_id % partitions` bo'yicha `partitions` ta stream'ga
+      yoziladi; `add_many` — bitta pipeline'da bir nechta XADD (batched enqueue);
+    - har bir partition'ni bir vaqtda faqat bitta consumer (gunicorn worker)
+      o'qiydi: egalik `outbound:owner:<p>` lease kaliti bilan (SET NX PX),
+      egasi uni muntazam yangilaydi. Shuning uchun bitta chat'ning barcha
+      job'lari bitta jarayondan, navbat tartibida yuboriladi;
+    - lease'i tugagan (o'lgan) worker'ning ACK'siz yozuvlarini yangi egasi
+      partition'ni olganda XAUTOCLAIM bilan birinchi bo'lib oladi — at-least-once;
+    - `finish` ACK qiladi va dedupe kalitini belgilaydi, shuning uchun qayta
+      yetkazilgan job ikkinchi marta yuborilmaydi; o'qib bo'lmagan yozuv
+      `discard` bilan ACK qilinib o'chiriladi;
+    - `read_pending` — consumer'ning o'zi o'qigan, lekin hali ACK qilmagan
+      yozuvlari (o'qish xatosidan keyin yo'qolib qolmasin).
+    """
+    STREAM_PREFIX = "outbound:stream:"
+    GROUP = "outbound"
+    OWNER_PREFIX = "outbound:owner:"
+    CONSUMERS = "outbound:consumers"
+    DONE_PREFIX = "outbound:done:"
+    EDIT_PREFIX = "outbound:edit:"
+    SENT_PREFIX = "outbound:sent:"
+    shared = True   # barcha worker'lar uchun umumiy — global rate limit ham Redis'da
+
+    def __init__(self, alias: str = "default", partitions: int = PARTITIONS):
+        self.alias = alias
+        self.partitions = partitions
+        self._renew = None
+        self._release = None
+
+    @property
+    def conn(self):
+        return get_redis_connection(self.alias)
+
+    def partition(self, chat_id: int) -> int:
+        return int(chat_id) % self.partitions
+
+    def stream(self, partition: int) -> str:
+        return f"{self.STREAM_PREFIX}{partition}"
+
+    def ensure_groups(self):
+        for partition in range(self.partitions):
+            try:
+                self.conn.xgroup_create(self.stream(partition), self.GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def add_many(self, jobs: Iterable[Dict]):
+        pipe = self.conn.pipeline(transaction=False)
+        for job in jobs:
+            stream = self.stream(self.partition(job["chat_id"]))
+            pipe.xadd(stream, {"job": json.dumps(job)}, maxlen=STREAM_MAXLEN, approximate=True)
+            if job["kind"] == "edit":
+                # Oxirgi tahrir belgisi: eskirgan tahrirlar consumer'da tashlanadi
+                pipe.set(self._edit_key(job["chat_id"], job["message_id"]), job["dedupe_key"], ex=EDIT_TTL)
+        pipe.execute()
+
+    # =====================================================
+    #                   PARTITION OWNERSHIP
+    # =====================================================
+    def heartbeat(self, consumer: str, ttl_ms: int) -> int:
+        """Consumer tirikligini belgilaydi; tirik consumer'lar sonini qaytaradi."""
+        now = time.time()
+        pipe = self.conn.pipeline(transaction=False)
+        pipe.zadd(self.CONSUMERS, {consumer: now})
+        pipe.zremrangebyscore(self.CONSUMERS, "-inf", now - ttl_ms / 1000)
+        pipe.zcard(self.CONSUMERS)
+        return pipe.execute()[-1]
+
+    def leave(self, consumer: str):
+        self.conn.zrem(self.CONSUMERS, consumer)
+
+    def acquire(self, partition: int, consumer: str, lease_ms: int) -> bool:
+        return bool(self.conn.set(self._owner_key(partition), consumer, nx=True, px=lease_ms))
+
+    def renew(self, partitions: Iterable[int], consumer: str, lease_ms: int) -> Set[int]:
+        """Lease'larni uzaytiradi; hali shu consumer'niki bo'lgan partition'lar."""
+        partitions = list(partitions)
+        if self._renew is None:
+            self._renew = self.conn.register_script(RENEW_LUA)
+        kept = self._renew(keys=[self._owner_key(p) for p in partitions], args=[consumer, lease_ms])
+        return {partition for partition, ok in zip(partitions, kept) if ok}
+
+    def release(self, partition: int, consumer: str):
+        if self._release is None:
+            self._release = self.conn.register_script(RELEASE_LUA)
+        self._release(keys=[self._owner_key(partition)], args=[consumer])
+
+    # =====================================================
+    #                   CONSUMING
+    # =====================================================
+    def read(self, consumer: str, partitions: Iterable[int], count: int, block_ms: int) -> List[Entry]:
+        streams = {self.stream(partition): ">" for partition in partitions}
+        response = self.conn.xreadgroup(self.GROUP, consumer, streams, count=count, block=block_ms)
+        entries = []
+        for stream, messages in response or []:
+            stream = stream.decode() if isinstance(stream, bytes) else stream
+            entries.extend(self._decode(int(stream[len(self.STREAM_PREFIX):]), messages))
+        return entries
+
+    def read_pending(self, consumer: str, partition: int, count: int, start_id: str = "0-0") -> List[Entry]:
+        """Shu consumer'ga berilgan, ACK qilinmagan yozuvlar (`start_id`dan keyingilari), id tartibida."""
+        response = self.conn.xreadgroup(self.GROUP, consumer, {self.stream(partition): start_id}, count=count)
+        entries = []
+        for _stream, messages in response or []:
+            entries.extend(self._decode(partition, messages))
+        return entries
+
+    def claim_pending(self, partition: int, consumer: str, count: int, start_id: str = "0-0") -> Tuple[str, List[Entry]]:
+        """
+        Partition'ning oldingi egasi ACK qilmagan yozuvlari, id tartibida.
+        (keyingi start_id, yozuvlar) qaytaradi; start_id "0-0" — hammasi olindi.
+        """
+        response = self.conn.xautoclaim(
+            self.stream(partition), self.GROUP, consumer, 0, start_id=start_id, count=count
+        )
+        if not response:
+            return "0-0", []
+        next_id = response[0].decode() if isinstance(response[0], bytes) else response[0]
+        return next_id, self._decode(partition, response[1])
+
+    def latest_edits(self, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+        if not keys:
+            return {}
+        values = self.conn.mget([self._edit_key(*key) for key in keys])
+        return {key: value.decode() for key, value in zip(keys, values) if value}
+
+    def sent_digest(self, chat_id: int, message_id: int) -> Optional[str]:
+        """Xabarning oxirgi yuborilgan ko'rinishi (matn + markup izi) — barcha worker'lar uchun umumiy."""
+        value = self.conn.get(self._sent_key(chat_id, message_id))
+        return value.decode() if value else None
+
+    def is_done(self, dedupe_key: str) -> bool:
+        return bool(self.conn.exists(f"{self.DONE_PREFIX}{dedupe_key}"))
+
+    def finish(self, chat_id: int, entry_id: str, dedupe_key: str, delivered: bool,
+               sent: Optional[Tuple[int, str]] = None):
+        """ACK + dedupe; `sent` = (message_id, digest) — xabarning endi ko'rinib turgan holati."""
+        stream = self.stream(self.partition(chat_id))
+        pipe = self.conn.pipeline(transaction=False)
+        pipe.xack(stream, self.GROUP, entry_id)
+        pipe.xdel(stream, entry_id)
+        if delivered:
+            pipe.set(f"{self.DONE_PREFIX}{dedupe_key}", 1, ex=DONE_TTL)
+        if sent is not None:
+            pipe.set(self._sent_key(chat_id, sent[0]), sent[1], ex=EDIT_TTL)
+        pipe.execute()
+
+    def discard(self, partition: int, entry_id: str):
+        """Yuborib bo'lmaydigan yozuvni ACK qiladi va o'chiradi."""
+        stream = self.stream(partition)
+        pipe = self.conn.pipeline(transaction=False)
+        pipe.xack(stream, self.GROUP, entry_id)
+        pipe.xdel(stream, entry_id)
+        pipe.execute()
+
+    def _owner_key(self, partition: int) -> str:
+        return f"{self.OWNER_PREFIX}{partition}"
+
+    def _edit_key(self, chat_id: int, message_id: int) -> str:
+        return f"{self.EDIT_PREFIX}{chat_id}:{message_id}"
+
+    def _sent_key(self, chat_id: int, message_id: int) -> str:
+        return f"{self.SENT_PREFIX}{chat_id}:{message_id}"
+
+    @staticmethod
+    def _decode(partition: int, messages) -> List[Entry]:
+        entries = []
+        for entry_id, fields in messages:
+            if not fields:
+                continue  # XAUTOCLAIM / o'z PEL'i: allaqachon o'chirilgan yozuv
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            try:
+                job = json.loads(fields[b"job"] if b"job" in fields else fields["job"])
+            except (KeyError, ValueError):
+                job = None   # consumer ACK qilib tashlaydi, o'qishni to'xtatmaydi
+            entries.append((partition, entry_id, job))
+        return entries
+
+
+class LocalStore:
+    """
+    RedisStreamStore bilan bir xil interfeysli jarayon ichidagi navbat.
+    Redis'siz (dev, benchmark) ishlatish uchun — restart'dan keyin saqlanmaydi.
+    Consumer bitta (shu jarayon), shuning uchun barcha partition'lar uniki.
+    """
+    shared = False
+    def __init__(self, max_done: int = 100_000, partitions: int = PARTITIONS):
+        self.partitions = partitions
+        self._entries = deque()
+        self._pending = {}
+        self._latest = OrderedDict()
+        self._sent = OrderedDict()
+        self._done = OrderedDict()
+        self._max_done = max_done
+        self._seq = 0
+        self._cond = Condition()
+
+    def partition(self, chat_id: int) -> int:
+        return int(chat_id) % self.partitions
+
+    def ensure_groups(self):
+        pass
+
+    def add_many(self, jobs: Iterable[Dict]):
+        with self._cond:
+            for job in jobs:
+                self._seq += 1
+                self._entries.append((f"{self._seq}-0", job))
+                if job["kind"] == "edit":
+                    self._put(self._latest, (job["chat_id"], job["message_id"]), job["dedupe_key"])
+            self._cond.notify_all()
+
+    def heartbeat(self, consumer: str, ttl_ms: int) -> int:
+        return 1
+
+    def leave(self, consumer: str):
+        pass
+
+    def acquire(self, partition: int, consumer: str, lease_ms: int) -> bool:
+        return True
+
+    def renew(self, partitions: Iterable[int], consumer: str, lease_ms: int) -> Set[int]:
+        return set(partitions)
+
+    def release(self, partition: int, consumer: str):
+        pass
+
+    def read(self, consumer: str, partitions: Iterable[int], count: int, block_ms: int) -> List[Entry]:
+        with self._cond:
+            if not self._entries:
+                self._cond.wait(block_ms / 1000)
+            entries = []
+            while self._entries and len(entries) < count:
+                entry_id, job = self._entries.popleft()
+                entry = (self.partition(job["chat_id"]), entry_id, job)
+                self._pending[entry_id] = entry
+                entries.append(entry)
+            return entries
+
+    def read_pending(self, consumer: str, partition: int, count: int, start_id: str = "0-0") -> List[Entry]:
+        start = self._seq_of(start_id)
+        with self._cond:
+            pending = sorted(
+                (entry for entry in self._pending.values()
+                 if entry[0] == partition and self._seq_of(entry[1]) > start),
+                key=lambda entry: self._seq_of(entry[1]),
+            )
+            return pending[:count]
+
+    def claim_pending(self, partition: int, consumer: str, count: int, start_id: str = "0-0") -> Tuple[str, List[Entry]]:
+        # Boshqa egasi bo'lmagan — ACK'siz qolgan yozuvlar shu jarayonda allaqachon ishlanmoqda
+        return "0-0", []
+
+    def latest_edits(self, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+        with self._cond:
+            return {key: self._latest[key] for key in keys if key in self._latest}
+
+    def sent_digest(self, chat_id: int, message_id: int) -> Optional[str]:
+        with self._cond:
+            return self._sent.get((chat_id, message_id))
+
+    def is_done(self, dedupe_key: str) -> bool:
+        with self._cond:
+            return dedupe_key in self._done
+
+    def finish(self, chat_id: int, entry_id: str, dedupe_key: str, delivered: bool,
+               sent: Optional[Tuple[int, str]] = None):
+        with self._cond:
+            self._pending.pop(entry_id, None)
+            if delivered:
+                self._put(self._done, dedupe_key, True)
+            if sent is not None:
+                self._put(self._sent, (chat_id, sent[0]), sent[1])
+
+    def discard(self, partition: int, entry_id: str):
+        with self._cond:
+            self._pending.pop(entry_id, None)
+
+    @staticmethod
+    def _seq_of(entry_id: str) -> int:
+        return int(entry_id.split("-", 1)[0])
+
+    def _put(self, table: OrderedDict, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        if len(table) > self._max_done:
+            table.popitem(last=False)
+
+
+def build_store():
+    if getattr(settings, "OUTBOUND_STORE", "redis") == "redis":
+        return RedisStreamStore()
+    return LocalStore()
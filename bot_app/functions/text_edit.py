@@ -1,39 +1,7 @@
-from queue import Queue, Full
-from threading import Thread
-from concurrent.futures import ThreadPoolExecutor
 from telebot.types import Message, CallbackQuery
+from bot_app.functions.dispatcher import dispatcher
 from bot_app.repo.user_service import BotUserService
 from msg_app.models import BotMessage
-from bot_app.core.loader import bot
-
-# ================= GLOBAL SETTINGS ================= #
-MAX_QUEUE_SIZE = 3_000
-WORKER_COUNT = 2
-QUEUE_TIMEOUT = 0.01
-
-# ================= QUEUE & THREADPOOL ================= #
-edit_queue = Queue(maxsize=MAX_QUEUE_SIZE)
-executor = ThreadPoolExecutor(max_workers=WORKER_COUNT)
-
-
-# ================= WORKER ================= #
-def edit_worker():
-    while True:
-        try:
-            chat_id, message_id, text, markup, _ = edit_queue.get()
-            try:
-                bot.edit_message_text(text, chat_id, message_id, reply_markup=markup)
-            except Exception as e:
-                print(f"[❌] edit_message error: {e}")
-        except Exception as e:
-            print(f"[❌] Worker error: {e}")
-        finally:
-            edit_queue.task_done()
-
-
-for _ in range(WORKER_COUNT):
-    t = Thread(target=edit_worker, daemon=True)
-    t.start()
 
 
 # ================= EDIT MSG ================= #
@@ -45,7 +13,7 @@ def edit_msg(
         **kwargs):
     """
     Message yoki CallbackQuery obyekti asosida xabarni tahrirlash.
-    Thread-safe va resursni tejaydi.
+    Tahrir send_msg bilan bitta dispatcher orqali, tartib bilan bajariladi.
     """
     try:
         if isinstance(obj, Message):
@@ -61,10 +29,7 @@ def edit_msg(
         text = BotMessage.get_txt(lang, slug, **kwargs) if kwargs else BotMessage.get_txt(lang, slug)
         markup_instance = markup(lang, buttons) if markup else None
 
-        try:
-            edit_queue.put((chat_id, message_id, text, markup_instance, "edit"), timeout=QUEUE_TIMEOUT)
-        except Full:
-            print("[⚠️] Edit queue is full — skipping message edit")
+        dispatcher.edit(chat_id, message_id, text, markup_instance)
 
     except Exception as e:
         print(f"[❌] edit_msg error: {e}")
@@ -0,0 +1,71 @@
+from itertools import product
+from threading import Lock
+from typing import Dict, NamedTuple, Tuple
+
+from bot_app.functions.buttons.cache import CachedMarkup
+from bot_app.functions.buttons.inline import travel_control_inl
+from msg_app.catalogue import catalogue
+from msg_app.models import BotMessage
+from msg_app.template import CompiledTemplate
+
+PASSENGER_COUNTS = (1, 2, 3)
+TRAVEL_CLASSES = ("economy", "standard", "business")
+FEMALE_FLAGS = (False, True)
+
+
+class TripScreen(NamedTuple):
+    template: CompiledTemplate   # faqat {loc_begin}, {loc_end}, {price} qolgan trip_details
+    markup: CachedMarkup
+
+
+class TripScreens:
+    """
+    "Sayohat tafsilotlari" ekrani: 3 yo'lovchi soni × 2 ayol belgisi × 3 klass
+    = har bir til uchun 18 ta holat. Matnning statik qismi va klaviatura
+    oldindan tayyorlanadi, so'rovda faqat manzillar va narx qo'yiladi.
+    Katalog versiyasi o'zgarsa — qayta tayyorlanadi.
+    """
+
+    def __init__(self):
+        self._screens: Dict[Tuple, TripScreen] = {}
+        self._version = None
+        self._lock = Lock()
+
+    def get(self, lang: str, passenger_count: int, travel_class: str, has_female: bool) -> TripScreen:
+        if travel_class not in TRAVEL_CLASSES:
+            travel_class = TRAVEL_CLASSES[0]   # holatdagi eski/noma'lum klass — standart ekran
+        version = catalogue.current().version
+        key = (lang, passenger_count, travel_class, bool(has_female))
+        screens = self._screens
+        if version == self._version and key in screens:
+            return screens[key]
+
+        with self._lock:
+            if version != self._version:
+                self._screens, self._version = {}, version
+            if (lang, 1, TRAVEL_CLASSES[0], False) not in self._screens:
+                self._screens = {**self._screens, **self._build(lang)}
+            return self._screens[key]
+
+    def render(self, lang: str, passenger_count: int, travel_class: str, has_female: bool,
+               loc_begin: str, loc_end: str, price: int) -> Tuple[str, CachedMarkup]:
+        screen = self.get(lang, passenger_count, travel_class, has_female)
+        return screen.template.render(loc_begin=loc_begin, loc_end=loc_end, price=price), screen.markup
+
+    @staticmethod
+    def _build(lang: str) -> Dict[Tuple, TripScreen]:
+        template = catalogue.template(lang, "trip_details") or CompiledTemplate.literal("trip_details")
+        screens = {}
+        for count, travel_class, has_female in product(PASSENGER_COUNTS, TRAVEL_CLASSES, FEMALE_FLAGS):
+            partial = template.partial(
+                passenger="3+" if count > 2 else count,
+                travel_class=BotMessage.get_txt(lang, travel_class),
+                has_woman="✅" if has_female else "❌",
+            )
+            markup = travel_control_inl(lang, [count, travel_class, has_female])
+            screens[(lang, count, travel_class, has_female)] = TripScreen(partial, markup)
+        return screens
+
+
+# Singleton instance
+trip_screens = TripScreens()
@@ -2,13 +2,18 @@ from telebot import TeleBot
 from telebot.types import CallbackQuery, Message
 import requests
 
+from bot_app.functions.dispatcher import dispatcher
+
 def get_data(call: CallbackQuery):
     return call.data.split(":", 1)[-1]
 
 def del_msg(bot: TeleBot, call: CallbackQuery | Message, count: int = 1):
     """
-    So‘nggi `count` ta xabarni o‘chiradi.
+    Kelgan xabarni va undan oldingi bot yuborgan `count - 1` ta xabarni o‘chiradi.
     call — CallbackQuery yoki Message bo‘lishi mumkin.
+    Id'lar taxmin qilinmaydi — dispatcher job chat navbatiga yetganda
+    `message_tracker`dagi haqiqiy id'larni oladi (navbatdagi send'lar ham
+    yuborilgan bo'ladi) va bitta `delete_messages` so‘rovi bilan o‘chiradi.
     """
     try:
         if isinstance(call, CallbackQuery):
@@ -18,12 +23,7 @@ def del_msg(bot: TeleBot, call: CallbackQuery | Message, count: int = 1):
             chat_id = call.chat.id
             last_message_id = call.message_id
 
-        # Har bir xabarni alohida o‘chiradi
-        for msg_id in range(last_message_id, last_message_id - count, -1):
-            try:
-                bot.delete_message(chat_id, msg_id)
-            except Exception:
-                continue  # agar ba'zilari allaqachon o‘chgan bo‘lsa — davom et
+        dispatcher.delete_recent(chat_id, last_message_id, count - 1)
 
     except Exception as e:
         print(f"[❌] del_msg xatosi: {e}")
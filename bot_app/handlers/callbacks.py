@@ -11,6 +11,7 @@ from ..core.loader import bot
 from ..core.states import Registration
 from ..functions.buttons.default import create_btn
 from ..functions.text_sender import send_msg
+from ..services.api_prefetch import api_prefetcher
 from ..services.passenger_manager import passenger_manager
 
 
@@ -19,6 +20,10 @@ def callback_control(call: CallbackQuery, state: StateContext):
     data = call.data
     print(data)
 
+    if data == "start_now":
+        # Yo'lovchi va oldingi manzillar — parallel, ikkalasi ham kontekstga yoziladi
+        api_prefetcher.fetch(call.from_user.id, passenger=True, locations=True)
+
     user = passenger_manager.get_passenger(call.from_user.id)
     telegram_id = user.get("telegram_id", None)
 
@@ -1,15 +1,15 @@
-from telebot.apihelper import ApiTelegramException
 from telebot.types import CallbackQuery
 from telebot.states.sync import StateContext
 
 from bot_app.repo.user_service import BotUserService
-from msg_app.models import BotMessage
 from ...core.loader import bot
 from ...core.states import TravelState
-from ...functions.buttons.inline import travel_control_inl, create_inl
+from ...functions.buttons.inline import create_inl
+from ...functions.dispatcher import dispatcher
 from ...functions.text_sender import send_msg
 from ...functions.utils import del_msg
 from ...functions.distance import calc_distance
+from ...functions.trip_screen import TRAVEL_CLASSES, trip_screens
 
 
 # =========================================================
@@ -67,6 +67,9 @@ def details_callback(call: CallbackQuery, state: StateContext):
 
     elif action.startswith("class:"):
         travel_class = action.split(":")[1]
+        if travel_class not in TRAVEL_CLASSES:
+            # callback_data mijozdan keladi — noma'lum klass holatga yozilmaydi
+            return bot.answer_callback_query(call.id)
 
     # === 🔹 Faqat o‘zgarish bo‘lganda narxni qayta hisoblash ===
     if (
@@ -85,30 +88,18 @@ def details_callback(call: CallbackQuery, state: StateContext):
     else:
         return bot.answer_callback_query(call.id)
 
-    # === 🔹 Matn tayyorlash ===
-    text = BotMessage.get_txt(lang, "trip_details").format(
+    # === 🔹 Matn va klaviatura (oldindan tayyorlangan ekran) ===
+    text, markup = trip_screens.render(
+        lang, passenger_count, travel_class, has_female,
         loc_begin=loc_begin["address"],
         loc_end=loc_end["address"],
-        passenger="3+" if passenger_count > 2 else passenger_count,
-        travel_class=BotMessage.get_txt(lang, travel_class),
         price=price,
-        has_woman="✅" if has_female else "❌"
     )
 
     # === 🔹 Xabarni yangilash ===
-    markup = travel_control_inl(lang, [passenger_count, travel_class, has_female])
+    # Tez-tez bosilganda dispatcher navbatdagi tahrirlarni birlashtiradi
     state.set(TravelState.details)
 
-    try:
-        bot.edit_message_text(
-            chat_id=call.message.chat.id,
-            message_id=call.message.message_id,
-            text=text,
-            reply_markup=markup,
-            parse_mode="HTML"
-        )
-    except ApiTelegramException as e:
-        if "message is not modified" not in str(e):
-            print(f"[WARN] edit_message_text error: {e}")
+    dispatcher.edit(call.message.chat.id, call.message.message_id, text, markup)
 
     return bot.answer_callback_query(call.id)
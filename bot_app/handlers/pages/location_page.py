@@ -1,6 +1,7 @@
 from telebot.states.sync import StateContext
 from telebot.types import Message
-from bot_app.services.location_service import location_client
+from bot_app.core.context import MISSING, set_context_locations
+from bot_app.services.location_service import location_client, user_locations
 from bot_app.repo.user_service import BotUserService
 from msg_app.models import BotMessage
 from ..pages.order_page import order
@@ -9,9 +10,10 @@ from ...core.loader import bot
 from ...functions.buttons.default import create_btn
 from ...functions.buttons.inline import travel_control_inl
 from ...functions.distance import calc_distance
-from ...functions.get_place import get_place_from_coords
+from ...functions.get_place import unknown_place
 from ...functions.text_sender import send_msg
 from ...functions.utils import del_msg
+from ...services.api_prefetch import api_prefetcher
 from ...core.states import TravelState
 from .previous_locations_page import previous_location
 import logging
@@ -72,10 +74,10 @@ def detect_location(msg: Message, state: StateContext, state_key: str) -> dict |
 
 def _process_gps_location(msg: Message) -> dict:
     """Process GPS location from message"""
-    coords_data = get_place_from_coords(
-        msg.location.latitude,
-        msg.location.longitude
-    )
+    coords = (msg.location.latitude, msg.location.longitude)
+    # Umumiy aiohttp session (keep-alive) orqali. Ishlamasa yoki vaqt tugasa — qayta
+    # sinxron so'rov yo'q (Nominatim uzilishida kechikish ikki baravar bo'lardi), koordinatalar
+    coords_data = api_prefetcher.fetch(msg.from_user.id, coords=coords) or unknown_place(*coords)
 
     return LocationService.create_location_dict(
         lat=msg.location.latitude,
@@ -98,6 +100,8 @@ def _save_location_to_db(telegram_id: int, location: dict):
         live_period=location["live_period"],
         accuracy=location["accuracy"]
     )
+    # Shu update'da ro'yxat qayta kerak bo'lsa — yangi manzil bilan olinsin
+    set_context_locations(telegram_id, MISSING)
 
 
 def _request_location(msg: Message, state: StateContext, state_key: str):
@@ -126,7 +130,7 @@ def select_previous_location(msg: Message, state: StateContext, loc_key: str) ->
         return False
 
     index = int(msg.text) - 1
-    location_data = location_client.get_user_locations(msg.from_user.id)
+    location_data = user_locations(msg.from_user.id)
     locations = location_data.get("locations", [])
 
     # Validate index range
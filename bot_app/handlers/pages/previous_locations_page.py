@@ -1,7 +1,7 @@
-from bot_app.services.location_service import location_client
+from bot_app.services.location_service import user_locations
 
 def previous_location(msg):
-    location_data = location_client.get_user_locations(msg.from_user.id)
+    location_data = user_locations(msg.from_user.id)
     locations = location_data.get("locations", [])
 
     if not locations:
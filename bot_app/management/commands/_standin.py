@@ -0,0 +1,81 @@
+import json
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+
+class StandInBotAPI:
+    """
+    Benchmark'lar uchun lokal Bot API o'rinbosari (HTTP/1.1, keep-alive).
+
+    Har bir yangi TCP ulanish `connections`da sanaladi — haqiqiy
+    api.telegram.org'da bu TLS handshake'ga teng.
+    """
+
+    def __init__(self, latency: float = 0.0, status: int = 200):
+        self.latency = latency
+        self.status = status   # xato holatini sinash uchun (masalan, 503)
+        self.connections = 0
+        self.requests = 0
+        self._lock = Lock()
+        self._message_id = 0
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Sarlavha va tana alohida yoziladi — Nagle keep-alive'da ~40 ms qo'shmasin
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with standin._lock:
+                    standin.connections += 1
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if standin.latency:
+                    time.sleep(standin.latency)
+                with standin._lock:
+                    standin.requests += 1
+                    standin._message_id += 1
+                    message_id = standin._message_id
+                body = json.dumps({"ok": True, "result": {
+                    "message_id": message_id, "date": int(time.time()),
+                    "chat": {"id": 1, "type": "private"}, "text": "ok",
+                }}).encode()
+                self.send_response(standin.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/bot{{0}}/{{1}}"
+
+    def reset(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from bot_app.core.metrics import percentiles
+from bot_app.management.commands._standin import StandInBotAPI
+from bot_app.services.api.transport import APITransport
+
+
+class Command(BaseCommand):
+    help = "Lokal API o'rinbosariga qarshi GET: sessionsiz requests va umumiy transport (ulanishlar, p50/p99, 503 holati)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=8, help="gunicorn/webhook worker thread'lar soni")
+        parser.add_argument("--latency", type=float, default=0.002, help="server javob vaqti, sekund")
+
+    def handle(self, *args, **options):
+        with StandInBotAPI(latency=options["latency"]) as standin:
+            host, port = standin.server.server_address
+            url = f"http://{host}:{port}/api/v1/journey/passengers/42/"
+
+            for status in (200, 503):
+                standin.status = status
+                transport = APITransport(pool_size=options["threads"], backoff=0.01)
+                modes = (
+                    ("requests.get", lambda: requests.get(url, timeout=(3.05, 10))),
+                    ("transport", lambda: self._guarded(transport, url)),
+                )
+                for label, call in modes:
+                    standin.reset()
+                    samples = self._run(call, options["requests"], options["threads"])
+                    self.stdout.write(
+                        f"HTTP {status} {label:<13} connections={standin.connections:<5} "
+                        f"server_requests={standin.requests:<5} {percentiles(samples)}"
+                    )
+                transport.close()
+
+    @staticmethod
+    def _guarded(transport: APITransport, url: str):
+        try:
+            transport.request("GET", url)
+        except requests.RequestException:
+            pass  # circuit ochiq — client'lar buni 'Service unavailable' deb qaytaradi
+
+    @staticmethod
+    def _run(call, count: int, threads: int):
+        def timed(_):
+            start = time.perf_counter()
+            call()
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(timed, range(count)))
@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from bot_app.core.metrics import percentiles
+from bot_app.functions import get_place
+from bot_app.management.commands._standin import StandInBotAPI
+from bot_app.services.api.aio import aio_transport
+from bot_app.services.api.passenger_service import AsyncPassengerAPIClient, PassengerAPIClient
+from bot_app.services.location_service import AsyncLocationAPIClient, LocationAPIClient
+
+
+class Command(BaseCommand):
+    help = ("Bitta update'ga kerakli yo'lovchi + manzillar + geocode: sinxron client'lar ketma-ket "
+            "va async client'lar parallel (lokal API o'rinbosariga qarshi, update kechikishi p50/p99).")
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8, help="webhook worker thread'lar soni")
+        parser.add_argument("--latency", type=float, default=0.03, help="server javob vaqti, sekund")
+
+    def handle(self, *args, **options):
+        with StandInBotAPI(latency=options["latency"]) as standin:
+            host, port = standin.server.server_address
+            base = f"http://{host}:{port}"
+            # Geocode ham o'rinbosarga — Nominatim'ga chiqmaymiz
+            get_place.NOMINATIM_REVERSE = f"{base}/reverse"
+
+            sync_clients = self._clients(PassengerAPIClient(), LocationAPIClient(), base)
+            async_clients = self._clients(AsyncPassengerAPIClient(), AsyncLocationAPIClient(), base)
+            modes = (
+                ("sync serial", lambda i: self._serial(*sync_clients, i)),
+                ("async gather", lambda i: self._gathered(*async_clients, i)),
+            )
+            for label, update in modes:
+                standin.reset()
+                samples = self._run(update, options["updates"], options["threads"])
+                self.stdout.write(
+                    f"{label:<13} connections={standin.connections:<4} "
+                    f"server_requests={standin.requests:<5} {percentiles(samples)}"
+                )
+        aio_transport.shutdown()
+
+    @staticmethod
+    def _clients(passengers, locations, base: str):
+        passengers.base_url = f"{base}/api/v1/journey/passengers/"
+        locations.base_url = f"{base}/api/v1/journey/locations/"
+        return passengers, locations
+
+    @staticmethod
+    def _coords(i: int):
+        # Har update uchun yangi koordinata — geocode keshiga tushmasin
+        return 41.0 + i * 1e-5, 69.0 + time.time_ns() % 10 ** 6 * 1e-9
+
+    def _serial(self, passengers, locations, i: int):
+        tg_id = 10_000 + i
+        passengers.get_passenger(tg_id)
+        locations.get_user_locations(tg_id)
+        get_place.get_place_from_coords(*self._coords(i))
+
+    def _gathered(self, passengers, locations, i: int):
+        tg_id = 10_000 + i
+        aio_transport.gather(
+            passengers.get_passenger(tg_id),
+            locations.get_user_locations(tg_id),
+            get_place.fetch_place(*self._coords(i)),
+        )
+
+    @staticmethod
+    def _run(update, count: int, threads: int):
+        def timed(i):
+            start = time.perf_counter()
+            update(i)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(timed, range(count)))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bot_app.core.metrics import percentiles
+from bot_app.functions.buttons.default import create_btn
+from bot_app.functions.buttons.inline import create_inl, travel_control_inl
+
+
+class Command(BaseCommand):
+    help = "Klaviatura qurish + JSON: har safar qurish va keshdan olish (mikrobenchmark)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        layouts = [
+            (create_btn, [["send_location"], ["back_order"]]),
+            (create_btn, [["travel"], ["language", "help"]]),
+            (create_inl, [["order", "help"], ["language"]]),
+            (travel_control_inl, [2, "standard", True]),
+        ]
+        langs = settings.BOT_LANGUAGE
+        calls = []
+        for i in range(options["iterations"]):
+            builder, layout = layouts[i % len(layouts)]
+            calls.append((builder, langs[i % len(langs)], layout))
+
+        for label, pick in (("build", lambda builder: builder.__wrapped__), ("cached", lambda builder: builder)):
+            for builder, lang, layout in calls[:len(layouts) * len(langs)]:
+                pick(builder)(lang, layout).to_json()  # isitish (katalog/kesh)
+
+            samples = []
+            for builder, lang, layout in calls:
+                start = time.perf_counter()
+                pick(builder)(lang, layout).to_json()
+                samples.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{label:<7} {len(samples)} markup: {sum(samples) * 1000:.1f} ms, {percentiles(samples)}"
+            )
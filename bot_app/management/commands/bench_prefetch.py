@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+from redis.connection import AbstractConnection
+
+from bot_app.core.flood import flood_limiter
+from bot_app.core.prefetch import prefetcher
+from bot_app.repo.cached_user import CachedUser
+from bot_app.repo.user_cache import user_cache
+from bot_app.services.passenger_manager import passenger_manager
+from msg_app.catalogue import catalogue
+
+BASE_ID = 9_000_000_000
+
+
+class Command(BaseCommand):
+    help = "Update boshidagi Redis murojaatlari: alohida so'rovlar va bitta pipeline (round-trip soni)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=2000)
+        parser.add_argument("--rtt-ms", type=float, default=0.0,
+                            help="har bir round-trip'ga qo'shiladigan kechikish (masofaviy Redis)")
+
+    def handle(self, *args, **options):
+        n = options["updates"]
+        self.rtt = options["rtt_ms"] / 1000
+        self.roundtrips = 0
+        catalogue.current()
+
+        for label, offset, run in (("separate", 0, self._separate), ("pipeline", n, self._pipeline)):
+            ids = range(BASE_ID + offset, BASE_ID + offset + n)
+            self._seed(ids)
+            with self._counting():
+                start = time.perf_counter()
+                for tg_id in ids:
+                    # Ko'p worker'li o'rnatmada foydalanuvchi odatda boshqa jarayonga tushadi
+                    user_cache.evict_local(tg_id)
+                    run(tg_id)
+                elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:<9} {n} update: {self.roundtrips / n:.2f} round-trip/update, "
+                f"{elapsed * 1000 / n:.3f} ms/update"
+            )
+            self._cleanup(ids)
+
+    @staticmethod
+    def _separate(tg_id: int):
+        flood_limiter.allow("message", tg_id)
+        user_cache.get(tg_id)
+        cache.get(passenger_manager._get_cache_key(str(tg_id)))
+        catalogue.current()
+
+    @staticmethod
+    def _pipeline(tg_id: int):
+        prefetcher.fetch("message", tg_id)
+
+    # =====================================================
+    #                   HELPERS
+    # =====================================================
+    @contextmanager
+    def _counting(self):
+        original = AbstractConnection.send_packed_command
+        command = self
+
+        def send_packed_command(conn, *args, **kwargs):
+            command.roundtrips += 1
+            if command.rtt:
+                time.sleep(command.rtt)
+            return original(conn, *args, **kwargs)
+
+        self.roundtrips = 0
+        AbstractConnection.send_packed_command = send_packed_command
+        try:
+            yield
+        finally:
+            AbstractConnection.send_packed_command = original
+
+    @staticmethod
+    def _seed(ids):
+        now = time.time()
+        for tg_id in ids:
+            user_cache.set(CachedUser(tg_id, tg_id, "Bench User", None, "uz", False, now, now))
+            cache.set(passenger_manager._get_cache_key(str(tg_id)), {"telegram_id": tg_id}, 300)
+        flood_limiter.allow("message", ids[0])  # skriptni yuklash
+
+    @staticmethod
+    def _cleanup(ids):
+        conn = get_redis_connection("default")
+        keys = []
+        for tg_id in ids:
+            keys += [user_cache.key(tg_id), passenger_manager.cache_key(tg_id), flood_limiter.key("message", tg_id)]
+            user_cache.evict_local(tg_id)
+        conn.delete(*keys)
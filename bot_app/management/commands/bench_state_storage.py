@@ -0,0 +1,58 @@
+import time
+from contextvars import Context
+
+from django.core.management.base import BaseCommand
+from telebot import StateMemoryStorage
+
+from bot_app.core.context import begin_update, end_update
+from bot_app.core.metrics import percentiles
+from bot_app.core.state_storage import RedisStateStorage
+
+BASE_ID = 9_200_000_000
+OPERATIONS = ("get_state", "set_state", "set_data", "get_data")
+
+
+class Command(BaseCommand):
+    help = "Holat storage: StateMemoryStorage va RedisStateStorage — get/set kechikishi (bitta update = 4 amal)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=200)
+
+    def handle(self, *args, **options):
+        users = [BASE_ID + i for i in range(options["users"])]
+        redis_storage = RedisStateStorage()
+        variants = (
+            ("memory", StateMemoryStorage(), False),
+            ("redis", redis_storage, False),
+            # Update konteksti bilan: holat update davomida bir marta o'qiladi
+            ("redis+ctx", redis_storage, True),
+        )
+        for label, storage, scoped in variants:
+            samples = {name: [] for name in OPERATIONS}
+            for i in range(options["updates"]):
+                user_id = users[i % len(users)]
+                Context().run(self._update, storage, user_id, i, scoped, samples)
+            summary = ", ".join(f"{name} p50={percentiles(values)['p50']}" for name, values in samples.items())
+            self.stdout.write(f"{label:<10} {summary} ms")
+
+        for user_id in users:
+            redis_storage.delete_state(user_id, user_id)
+
+    @staticmethod
+    def _update(storage, user_id: int, i: int, scoped: bool, samples: dict):
+        if scoped:
+            begin_update(user_id)
+        calls = (
+            ("get_state", lambda: storage.get_state(user_id, user_id)),
+            ("set_state", lambda: storage.set_state(user_id, user_id, "TravelState:details")),
+            ("set_data", lambda: storage.set_data(user_id, user_id, "price", 15000 + i)),
+            ("get_data", lambda: storage.get_data(user_id, user_id)),
+        )
+        for name, call in calls:
+            start = time.perf_counter()
+            call()
+            samples[name].append(time.perf_counter() - start)
+        if scoped:
+            end_update()
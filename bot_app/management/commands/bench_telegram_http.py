@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from telebot import TeleBot, apihelper
+
+from bot_app.core.http import TelegramHTTP
+from bot_app.core.metrics import percentiles
+from bot_app.management.commands._standin import StandInBotAPI
+
+
+class Command(BaseCommand):
+    help = "Lokal Bot API o'rinbosariga qarshi send_message: ulanishlar soni va p50/p99 (telebot standart va pool)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=16, help="shard/worker thread'lar soni")
+        parser.add_argument("--pool-size", type=int, default=16)
+        parser.add_argument("--latency", type=float, default=0.002, help="server javob vaqti, sekund")
+
+    def handle(self, *args, **options):
+        bot = TeleBot("123456:bench", threaded=False)
+        saved = apihelper.API_URL, apihelper.CUSTOM_REQUEST_SENDER, apihelper.SESSION_TIME_TO_LIVE
+
+        with StandInBotAPI(latency=options["latency"]) as standin:
+            apihelper.API_URL = standin.api_url
+            modes = [
+                ("no reuse", None, 0),                    # har so'rovga yangi ulanish
+                ("telebot per-thread", None, saved[2]),   # standart: thread'ga bitta session
+                ("pooled", TelegramHTTP(pool_size=options["pool_size"]).request, saved[2]),
+            ]
+            try:
+                for label, sender, ttl in modes:
+                    apihelper.CUSTOM_REQUEST_SENDER = sender
+                    apihelper.SESSION_TIME_TO_LIVE = ttl
+                    standin.reset()
+                    samples = self._run(bot, options["requests"], options["threads"])
+                    self.stdout.write(
+                        f"{label:<20} connections={standin.connections:<5} "
+                        f"requests={standin.requests:<5} {percentiles(samples)}"
+                    )
+            finally:
+                apihelper.API_URL, apihelper.CUSTOM_REQUEST_SENDER, apihelper.SESSION_TIME_TO_LIVE = saved
+
+    @staticmethod
+    def _run(bot, requests: int, threads: int):
+        def send(i):
+            start = time.perf_counter()
+            bot.send_message(i % 50, "bench")
+            return time.perf_counter() - start
+
+        # Yangi thread'lar — telebot per-thread session'lari avvalgi rejimdan qolmasin
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(send, range(requests)))
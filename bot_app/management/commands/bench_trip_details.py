@@ -0,0 +1,49 @@
+import time
+from itertools import product
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bot_app.core.metrics import percentiles
+from bot_app.functions.buttons.inline import travel_control_inl
+from bot_app.functions.trip_screen import FEMALE_FLAGS, PASSENGER_COUNTS, TRAVEL_CLASSES, trip_screens
+from msg_app.models import BotMessage
+
+
+def legacy_render(lang, passenger_count, travel_class, has_female, loc_begin, loc_end, price):
+    """Oldingi details_callback: har bosishda matn formatlash va klaviaturani qurish."""
+    text = BotMessage.get_txt(lang, "trip_details").format(
+        loc_begin=loc_begin,
+        loc_end=loc_end,
+        passenger="3+" if passenger_count > 2 else passenger_count,
+        travel_class=BotMessage.get_txt(lang, travel_class),
+        price=price,
+        has_woman="✅" if has_female else "❌"
+    )
+    markup = travel_control_inl.__wrapped__(lang, [passenger_count, travel_class, has_female])
+    return text, markup
+
+
+class Command(BaseCommand):
+    help = "details_callback ekranini tayyorlash: har safar qurish va oldindan tayyorlangan 18 holat."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--toggles", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        states = list(product(settings.BOT_LANGUAGE, PASSENGER_COUNTS, TRAVEL_CLASSES, FEMALE_FLAGS))
+        address = "Toshkent, Amir Temur ko'chasi, 1"
+
+        for label, render in (("rebuild", legacy_render), ("precomputed", trip_screens.render)):
+            samples = []
+            for i in range(options["toggles"]):
+                lang, count, travel_class, has_female = states[i % len(states)]
+                start = time.perf_counter()
+                _text, markup = render(lang, count, travel_class, has_female, address, address, 12_000 + i)
+                markup.to_json()
+                samples.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{label:<12} {len(samples)} toggle: {sum(samples) * 1000:.1f} ms, {percentiles(samples)}"
+            )
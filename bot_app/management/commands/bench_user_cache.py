@@ -0,0 +1,45 @@
+import pickle
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bot_app.core.metrics import percentiles
+from bot_app.models import TelegramUser
+from bot_app.repo.cached_user import CachedUser
+
+
+class Command(BaseCommand):
+    help = "tguser kesh yozuvi: pickle qilingan model va CachedUser (struct) — hajm va decode vaqti."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        user = TelegramUser(
+            id=12345, tg_id=5_123_456_789, full_name="Abdulla Qodiriy", username="abdulla_q",
+            language_code="uz", is_blocked=False, created_at=now, updated_at=now,
+        )
+        user._state.adding = False
+        user._state.db = "default"
+
+        variants = (
+            ("pickle", pickle.dumps(user, pickle.HIGHEST_PROTOCOL), pickle.loads),
+            ("struct", CachedUser.from_model(user).encode(), CachedUser.decode),
+        )
+        for label, payload, decode in variants:
+            for _ in range(100):
+                decode(payload)  # isitish
+
+            samples = []
+            for _ in range(options["iterations"]):
+                start = time.perf_counter()
+                decode(payload)
+                samples.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{label:<7} {len(payload):>4} bayt, decode {options['iterations']}x: "
+                f"{sum(samples) * 1000:.1f} ms, {percentiles(samples)}"
+            )
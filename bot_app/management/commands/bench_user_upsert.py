@@ -0,0 +1,89 @@
+import io
+import time
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext
+
+from bot_app.models import TelegramUser
+from bot_app.repo.user_cache import user_cache
+from bot_app.repo.user_service import BotUserService
+
+BASE_ID = 9_100_000_000
+
+
+def legacy_get_or_create(tg_user):
+    """Avvalgi UserMiddleware._get_or_create_user (kesh miss qismi)."""
+    full_name = (tg_user.full_name or "").strip()
+    username = tg_user.username
+
+    with transaction.atomic():
+        user, created = TelegramUser.objects.get_or_create(
+            tg_id=tg_user.id,
+            defaults={"full_name": full_name, "username": username},
+        )
+        updated_fields = []
+        if user.full_name != full_name:
+            user.full_name = full_name
+            updated_fields.append("full_name")
+        if user.username != username:
+            user.username = username
+            updated_fields.append("username")
+        if updated_fields:
+            user.save(update_fields=updated_fields + ["updated_at"])
+
+    user_cache.set(user)
+    return user
+
+
+class Command(BaseCommand):
+    help = "Sovuq foydalanuvchi (kesh miss): get_or_create + save + signal va bitta upsert — so'rov va kesh yozuvlari."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+
+    def handle(self, *args, **options):
+        n = options["users"]
+        scenarios = (
+            ("yangi", lambda i: ("Bench User", None)),
+            ("o'zgarmagan", lambda i: ("Bench User", None)),
+            ("o'zgargan", lambda i: ("Bench User 2", f"bench{i}")),
+        )
+        variants = (("legacy", 0, legacy_get_or_create), ("upsert", n, BotUserService.upsert))
+
+        writes = 0
+        original_set = user_cache.set
+
+        def counting_set(user):
+            nonlocal writes
+            writes += 1
+            return original_set(user)
+
+        user_cache.set = counting_set
+        try:
+            # Hamma narsa bitta tranzaksiyada va oxirida rollback — bazada iz qolmaydi
+            with transaction.atomic(), redirect_stdout(io.StringIO()):
+                for label, offset, run in variants:
+                    for scenario, profile in scenarios:
+                        users = [
+                            SimpleNamespace(id=BASE_ID + offset + i, full_name=profile(i)[0], username=profile(i)[1])
+                            for i in range(n)
+                        ]
+                        writes = 0
+                        with CaptureQueriesContext(connection) as queries:
+                            start = time.perf_counter()
+                            for tg_user in users:
+                                run(tg_user)
+                            elapsed = time.perf_counter() - start
+                        self.stdout.write(
+                            f"{label:<7} {scenario:<12} {len(queries) / n:.2f} so'rov/user, "
+                            f"{writes / n:.2f} kesh yozuvi/user, {elapsed * 1000 / n:.3f} ms/user"
+                        )
+                transaction.set_rollback(True)
+        finally:
+            user_cache.set = original_set
+            for i in range(2 * n):
+                user_cache.delete(BASE_ID + i)
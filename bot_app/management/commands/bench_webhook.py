@@ -0,0 +1,105 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from bot_app.core.dedupe import deduplicator
+from bot_app.core.ingest import UpdateIngestor
+from bot_app.core.metrics import metrics, percentiles
+
+BASE_UPDATE_ID = 9_000_000_000   # haqiqiy update_id'lar bilan to'qnashmasin (dedupe bitmap)
+
+
+class Command(BaseCommand):
+    help = ("Sekin handler'lar ostida webhook javob vaqtini o'lchaydi: bir xil update'lar "
+            "`telegram_passenger_bot` view'iga inline va queue rejimda yuboriladi.")
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--handler-delay", type=float, default=0.2, help="handler davomiyligi, sekund")
+        parser.add_argument("--workers", type=int, default=8, help="shard'lar soni")
+        parser.add_argument("--chats", type=int, default=50)
+        parser.add_argument("--queue-size", type=int, default=1000)
+        parser.add_argument("--inline-requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        from bot_app import views  # bot loader + handler'lar
+
+        delay = options["handler_delay"]
+        factory = RequestFactory()
+        ingestor = UpdateIngestor(
+            process=lambda payload: time.sleep(delay),
+            workers=options["workers"],
+            queue_size=options["queue_size"],
+            name="bench_webhook",
+        )
+
+        with self._handlers(views, delay, ingestor):
+            # 1️⃣ Inline: view update'ni parse qiladi va handler tugashini kutadi
+            inline, _ = self._post(views, factory, "inline", self._bodies(0, options["inline_requests"], options))
+            # 2️⃣ Queue: view faqat tekshiradi va navbatga qo'yadi
+            queued, statuses = self._post(
+                views, factory, "queue", self._bodies(options["inline_requests"], options["requests"], options)
+            )
+            depths = ingestor.executor.depths()
+            drain_start = time.perf_counter()
+            drained = ingestor.shutdown(timeout=600)
+            drain_time = time.perf_counter() - drain_start
+
+        self.stdout.write(f"handler delay: {delay * 1000:.0f} ms, workers: {options['workers']}")
+        self.stdout.write(f"inline ack ({len(inline)} req): {percentiles(inline)}")
+        self.stdout.write(f"queue  ack ({len(queued)} req): {percentiles(queued)}")
+        self.stdout.write(f"queue rejected (503): {statuses.count(503)}")
+        self.stdout.write(f"shard depths after burst: {depths}")
+        self.stdout.write(f"drain: {'ok' if drained else 'timeout'} in {drain_time:.2f} s")
+
+        timings = metrics.snapshot()["timings_ms"]
+        for index in range(options["workers"]):
+            wait = timings.get(f"bench_webhook.shard{index}.wait", {})
+            self.stdout.write(f"shard{index}: jobs={wait.get('count', 0)} wait p99={wait.get('p99', 0)} ms")
+
+    @staticmethod
+    def _bodies(offset: int, count: int, options) -> list:
+        return [
+            (BASE_UPDATE_ID + offset + i, json.dumps({
+                "update_id": BASE_UPDATE_ID + offset + i,
+                "message": {
+                    "message_id": i, "date": 0, "text": "/start",
+                    "chat": {"id": i % options["chats"], "type": "private"},
+                    "from": {"id": i % options["chats"], "is_bot": False, "first_name": "bench"},
+                },
+            }).encode())
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def _post(views, factory: RequestFactory, mode: str, bodies: list):
+        samples, statuses = [], []
+        with override_settings(WEBHOOK_MODE=mode):
+            for update_id, body in bodies:
+                request = factory.post("/bot/webhook/", data=body, content_type="application/json")
+                start = time.perf_counter()
+                response = views.telegram_passenger_bot(request)
+                samples.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+                deduplicator.forget(update_id)   # qayta ishga tushirishda dublikat deb tashlanmasin
+        return samples, statuses
+
+    @staticmethod
+    @contextmanager
+    def _handlers(views, delay: float, ingestor: UpdateIngestor):
+        """Bot handler'lari o'rniga `delay` sekund ishlaydigan handler; queue rejim — bench ingestor'i."""
+        bot = views.bot
+        original_process, original_ingestor = bot.process_new_updates, views.ingestor
+
+        def process_new_updates(updates):
+            time.sleep(delay)
+
+        bot.process_new_updates, views.ingestor = process_new_updates, ingestor
+        try:
+            yield
+        finally:
+            bot.process_new_updates, views.ingestor = original_process, original_ingestor
@@ -0,0 +1,32 @@
+import logging
+
+from telebot.states.sync.middleware import StateMiddleware
+
+from bot_app.core.state_unit import StateUnit
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWorkStateMiddleware(StateMiddleware):
+    """
+    telebot `StateMiddleware` o'rniga: handler'larga `StateUnit` beradi va
+    update oxirida holat o'zgarishlarini bitta yozuv bilan saqlaydi.
+    Handler xato bilan tugasa o'zgarishlar yozilmaydi.
+    Storage CAS'ni qo'llamasa (masalan, StateMemoryStorage) — oddiy StateContext.
+    """
+
+    def pre_process(self, message, data):
+        if not hasattr(self.bot.current_states, "compare_and_set"):
+            return super().pre_process(message, data)
+        unit = StateUnit(message, self.bot)
+        data['state_context'] = unit
+        data['state'] = unit
+
+    def post_process(self, message, data, exception):
+        unit = data.get('state')
+        if not isinstance(unit, StateUnit):
+            return
+        if exception is not None:
+            logger.warning("Handler xatosi — holat o'zgarishlari bekor qilindi (%s)", unit.key)
+            return
+        unit.commit()
@@ -1,10 +1,8 @@
-from telebot import BaseMiddleware, ContinueHandling
+from telebot import BaseMiddleware, CancelUpdate, ContinueHandling
 from telebot.types import Message, CallbackQuery
-from django.core.cache import cache
-from django.db import transaction
-from django.conf import settings
-from bot_app.models import TelegramUser
-import time
+from bot_app.core.context import MISSING, begin_update, end_update
+from bot_app.core.prefetch import prefetcher
+from bot_app.repo.user_service import BotUserService
 
 from bot_app.functions.text_sender import send_msg
 
@@ -15,16 +13,15 @@ class UserMiddleware(BaseMiddleware):
     Shu bilan birga, flood (tezkash yozish) nazoratini amalga oshiradi.
     """
 
-    def __init__(self, flood_limit: float):
+    def __init__(self, bot):
         """
-        :param flood_limit: nechta sekundda foydalanuvchi bittadan ortiq so‘rov yuborolmaydi
+        :param bot: TeleBot — holat storage'i (`bot.current_states`) shu yerdan olinadi.
+        Flood chegaralari (burst va to'ldirish tezligi) update turi bo'yicha
+        `settings.FLOOD_LIMITS` da.
         """
         super().__init__()
+        self.bot = bot
         self.update_types = ['message', 'callback_query']
-        self.cache_timeout = settings.CACHE_TIMEOUT  # masalan 3600 sekund
-        self.cache_prefix = "tguser:"
-        self.flood_prefix = "flood:"
-        self.flood_limit = flood_limit  # sekundlarda
 
     # =====================================================
     #                   PRE PROCESS
@@ -33,24 +30,40 @@ class UserMiddleware(BaseMiddleware):
         tg_user = None
         if isinstance(update, Message):
             tg_user = update.from_user
+            kind = "message"
         elif isinstance(update, CallbackQuery):
             tg_user = update.from_user
+            kind = "callback_query"
         else:
             return
 
-        # 1️⃣ Flood nazorat
-        if self._is_flooding(tg_user.id):
+        # 1️⃣ Flood nazorat + kerakli kalitlar — bitta Redis pipeline
+        storage = self.bot.current_states
+        state_key = storage.key_for(update, self.bot.bot_id) if hasattr(storage, "key_for") else None
+        prefetched = prefetcher.fetch(kind, tg_user.id, state_key)
+        if not prefetched.allowed:
             chat_id = getattr(update, "chat", None)
-            if chat_id:
+            if chat_id and prefetched.warn:
+                # Bir marta ogohlantiramiz — keyingi rad etishlar jim
                 send_msg("too_many_requests", update)
-            return  # handler ishlamaydi
+            return CancelUpdate()  # handler ham, post_process ham ishlamaydi
 
-        # 2️⃣ Foydalanuvchini olish yoki yaratish
-        user = self._get_or_create_user(tg_user)
+        # 2️⃣ Foydalanuvchi: keshda bo'lmasa — bazadan olish yoki yaratish
+        if prefetched.user is not None:
+            user = self._refresh_profile(prefetched.user, tg_user)
+        else:
+            user = self._get_or_create_user(tg_user)
         data["user"] = user
+        # 3️⃣ Update konteksti: handler'lar va send/edit foydalanuvchini qayta olmaydi
+        context = begin_update(tg_user.id, user)
+        if prefetched.passenger is not MISSING:
+            context.passenger = prefetched.passenger
+        if prefetched.state is not MISSING:
+            storage.accept(state_key, prefetched.state)
         return ContinueHandling()
 
     def post_process(self, message, data, exception):
+        end_update()
         if exception:
             print(f"[UserMiddleware Error] {exception}")
 
@@ -58,59 +71,16 @@ class UserMiddleware(BaseMiddleware):
     #                   PRIVATE METHODS
     # =====================================================
 
-    def _cache_key(self, tg_id: int) -> str:
-        return f"{self.cache_prefix}{tg_id}"
-
-    def _flood_key(self, tg_id: int) -> str:
-        return f"{self.flood_prefix}{tg_id}"
-
-    def _is_flooding(self, tg_id: int) -> bool:
-        """
-        Foydalanuvchi juda tez xabar yuboryaptimi — shuni aniqlaydi.
-        """
-        key = self._flood_key(tg_id)
-        last_time = cache.get(key)
-        current_time = time.time()
-
-        if last_time and current_time - last_time < self.flood_limit:
-            return True  # flood aniqlangan
-
-        cache.set(key, current_time, timeout=self.flood_limit)
-        return False
+    def _refresh_profile(self, user, tg_user):
+        """Telegram'dagi ism/username o'zgargan bo'lsa — kesh darhol, baza write-behind orqali."""
+        full_name = (tg_user.full_name or "").strip()
+        if user.full_name == full_name and user.username == tg_user.username:
+            return user
+        return BotUserService.update(tg_user.id, full_name=full_name, username=tg_user.username) or user
 
     def _get_or_create_user(self, tg_user):
         """
-        Cache orqali foydalanuvchini topish yoki bazadan olish/yaratish.
+        Keshda topilmagan foydalanuvchini bitta upsert so'rovi bilan olish/yaratish
+        va keshga yozish.
         """
-        tg_id = tg_user.id
-        cache_key = self._cache_key(tg_id)
-
-        cached_user = cache.get(cache_key)
-        if cached_user:
-            return cached_user
-
-        full_name = (tg_user.full_name or "").strip()
-        username = tg_user.username
-
-        with transaction.atomic():
-            user, created = TelegramUser.objects.get_or_create(
-                tg_id=tg_id,
-                defaults={
-                    "full_name": full_name,
-                    "username": username,
-                },
-            )
-
-            updated_fields = []
-            if user.full_name != full_name:
-                user.full_name = full_name
-                updated_fields.append("full_name")
-            if user.username != username:
-                user.username = username
-                updated_fields.append("username")
-
-            if updated_fields:
-                user.save(update_fields=updated_fields + ["updated_at"])
-
-        cache.set(cache_key, user, timeout=self.cache_timeout)
-        return user
+        return BotUserService.upsert(tg_user)
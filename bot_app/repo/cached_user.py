@@ -0,0 +1,110 @@
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from bot_app.models import TelegramUser
+
+# v1: version, id, tg_id, is_blocked, created_at, updated_at (epoch) + 3 ta satr
+_HEADER = struct.Struct("<BqqBdd")
+_LENGTH = struct.Struct("<H")
+_NONE = 0xFFFF
+VERSION = 1
+
+
+class CachedUser:
+    """
+    Keshdagi TelegramUser'ning ixcham, faqat o'qish uchun ko'rinishi.
+
+    Model nusxasini pickle qilish `_state` va barcha maydonlarni olib yuradi;
+    bu yerda faqat kerakli maydonlar, `struct` bilan versiyali binar formatda
+    (~40-80 bayt). Yozish kerak bo'lganda `hydrate()` model qaytaradi.
+    """
+    __slots__ = ("id", "tg_id", "full_name", "username", "language_code", "is_blocked", "created_at", "updated_at")
+
+    def __init__(self, id: int, tg_id: int, full_name: str, username: Optional[str], language_code: Optional[str],
+                 is_blocked: bool, created_at: float, updated_at: float):
+        self.id = id
+        self.tg_id = tg_id
+        self.full_name = full_name
+        self.username = username
+        self.language_code = language_code
+        self.is_blocked = is_blocked
+        self.created_at = created_at    # epoch sekund
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_model(cls, user: TelegramUser) -> "CachedUser":
+        return cls(
+            user.pk, user.tg_id, user.full_name, user.username, user.language_code, user.is_blocked,
+            user.created_at.timestamp() if user.created_at else 0.0,
+            user.updated_at.timestamp() if user.updated_at else 0.0,
+        )
+
+    def hydrate(self) -> TelegramUser:
+        """Saqlash (save) uchun model nusxasi — DB'ga murojaatsiz."""
+        user = TelegramUser(
+            id=self.id,
+            tg_id=self.tg_id,
+            full_name=self.full_name,
+            username=self.username,
+            language_code=self.language_code,
+            is_blocked=self.is_blocked,
+            created_at=datetime.fromtimestamp(self.created_at, tz=timezone.utc),
+            updated_at=datetime.fromtimestamp(self.updated_at, tz=timezone.utc),
+        )
+        user._state.adding = False
+        user._state.db = "default"
+        return user
+
+    def replace(self, **fields) -> "CachedUser":
+        """O'zgartirilgan maydonlar bilan yangi yozuv (updated_at — hozir)."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields, updated_at=time.time())
+        return CachedUser(**values)
+
+    @property
+    def short_name(self) -> str:
+        if self.full_name:
+            return self.full_name.split()[0]
+        if self.username:
+            return f"@{self.username}"
+        return str(self.tg_id)
+
+    def __str__(self) -> str:
+        return self.full_name or self.username or str(self.tg_id)
+
+    # =====================================================
+    #                   ENCODING
+    # =====================================================
+    def encode(self) -> bytes:
+        parts = [_HEADER.pack(VERSION, self.id, self.tg_id, self.is_blocked, self.created_at, self.updated_at)]
+        for value in (self.full_name, self.username, self.language_code):
+            if value is None:
+                parts.append(_LENGTH.pack(_NONE))
+            else:
+                raw = value.encode()
+                parts.append(_LENGTH.pack(len(raw)))
+                parts.append(raw)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> Optional["CachedUser"]:
+        """Noma'lum versiya yoki buzilgan yozuv — None (kesh miss kabi)."""
+        if not data or data[0] != VERSION:
+            return None
+        try:
+            _version, id, tg_id, is_blocked, created_at, updated_at = _HEADER.unpack_from(data)
+            offset = _HEADER.size
+            strings = []
+            for _ in range(3):
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                if length == _NONE:
+                    strings.append(None)
+                else:
+                    strings.append(data[offset:offset + length].decode())
+                    offset += length
+        except (struct.error, UnicodeDecodeError):
+            return None
+        return cls(id, tg_id, strings[0], strings[1], strings[2], bool(is_blocked), created_at, updated_at)
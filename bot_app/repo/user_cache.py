@@ -0,0 +1,167 @@
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock, Thread
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from bot_app.core.metrics import metrics
+from bot_app.repo.cached_user import CachedUser
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+LOCAL_SIZE = getattr(settings, "USER_CACHE_LOCAL_SIZE", 5_000)
+LOCAL_TTL = getattr(settings, "USER_CACHE_LOCAL_TTL", 30)   # sekund
+REDIS_TTL = settings.CACHE_TIMEOUT
+
+
+class TwoTierUserCache:
+    """
+    TelegramUser uchun ikki bosqichli kesh:
+
+    1. jarayon ichidagi LRU (`LOCAL_SIZE` ta, `LOCAL_TTL` sekund) — Redis'ga bormaydi;
+    2. Redis (`tguser:<tg_id>`) — barcha worker'lar uchun umumiy.
+
+    Ikkala bosqichda ham model emas, ixcham `CachedUser` saqlanadi (Redis'da —
+    uning binar kodlangan ko'rinishi, pickle'siz).
+
+    Yozish/o'chirishda `INVALIDATE_CHANNEL`ga tg_id e'lon qilinadi, boshqa
+    jarayonlar o'z LRU'sidan shu yozuvni olib tashlaydi. Pub/sub uzilsa ham
+    eskirish `LOCAL_TTL` bilan cheklangan. Har bir bosqich uchun hit/miss
+    `metrics`da: `user_cache.local.*`, `user_cache.redis.*`.
+    """
+    PREFIX = "tguser:"
+    INVALIDATE_CHANNEL = "tguser:invalidate"
+
+    def __init__(self, local_size: int = LOCAL_SIZE, local_ttl: float = LOCAL_TTL, alias: str = "default"):
+        self.local_size = local_size
+        self.local_ttl = local_ttl
+        self.alias = alias
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = OrderedDict()
+        self._lock = Lock()
+        self._listener = None
+
+    def key(self, tg_id: int) -> str:
+        return f"{self.PREFIX}{tg_id}"
+
+    # =====================================================
+    #                   PUBLIC API
+    # =====================================================
+    @property
+    def conn(self):
+        return get_redis_connection(self.alias)
+
+    def get(self, tg_id: int) -> CachedUser | None:
+        user = self.get_local(tg_id)
+        if user is not None:
+            return user
+        return self.accept(tg_id, self.conn.get(self.key(tg_id)))
+
+    def get_local(self, tg_id: int) -> CachedUser | None:
+        """Faqat jarayon ichidagi bosqich; miss bo'lsa Redis'dan o'qish chaqiruvchida."""
+        self._ensure_listener()
+        user = self._get_local(tg_id)
+        if user is not None:
+            metrics.incr("user_cache.local.hits")
+            return user
+        metrics.incr("user_cache.local.misses")
+        return None
+
+    def accept(self, tg_id: int, raw: bytes | None) -> CachedUser | None:
+        """Redis'dan o'qilgan qiymatni (masalan, prefetch pipeline'idan) dekodlab lokalga yozadi."""
+        user = CachedUser.decode(raw)
+        if user is None:
+            metrics.incr("user_cache.redis.misses")
+            return None
+        metrics.incr("user_cache.redis.hits")
+        self._set_local(tg_id, user)
+        return user
+
+    def set(self, user) -> CachedUser:
+        """TelegramUser yoki CachedUser'ni ikkala bosqichga yozadi."""
+        record = user if isinstance(user, CachedUser) else CachedUser.from_model(user)
+        self.conn.set(self.key(record.tg_id), record.encode(), ex=REDIS_TTL)
+        self._set_local(record.tg_id, record)
+        self._publish(record.tg_id)
+        return record
+
+    def delete(self, tg_id: int):
+        self.conn.delete(self.key(tg_id))
+        self.evict_local(tg_id)
+        self._publish(tg_id)
+
+    def evict_local(self, tg_id: int):
+        with self._lock:
+            self._local.pop(tg_id, None)
+
+    def hit_ratios(self) -> dict:
+        ratios = {}
+        for tier in ("local", "redis"):
+            hits = metrics.counter(f"user_cache.{tier}.hits")
+            total = hits + metrics.counter(f"user_cache.{tier}.misses")
+            ratios[tier] = round(hits / total, 4) if total else None
+        return ratios
+
+    # =====================================================
+    #                   LOCAL TIER
+    # =====================================================
+    def _get_local(self, tg_id: int):
+        with self._lock:
+            entry = self._local.get(tg_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._local[tg_id]
+                return None
+            self._local.move_to_end(tg_id)
+            return user
+
+    def _set_local(self, tg_id: int, user):
+        with self._lock:
+            self._local[tg_id] = (time.monotonic() + self.local_ttl, user)
+            self._local.move_to_end(tg_id)
+            if len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    # =====================================================
+    #                   INVALIDATION
+    # =====================================================
+    def _publish(self, tg_id: int):
+        try:
+            self.conn.publish(self.INVALIDATE_CHANNEL, f"{self.origin}:{tg_id}")
+        except Exception as e:
+            logger.warning("tguser invalidatsiya xabari yuborilmadi: %s", e)
+
+    def _ensure_listener(self):
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = Thread(target=self._listen, name="user-cache-invalidate", daemon=True)
+                    self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.conn.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.INVALIDATE_CHANNEL)
+                # Qayta ulanishgacha o'tkazib yuborilgan xabarlar bo'lishi mumkin
+                with self._lock:
+                    self._local.clear()
+                for message in pubsub.listen():
+                    data = message["data"]
+                    origin, _, tg_id = (data.decode() if isinstance(data, bytes) else data).rpartition(":")
+                    if origin != self.origin:
+                        self.evict_local(int(tg_id))
+            except Exception as e:
+                logger.warning("tguser invalidatsiya kanali uzildi: %s", e)
+                time.sleep(5)
+
+
+# Singleton instance
+user_cache = TwoTierUserCache()
@@ -1,7 +1,11 @@
 from telebot.types import Message
-from django.core.cache import cache
-from django.db import transaction, IntegrityError
+from django.db import connection, transaction, IntegrityError
+from django.utils import timezone
+from bot_app.core.context import context_user, set_context_user
 from bot_app.models import TelegramUser
+from bot_app.repo.cached_user import CachedUser
+from bot_app.repo.user_cache import user_cache
+from bot_app.repo.user_writer import user_writer
 from django.conf import settings
 
 
@@ -28,26 +32,28 @@ class BotUserService(TelegramUser):
         return f"{cls.CACHE_PREFIX}{tg_id}"
 
     @classmethod
-    def _set_cache(cls, user: TelegramUser):
-        """Foydalanuvchini cache’ga yozadi."""
-        cache.set(cls._get_cache_key(user.tg_id), user, timeout=cls.CACHE_TIMEOUT)
+    def _set_cache(cls, user: TelegramUser) -> CachedUser:
+        """Foydalanuvchini cache’ga yozadi (lokal LRU + Redis) va joriy update kontekstiga."""
+        record = user_cache.set(user)
+        set_context_user(record)
+        return record
 
     @classmethod
     def _get_from_cache(cls, tg_id: int):
-        """Cache’dan foydalanuvchini olish."""
-        return cache.get(cls._get_cache_key(tg_id))
+        """Cache’dan foydalanuvchini olish (avval lokal LRU, keyin Redis)."""
+        return user_cache.get(tg_id)
 
     @classmethod
     def _delete_cache(cls, tg_id: int):
-        """Cache’dan foydalanuvchini o‘chirish."""
-        cache.delete(cls._get_cache_key(tg_id))
+        """Cache’dan foydalanuvchini o‘chirish (barcha worker'larda)."""
+        user_cache.delete(tg_id)
 
     # ==========================================================
     # 🧱 CREATE
     # ==========================================================
 
     @classmethod
-    def create(cls, msg: Message) -> TelegramUser:
+    def create(cls, msg: Message) -> TelegramUser | CachedUser:
         """Yangi foydalanuvchini yaratadi (agar mavjud bo‘lmasa)."""
         telegram_user = msg.from_user
 
@@ -75,25 +81,70 @@ class BotUserService(TelegramUser):
         return user
 
     # ==========================================================
-    # ✏️ UPDATE
+    # 🔁 UPSERT
     # ==========================================================
 
     @classmethod
-    def update(cls, tg_id: int, **kwargs) -> TelegramUser | None:
-        """Foydalanuvchini ma’lumotlarini yangilaydi."""
-        user = cls._get_from_cache(tg_id) or cls.objects.filter(tg_id=tg_id).first()
-        if not user:
-            return None
+    def upsert(cls, telegram_user) -> CachedUser:
+        """
+        Keshda topilmagan foydalanuvchini bitta so'rov bilan yaratadi yoki
+        ismi/username'i o'zgargan bo'lsa yangilaydi:
+        `INSERT ... ON CONFLICT (tg_id) DO UPDATE ... WHERE o'zgargan RETURNING`.
+
+        `save()` chaqirilmaydi — post_save signali ishlamaydi, keshga bir marta yoziladi.
+        O'zgarmagan yozuv uchun RETURNING bo'sh, shunda oddiy SELECT.
+        """
+        tg_id = telegram_user.id
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        # language_code bo'sh qoladi — til foydalanuvchi tanlaganda yoziladi
+        params = [tg_id, (telegram_user.full_name or "").strip(), telegram_user.username, None, False, now, now]
+        rows = list(cls.objects.raw(cls._upsert_sql(), params))
+        user = rows[0] if rows else cls.objects.filter(tg_id=tg_id).first()
+        return cls._set_cache(user)
+
+    @classmethod
+    def _upsert_sql(cls) -> str:
+        qn = connection.ops.quote_name
+        table = qn(cls._meta.db_table)
+        # NULL'ni ham to'g'ri solishtirish: SQLite'da `IS NOT`, PostgreSQL'da `IS DISTINCT FROM`
+        distinct = "IS NOT" if connection.vendor == "sqlite" else "IS DISTINCT FROM"
+        columns = ["tg_id", "full_name", "username", "language_code", "is_blocked", "created_at", "updated_at"]
+        returning = ", ".join(qn(f.column) for f in cls._meta.concrete_fields)
+        changed = " OR ".join(
+            f"{table}.{qn(column)} {distinct} excluded.{qn(column)}" for column in ("full_name", "username")
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({qn('tg_id')}) DO UPDATE SET "
+            f"{qn('full_name')} = excluded.{qn('full_name')}, "
+            f"{qn('username')} = excluded.{qn('username')}, "
+            f"{qn('updated_at')} = excluded.{qn('updated_at')} "
+            f"WHERE {changed} "
+            f"RETURNING {returning}"
+        )
 
-        updated_fields = []
-        for key, value in kwargs.items():
-            if hasattr(user, key) and getattr(user, key) != value:
-                setattr(user, key, value)
-                updated_fields.append(key)
+    # ==========================================================
+    # ✏️ UPDATE
+    # ==========================================================
 
-        if updated_fields:
-            user.save(update_fields=updated_fields + ["updated_at"])
-            cls._set_cache(user)
+    @classmethod
+    def update(cls, tg_id: int, **kwargs) -> CachedUser | None:
+        """
+        Foydalanuvchi ma’lumotlarini yangilaydi: kesh darhol, baza — write-behind
+        buffer orqali (faqat o'zgargan maydonlar, bir necha sekund ichida).
+        """
+        user = context_user(tg_id) or cls._get_from_cache(tg_id)
+        if user is None:
+            model = cls.objects.filter(tg_id=tg_id).first()
+            if not model:
+                return None
+            user = CachedUser.from_model(model)
+
+        changes = {key: value for key, value in kwargs.items() if getattr(user, key, None) != value}
+        if changes:
+            user_writer.submit(tg_id, user.id, **changes)
+            user = cls._set_cache(user.replace(**changes))
 
         return user
 
@@ -102,14 +153,18 @@ class BotUserService(TelegramUser):
     # ==========================================================
 
     @classmethod
-    def get(cls, tg_id: int) -> TelegramUser | None:
-        """Foydalanuvchini cache’dan yoki bazadan olish."""
+    def get(cls, tg_id: int) -> CachedUser | None:
+        """Foydalanuvchini update kontekstidan, cache’dan yoki bazadan olish."""
+        if user := context_user(tg_id):
+            return user
+
         if cached := cls._get_from_cache(tg_id):
+            set_context_user(cached)
             return cached
 
         user = cls.objects.filter(tg_id=tg_id).first()
         if user:
-            cls._set_cache(user)
+            return cls._set_cache(user)
         return user
 
     # ==========================================================
@@ -0,0 +1,141 @@
+import atexit
+import logging
+import time
+from collections import defaultdict
+from threading import Condition, Thread
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from bot_app.core.metrics import metrics
+from bot_app.models import TelegramUser
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+FLUSH_INTERVAL = getattr(settings, "USER_WRITE_BEHIND_INTERVAL", 1.0)  # sekund
+MAX_BATCH = getattr(settings, "USER_WRITE_BEHIND_MAX_BATCH", 500)
+WRITABLE_FIELDS = ("full_name", "username", "language_code", "is_blocked")
+
+
+class PendingWrite:
+    __slots__ = ("pk", "fields", "since")
+
+    def __init__(self, pk: int, since: float):
+        self.pk = pk
+        self.fields: Dict[str, object] = {}
+        self.since = since   # birinchi yozilmagan o'zgarish vaqti (lag uchun)
+
+
+class UserWriteBehind:
+    """
+    TelegramUser profil o'zgarishlari uchun write-behind buffer.
+
+    `submit` faqat xotiradagi buffer'ga yozadi (so'rov yo'lida DB yo'q); bitta
+    tg_id'ning o'zgarishlari maydon bo'yicha birlashtiriladi — oxirgi yozgan
+    yutadi. Fon thread'i har `FLUSH_INTERVAL` da (yoki `MAX_BATCH` to'lganda)
+    yozuvlarni maydonlar to'plami bo'yicha guruhlab `bulk_update` qiladi —
+    faqat o'zgargan ustunlar yoziladi, boshqa o'zgarishlar ustidan yozilmaydi.
+    Jarayon tugashida (atexit) qolgan buffer yoziladi.
+
+    Keshni chaqiruvchi o'zi yangilaydi; buffer faqat DB uchun.
+    """
+
+    def __init__(self, interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH):
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: Dict[int, PendingWrite] = {}
+        self._cond = Condition()
+        self._thread = None
+        self._running = True
+
+    # =====================================================
+    #                   PUBLIC API
+    # =====================================================
+    def submit(self, tg_id: int, pk: int, **fields):
+        unknown = set(fields) - set(WRITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Write-behind uchun ruxsat etilmagan maydonlar: {sorted(unknown)}")
+        with self._cond:
+            self._ensure_thread()
+            entry = self._pending.get(tg_id)
+            if entry is None:
+                entry = self._pending[tg_id] = PendingWrite(pk, time.monotonic())
+            entry.fields.update(fields)
+            entry.fields["updated_at"] = timezone.now()
+            metrics.gauge("user_writes.pending", len(self._pending))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Buffer'dagi barcha o'zgarishlarni hozir yozadi. Yozilgan foydalanuvchilar soni."""
+        with self._cond:
+            batch, self._pending = self._pending, {}
+            metrics.gauge("user_writes.pending", 0)
+        if not batch:
+            return 0
+        try:
+            self._write(batch)
+        except Exception as e:
+            logger.exception("TelegramUser write-behind yozilmadi, keyinroq qayta urinamiz: %s", e)
+            metrics.incr("user_writes.errors")
+            self._restore(batch)
+            return 0
+        return len(batch)
+
+    def shutdown(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    # =====================================================
+    #                   INTERNALS
+    # =====================================================
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._loop, name="user-write-behind", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            with self._cond:
+                self._cond.wait(self.interval)
+            if not self._running:
+                break
+            close_old_connections()
+            self.flush()
+
+    @staticmethod
+    def _write(batch: Dict[int, PendingWrite]):
+        groups: Dict[tuple, List[TelegramUser]] = defaultdict(list)
+        for tg_id, entry in batch.items():
+            user = TelegramUser(pk=entry.pk, tg_id=tg_id, **entry.fields)
+            groups[tuple(sorted(entry.fields))].append(user)
+
+        for fields, users in groups.items():
+            TelegramUser.objects.bulk_update(users, fields, batch_size=MAX_BATCH)
+        now = time.monotonic()
+        for entry in batch.values():
+            metrics.observe("user_writes.lag", now - entry.since)
+        metrics.gauge("user_writes.batch_size", len(batch))
+        metrics.incr("user_writes.flushed", len(batch))
+        metrics.incr("user_writes.batches")
+
+    def _restore(self, batch: Dict[int, PendingWrite]):
+        """Yozilmagan o'zgarishlarni qaytaradi; shu orada kelgan yangiroq qiymatlar ustun."""
+        with self._cond:
+            for tg_id, entry in batch.items():
+                newer = self._pending.get(tg_id)
+                if newer is not None:
+                    entry.fields.update(newer.fields)
+                self._pending[tg_id] = entry
+
+
+# Singleton instance
+user_writer = UserWriteBehind()
+atexit.register(user_writer.shutdown)
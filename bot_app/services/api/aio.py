@@ -0,0 +1,217 @@
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import logging
+import time
+from threading import Lock, Thread, get_ident
+from urllib.parse import urlsplit
+
+import aiohttp
+from django.conf import settings
+
+from bot_app.core.metrics import metrics
+from .transport import (
+    BACKOFF, CONNECT_TIMEOUT, IDEMPOTENT_METHODS, MAX_RETRIES, POOL_SIZE, READ_TIMEOUT, RETRY_STATUSES,
+    CircuitOpenError, api_transport,
+)
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+CONCURRENCY = getattr(settings, "API_ASYNC_CONCURRENCY", 32)   # jarayon bo'yicha bir vaqtdagi so'rovlar
+SHUTDOWN_TIMEOUT = 5                                          # sekund
+
+
+class APIResponse:
+    """O'qib bo'lingan javob — `requests.Response`ning client'larga kerakli qismi."""
+    __slots__ = ("status_code", "text")
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncAPITransport:
+    """
+    Async client'lar uchun umumiy aiohttp transport.
+
+    Bot sinxron (telebot worker thread'larida ishlaydi), shuning uchun
+    jarayonda bitta fon event loop'i ochiladi; handler'lar `run()`/`gather()`
+    orqali coroutine'larni shu loop'ga topshirib, natijani kutadi.
+
+    - bitta `ClientSession`, `TCPConnector(limit=POOL_SIZE)` — keep-alive pool;
+    - `CONCURRENCY` — barcha thread'lar bo'yicha bir vaqtdagi so'rovlar chegarasi;
+    - timeout, retry (ulanish xatolari; 502/503/504 faqat idempotent metodlarda)
+      va circuit breaker sinxron `api_transport` bilan bir xil — breaker'lar
+      ham o'sha: host ishlamasa ikkala yo'l ham darhol `CircuitOpenError` oladi.
+
+    Loop va session birinchi so'rovda yaratiladi (gunicorn fork'idan keyin).
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, concurrency: int = CONCURRENCY,
+                 connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, backoff: float = BACKOFF, name: str = "api.aio"):
+        self.name = name
+        self.pool_size = pool_size
+        self.concurrency = concurrency
+        # connect — pool'dan ulanish kutish + DNS + TCP/TLS; total — bitta urinishning chegarasi
+        self.timeout = aiohttp.ClientTimeout(
+            total=connect_timeout + read_timeout, connect=connect_timeout,
+            sock_connect=connect_timeout, sock_read=read_timeout,
+        )
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Retry'lar bilan bitta so'rovning eng uzun vaqti — `run()`ning standart kutish chegarasi
+        self.deadline = sum(connect_timeout + read_timeout + backoff * 2 ** attempt
+                            for attempt in range(max_retries + 1))
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._lock = Lock()
+
+    # =====================================================
+    #                   THREAD -> LOOP
+    # =====================================================
+    def run(self, coro, timeout: float = None):
+        """
+        Coroutine'ni fon loop'ida bajaradi va natijasini qaytaradi (chaqiruvchi
+        thread kutadi). Kutish har doim cheklangan — `timeout` berilmasa
+        `deadline`; vaqt tugasa coroutine bekor qilinadi va `TimeoutError`.
+        """
+        loop = self._ensure_loop()
+        if get_ident() == self._thread.ident:
+            coro.close()
+            raise RuntimeError("AsyncAPITransport.run() loop thread'ining o'zidan chaqirildi — await qiling")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(self.deadline if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            metrics.incr(f"{self.name}.timeouts")
+            raise
+
+    def gather(self, *coros, timeout: float = None) -> list:
+        """Bir nechta so'rovni parallel bajaradi; natijalar berilgan tartibda."""
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather(), timeout)
+
+    # =====================================================
+    #                   HTTP
+    # =====================================================
+    async def request(self, method: str, url: str, params: dict = None, json: dict = None,
+                      headers: dict = None) -> APIResponse:
+        breaker = api_transport.breaker(url)
+        if not breaker.allow():
+            metrics.incr(f"{self.name}.circuit_rejected")
+            raise CircuitOpenError(f"Circuit open: {urlsplit(url).netloc}")
+
+        probe = breaker.is_open
+        try:
+            return await self._request(breaker, method, url, self._clean_params(params), json, headers)
+        except BaseException:
+            # Bekor qilingan (run() timeout) yoki kutilmagan xato bilan tugagan sinov
+            # so'rovi breaker'ni half-open holatda qotirib qo'ymasin
+            if probe:
+                breaker.release()
+            raise
+
+    async def _request(self, breaker, method: str, url: str, params: dict = None, json: dict = None,
+                       headers: dict = None) -> APIResponse:
+        session = self._ensure_session()
+        retry_status = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            started_at = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.request(method, url, params=params, json=json, headers=headers) as resp:
+                        response = APIResponse(resp.status, await resp.text())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.incr(f"{self.name}.errors")
+                # Ulanib bo'lmagan so'rov serverga yetmagan — har qanday metodda qayta yuboriladi
+                retryable = retry_status or isinstance(e, aiohttp.ClientConnectorError)
+                if not retryable or attempt >= self.max_retries:
+                    self._failed(breaker, url)
+                    raise
+            else:
+                if not (retry_status and response.status_code in RETRY_STATUSES and attempt < self.max_retries):
+                    if response.status_code >= 500:
+                        self._failed(breaker, url)
+                    else:
+                        breaker.record_success()
+                    return response
+            finally:
+                metrics.incr(f"{self.name}.requests")
+                metrics.observe(f"{self.name}.latency", time.perf_counter() - started_at)
+
+            metrics.incr(f"{self.name}.retries")
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def shutdown(self):
+        """Session'ni yopadi va loop'ni to'xtatadi (atexit)."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(SHUTDOWN_TIMEOUT)
+            except Exception as e:
+                logger.warning("aiohttp session yopilmadi: %s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(SHUTDOWN_TIMEOUT)
+        self._session = None
+
+    # =====================================================
+    #                   PRIVATE
+    # =====================================================
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = Thread(target=self._serve, args=(loop,), name="api-aio-loop", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        # Faqat loop thread'ida chaqiriladi — lock kerak emas
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    @staticmethod
+    def _clean_params(params: dict = None) -> dict | None:
+        """requests bilan bir xil: None qiymatlar tashlanadi, bool — 'True'/'False'."""
+        if not params:
+            return None
+        return {key: str(value) if isinstance(value, bool) else value
+                for key, value in params.items() if value is not None}
+
+    def _failed(self, breaker, url: str):
+        if breaker.record_failure():
+            metrics.incr(f"{self.name}.circuit_opened")
+            logger.warning("API circuit ochildi: %s (%s s)", urlsplit(url).netloc, breaker.reset_timeout)
+
+
+# Singleton instance
+aio_transport = AsyncAPITransport()
+atexit.register(aio_transport.shutdown)
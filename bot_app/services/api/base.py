@@ -0,0 +1,104 @@
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import requests
+from django.conf import settings
+
+from .aio import aio_transport
+from .transport import CircuitOpenError, api_transport
+
+
+class APIClient:
+    """
+    ridemain API client'lari uchun umumiy asos: so'rovni tayyorlash va
+    javob/xatoni lug'atga aylantirish bir joyda — sinxron va async
+    variantlar bir xil natija qaytaradi.
+
+    Voris client `PATH`, `USER_AGENT`, `METHODS` va `OK_STATUSES`ni beradi.
+    """
+    PATH = ""
+    USER_AGENT = "Client/1.0"
+    METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+    OK_STATUSES = (200, 201)
+
+    def __init__(self):
+        self.host = getattr(settings, 'API_HOST', 'http://127.0.0.1:8001')
+        self.version = getattr(settings, 'API_VERSION', 'api/v1')
+        self.base_url = f"{self.host}/{self.version}/{self.PATH}"
+
+    def _make_request(self, method: str, endpoint: str = "", data: Dict = None, params: Dict = None) -> Dict:
+        """API so'rovini amalga oshirish"""
+        request, error = self._prepare(method, endpoint, data, params)
+        if error:
+            return error
+        verb, url, kwargs = request
+        try:
+            return self._to_dict(api_transport.request(verb, url, **kwargs))
+        except Exception as e:
+            return self._error(e)
+
+    def _prepare(self, method: str, endpoint: str, data: Dict = None,
+                 params: Dict = None) -> Tuple[Optional[tuple], Optional[Dict]]:
+        """((metod, url, kwargs), None) yoki (None, xato lug'ati)."""
+        verb = method.upper()
+        if verb not in self.METHODS:
+            return None, {'success': False, 'error': f'Unsupported method: {method}'}
+
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': self.USER_AGENT,
+        }
+        kwargs = {
+            'params': params if verb == 'GET' else None,
+            'json': data if verb in ('POST', 'PUT', 'PATCH') else None,
+            'headers': headers,
+        }
+        return (verb, f"{self.base_url}{endpoint}", kwargs), None
+
+    def _to_dict(self, response) -> Dict:
+        """`requests.Response` yoki `APIResponse` -> client natijasi."""
+        if response.status_code in self.OK_STATUSES:
+            if response.status_code == 204:  # No content
+                return {'success': True, 'message': 'Successfully deleted'}
+            return response.json()
+        return {
+            'success': False,
+            'error': f'HTTP {response.status_code}: {response.text}',
+            'status_code': response.status_code
+        }
+
+    @staticmethod
+    def _error(e: Exception) -> Dict:
+        """requests va aiohttp xatolarini bir xil lug'atga aylantiradi."""
+        if isinstance(e, CircuitOpenError):
+            return {'success': False, 'error': 'Service unavailable'}
+        if isinstance(e, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+            return {'success': False, 'error': 'Request timeout'}
+        if isinstance(e, (requests.exceptions.ConnectionError, aiohttp.ClientConnectionError)):
+            return {'success': False, 'error': 'Connection error'}
+        if isinstance(e, (requests.exceptions.RequestException, aiohttp.ClientError)):
+            return {'success': False, 'error': f'Request exception: {str(e)}'}
+        if isinstance(e, json.JSONDecodeError):
+            return {'success': False, 'error': 'Invalid JSON response'}
+        return {'success': False, 'error': f'Unexpected error: {str(e)}'}
+
+
+class AsyncAPIClientMixin:
+    """
+    Client'ning async varianti: public metodlar o'sha, faqat natija `await`
+    qilinadi. So'rov umumiy `aio_transport` orqali, tayyorlash va javobni
+    o'girish `APIClient` bilan bir xil.
+    """
+
+    async def _make_request(self, method: str, endpoint: str = "", data: Dict = None, params: Dict = None) -> Dict:
+        """API so'rovini amalga oshirish (async)"""
+        request, error = self._prepare(method, endpoint, data, params)
+        if error:
+            return error
+        verb, url, kwargs = request
+        try:
+            return self._to_dict(await aio_transport.request(verb, url, **kwargs))
+        except Exception as e:
+            return self._error(e)
@@ -1,88 +1,15 @@
-import json
-import requests
-from django.conf import settings
 from typing import Dict, List, Optional
 
-class PassengerAPIClient:
+from .base import APIClient, AsyncAPIClientMixin
+
+class PassengerAPIClient(APIClient):
     """
     Passenger API bilan ishlash uchun client class
     """
 
-    def __init__(self):
-        self.host = getattr(settings, 'API_HOST', 'http://127.0.0.1:8001')
-        self.version = getattr(settings, 'API_VERSION', 'api/v1')
-        self.base_url = f"{self.host}/{self.version}/journey/passengers/"
-        self.timeout = getattr(settings, 'API_TIMEOUT', 30)
-
-    def _make_request(self, method: str, endpoint: str = "", data: Dict = None, params: Dict = None) -> Dict:
-        """API so'rovini amalga oshirish"""
-        url = f"{self.base_url}{endpoint}"
-
-        try:
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'PassengerClient/1.0'
-            }
-
-            if method.upper() == 'GET':
-                response = requests.get(
-                    url,
-                    params=params,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'POST':
-                response = requests.post(
-                    url,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'PUT':
-                response = requests.put(
-                    url,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'PATCH':
-                response = requests.patch(
-                    url,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'DELETE':
-                response = requests.delete(
-                    url,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            else:
-                return {'success': False, 'error': f'Unsupported method: {method}'}
-
-            # Response ni tekshirish
-            if response.status_code in [200, 201, 204]:
-                if response.status_code == 204:  # No content
-                    return {'success': True, 'message': 'Successfully deleted'}
-                return response.json()
-            else:
-                return {
-                    'success': False,
-                    'error': f'HTTP {response.status_code}: {response.text}',
-                    'status_code': response.status_code
-                }
-
-        except requests.exceptions.Timeout:
-            return {'success': False, 'error': 'Request timeout'}
-        except requests.exceptions.ConnectionError:
-            return {'success': False, 'error': 'Connection error'}
-        except requests.exceptions.RequestException as e:
-            return {'success': False, 'error': f'Request exception: {str(e)}'}
-        except json.JSONDecodeError:
-            return {'success': False, 'error': 'Invalid JSON response'}
-        except Exception as e:
-            return {'success': False, 'error': f'Unexpected error: {str(e)}'}
+    PATH = "journey/passengers/"
+    USER_AGENT = "PassengerClient/1.0"
+    OK_STATUSES = (200, 201, 204)
 
     def create_passenger(
         self,
@@ -283,5 +210,13 @@ class PassengerAPIClient:
         return self._make_request('POST', 'bulk-update-status/', data=data)
 
 
+class AsyncPassengerAPIClient(AsyncAPIClientMixin, PassengerAPIClient):
+    """
+    `PassengerAPIClient`ning async varianti — metodlar bir xil, faqat natija
+    `await` qilinadi: `await async_passenger_client.get_passenger(tg_id)`.
+    """
+
+
 # Singleton instance
-passenger_client = PassengerAPIClient()
\ No newline at end of file
+passenger_client = PassengerAPIClient()
+async_passenger_client = AsyncPassengerAPIClient()
\ No newline at end of file
@@ -0,0 +1,172 @@
+import logging
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from bot_app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+POOL_SIZE = getattr(settings, "API_POOL_SIZE", 16)                  # har bir host uchun ochiq ulanishlar
+CONNECT_TIMEOUT = getattr(settings, "API_CONNECT_TIMEOUT", 3.05)    # sekund
+READ_TIMEOUT = getattr(settings, "API_READ_TIMEOUT", 10)            # sekund
+MAX_RETRIES = getattr(settings, "API_MAX_RETRIES", 2)
+BACKOFF = getattr(settings, "API_RETRY_BACKOFF", 0.2)              # 0.2, 0.4, ... sekund
+BREAKER_THRESHOLD = getattr(settings, "API_BREAKER_THRESHOLD", 5)   # ketma-ket xatolar
+BREAKER_RESET = getattr(settings, "API_BREAKER_RESET", 30)          # sekund, ochiq holatda
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Host vaqtincha o'chirilgan (circuit breaker ochiq) — so'rov yuborilmadi."""
+
+
+class CircuitBreaker:
+    """
+    Host bo'yicha oddiy circuit breaker.
+
+    `threshold` ta ketma-ket xato (ulanish, timeout, 5xx) — ochiq holat:
+    `reset_timeout` davomida so'rovlar darhol rad etiladi. Keyin bitta sinov
+    so'rovi o'tkaziladi (half-open): muvaffaqiyatli bo'lsa yopiladi.
+    Sinov natijasiz tugasa (bekor qilindi, kutilmagan xato) — `release`:
+    aks holda `_probing` qolib ketib, host butunlay yopilib qoladi.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset_timeout: float = BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True   # half-open: faqat bitta sinov so'rovi
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """Sinov so'rovi natijasiz tugadi — keyingi so'rov yana sinov bo'la oladi."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Xatoni qayd etadi; breaker shu xato bilan ochilgan bo'lsa — True."""
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_at is not None
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+            return not was_open and self._opened_at is not None
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+
+class APITransport:
+    """
+    ridemain API client'lari uchun umumiy HTTP transport.
+
+    - bitta `requests.Session`, `HTTPAdapter` host bo'yicha keep-alive pool
+      (`pool_maxsize=POOL_SIZE`) — har so'rovga yangi TLS ulanish yo'q;
+    - alohida connect/read timeout (avvalgi `API_TIMEOUT = 3600` o'rniga);
+    - urllib3 `Retry`: ulanish xatolari va 502/503/504 — backoff bilan, javob
+      o'qish va status bo'yicha qayta urinish faqat idempotent metodlarda;
+    - host bo'yicha `CircuitBreaker`: API ishlamay qolsa worker'lar timeout
+      kutib qolmaydi, `CircuitOpenError` darhol qaytadi.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF, name: str = "api.http"):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=self.retry)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._breakers = {}
+        self._lock = Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker()
+            return breaker
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            metrics.incr(f"{self.name}.circuit_rejected")
+            raise CircuitOpenError(f"Circuit open: {urlsplit(url).netloc}")
+
+        probe = breaker.is_open
+        kwargs.setdefault("timeout", self.timeout)
+        started_at = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.incr(f"{self.name}.errors")
+            self._failed(breaker, url)
+            raise
+        except BaseException:
+            # Host haqida hech narsa bilinmadi — sinov so'rovini bo'shatamiz
+            if probe:
+                breaker.release()
+            raise
+        finally:
+            metrics.incr(f"{self.name}.requests")
+            metrics.observe(f"{self.name}.latency", time.perf_counter() - started_at)
+
+        if response.status_code >= 500:
+            self._failed(breaker, url)
+        else:
+            breaker.record_success()
+        return response
+
+    def connections(self) -> int:
+        """Shu paytgacha ochilgan ulanishlar soni."""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def close(self):
+        self.session.close()
+
+    def _failed(self, breaker: CircuitBreaker, url: str):
+        if breaker.record_failure():
+            metrics.incr(f"{self.name}.circuit_opened")
+            logger.warning("API circuit ochildi: %s (%s s)", urlsplit(url).netloc, breaker.reset_timeout)
+
+
+# Singleton instance
+api_transport = APITransport()
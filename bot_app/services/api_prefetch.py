@@ -0,0 +1,75 @@
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from bot_app.core.context import MISSING, context_locations, set_context_locations
+from bot_app.core.metrics import metrics
+from bot_app.functions.get_place import cached_place, fetch_place, remember_place
+from bot_app.services.api.aio import aio_transport
+from bot_app.services.api.passenger_service import async_passenger_client
+from bot_app.services.location_service import async_location_client
+from bot_app.services.passenger_manager import passenger_manager
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+TIMEOUT = getattr(settings, "API_PREFETCH_TIMEOUT", 15)   # sekund — handler thread shundan ortiq kutmaydi
+
+
+class APIPrefetcher:
+    """
+    Handler'ga kerak bo'ladigan tashqi API ma'lumotlarini parallel oladi:
+    yo'lovchi, oldingi manzillar va koordinatadan manzil (geocode).
+
+    Kontekst/keshda borlari qayta so'ralmaydi; qolganlari async client'lar
+    orqali bitta `aio_transport.gather` bilan — update kechikishi so'rovlar
+    yig'indisi emas, eng sekinining vaqti. Natijalar update kontekstiga va
+    keshga yoziladi, shuning uchun `passenger_manager.get_passenger`,
+    `user_locations` keyin tarmoqqa chiqmaydi.
+    """
+
+    def fetch(self, tg_id: int, passenger: bool = False, locations: bool = False,
+              coords: Optional[Tuple[float, float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Kerakli ma'lumotlarni oladi; `coords` berilgan bo'lsa — manzilni qaytaradi
+        (geocode ishlamasa None). Hammasi ko'pi bilan `TIMEOUT` sekund.
+        """
+        place = cached_place(*coords) if coords is not None else None
+        jobs = []
+        if passenger and passenger_manager.cached_passenger(tg_id) is MISSING:
+            jobs.append((async_passenger_client.get_passenger(tg_id),
+                         lambda result: passenger_manager.remember_passenger(tg_id, result)))
+        if locations and context_locations(tg_id) is MISSING:
+            jobs.append((async_location_client.get_user_locations(tg_id),
+                         lambda result: set_context_locations(tg_id, result)))
+        if coords is not None and place is None:
+            jobs.append((fetch_place(*coords), lambda result: self._remember_place(coords, result)))
+        if not jobs:
+            return place
+
+        started_at = time.perf_counter()
+        try:
+            results = aio_transport.gather(*(coro for coro, _ in jobs), timeout=TIMEOUT)
+        except Exception as e:
+            # Fail open: handler'lar sinxron client'lar bilan o'zi so'raydi
+            logger.warning("API prefetch bajarilmadi: %s", e)
+            return place
+        finally:
+            metrics.observe("api_prefetch.latency", time.perf_counter() - started_at)
+            metrics.incr("api_prefetch.requests", len(jobs))
+
+        for (_, accept), result in zip(jobs, results):
+            accept(result)
+        return results[-1] if coords is not None and place is None else place
+
+    @staticmethod
+    def _remember_place(coords: Tuple[float, float], place: Optional[Dict[str, Any]]):
+        # Geocode xatosi (None) keshlanmaydi — handler sinxron so'rov bilan qayta urinadi
+        if place is not None:
+            remember_place(*coords, place)
+
+
+# Singleton instance
+api_prefetcher = APIPrefetcher()
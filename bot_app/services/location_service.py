@@ -1,74 +1,17 @@
-import json
-
-import requests
-from django.conf import settings
 from typing import Dict, Optional
 
+from bot_app.core.context import MISSING, context_locations, set_context_locations
+from bot_app.services.api.base import APIClient, AsyncAPIClientMixin
+
 
-class LocationAPIClient:
+class LocationAPIClient(APIClient):
     """
     Location API bilan ishlash uchun client class
     """
 
-    def __init__(self):
-        self.host = getattr(settings, 'API_HOST', 'http://127.0.0.1:8001')
-        self.version = getattr(settings, 'API_VERSION', 'api/v1')
-        self.base_url = f"{self.host}/{self.version}/journey/locations/"
-        self.timeout = getattr(settings, 'API_TIMEOUT', 3600)
-
-    def _make_request(self, method: str, endpoint: str = "", data: Dict = None, params: Dict = None) -> Dict:
-        """API so'rovini amalga oshirish"""
-        url = f"{self.base_url}{endpoint}"
-
-        try:
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'LocationClient/1.0'
-            }
-
-            if method.upper() == 'GET':
-                response = requests.get(
-                    url,
-                    params=params,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'POST':
-                response = requests.post(
-                    url,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif method.upper() == 'DELETE':
-                response = requests.delete(
-                    url,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            else:
-                return {'success': False, 'error': f'Unsupported method: {method}'}
-
-            # Response ni tekshirish
-            if response.status_code in [200, 201]:
-                return response.json()
-            else:
-                return {
-                    'success': False,
-                    'error': f'HTTP {response.status_code}: {response.text}',
-                    'status_code': response.status_code
-                }
-
-        except requests.exceptions.Timeout:
-            return {'success': False, 'error': 'Request timeout'}
-        except requests.exceptions.ConnectionError:
-            return {'success': False, 'error': 'Connection error'}
-        except requests.exceptions.RequestException as e:
-            return {'success': False, 'error': f'Request exception: {str(e)}'}
-        except json.JSONDecodeError:
-            return {'success': False, 'error': 'Invalid JSON response'}
-        except Exception as e:
-            return {'success': False, 'error': f'Unexpected error: {str(e)}'}
+    PATH = "journey/locations/"
+    USER_AGENT = "LocationClient/1.0"
+    METHODS = ('GET', 'POST', 'DELETE')
 
     def create_user_location(
             self,
@@ -190,5 +133,39 @@ class LocationAPIClient:
         return result.get('total_count', 0) if result.get('success') else 0
 
 
+class AsyncLocationAPIClient(AsyncAPIClientMixin, LocationAPIClient):
+    """
+    `LocationAPIClient`ning async varianti — metodlar bir xil, natija `await`
+    qilinadi. Natijani qayta ishlaydigan metodlar async qilib qayta yozilgan.
+    """
+
+    async def get_latest_location_coordinates(self, telegram_id: int) -> Optional[Dict]:
+        result = await self.get_user_latest_location(telegram_id)
+
+        if result.get('success') and result.get('location'):
+            location_data = result['location'].get('location', {})
+            if location_data:
+                return {
+                    "lat": location_data.get('lat'),
+                    "lng": location_data.get('lng')
+                }
+        return None
+
+    async def get_user_locations_count(self, telegram_id: int) -> int:
+
+        result = await self.get_user_locations(telegram_id)
+        return result.get('total_count', 0) if result.get('success') else 0
+
+
 # Singleton instance
 location_client = LocationAPIClient()
+async_location_client = AsyncLocationAPIClient()
+
+
+def user_locations(telegram_id: int) -> Dict:
+    """Foydalanuvchi joylashuvlari — bitta update davomida API'ga bir marta so'raladi."""
+    locations = context_locations(telegram_id)
+    if locations is MISSING:
+        locations = location_client.get_user_locations(telegram_id)
+        set_context_locations(telegram_id, locations)
+    return locations
@@ -1,5 +1,6 @@
 from typing import Dict, List, Optional, Any
 from django.core.cache import cache
+from bot_app.core.context import MISSING, context_passenger, set_context_passenger
 from .api.passenger_service import passenger_client
 
 
@@ -16,6 +17,19 @@ class PassengerManager:
     def _get_cache_key(self, key: str) -> str:
         return f"passenger_{key}"
 
+    def cache_key(self, telegram_id: int) -> str:
+        """Yo'lovchi keshining Redis'dagi to'liq kaliti (prefetch pipeline uchun)."""
+        return cache.client.make_key(self._get_cache_key(str(telegram_id)))
+
+    def accept(self, raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """Pipeline'da o'qilgan xom qiymatni dekodlaydi (cache.get bilan bir xil)."""
+        return cache.client.decode(raw) if raw is not None else None
+
+    def _forget(self, telegram_id: int):
+        """Yo'lovchi keshini va joriy update kontekstidagi nusxasini tozalaydi."""
+        cache.delete(self._get_cache_key(str(telegram_id)))
+        set_context_passenger(telegram_id, MISSING)
+
     def create_passenger(
             self,
             telegram_id: int,
@@ -31,6 +45,7 @@ class PassengerManager:
             # Cache ni yangilash
             cache_key = self._get_cache_key(str(telegram_id))
             cache.set(cache_key, result, self.cache_timeout)
+            set_context_passenger(telegram_id, MISSING)
 
         return result
 
@@ -38,19 +53,35 @@ class PassengerManager:
         """
         Yo'lovchi ma'lumotlarini olish (cache bilan)
         """
-        cache_key = self._get_cache_key(str(telegram_id))
-
         if use_cache:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return cached_data
+            passenger = self.cached_passenger(telegram_id)
+            if passenger is not MISSING:
+                return passenger
 
         result = self.client.get_passenger(telegram_id)
+        self.remember_passenger(telegram_id, result, use_cache)
+        return result
 
-        if result.get('telegram_id') and use_cache:
-            cache.set(cache_key, result, self.cache_timeout)
+    def cached_passenger(self, telegram_id: int) -> Any:
+        """
+        Update kontekstidagi yoki keshdagi yo'lovchi; bo'lmasa `MISSING` — API'ga bormaydi.
+        """
+        # Shu update ichida allaqachon olingan bo'lsa — keshga ham bormaymiz
+        passenger = context_passenger(telegram_id)
+        if passenger is not MISSING:
+            return passenger
 
-        return result
+        cached_data = cache.get(self._get_cache_key(str(telegram_id)))
+        if cached_data:
+            set_context_passenger(telegram_id, cached_data)
+            return cached_data
+        return MISSING
+
+    def remember_passenger(self, telegram_id: int, result: Dict[str, Any], use_cache: bool = True):
+        """API'dan olingan yo'lovchini keshga (topilgan bo'lsa) va kontekstga yozadi."""
+        if result.get('telegram_id') and use_cache:
+            cache.set(self._get_cache_key(str(telegram_id)), result, self.cache_timeout)
+        set_context_passenger(telegram_id, result)
 
     def update_passenger(
             self,
@@ -64,8 +95,7 @@ class PassengerManager:
 
         if result.get('success'):
             # Cache larni yangilash
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
         return result
 
@@ -77,8 +107,7 @@ class PassengerManager:
 
         if result.get('success'):
             # Cache larni tozalash
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
         return result
 
@@ -112,8 +141,7 @@ class PassengerManager:
 
         if result.get('success'):
             # Cache ni yangilash
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
         return result
 
@@ -125,8 +153,7 @@ class PassengerManager:
 
         if result.get('success'):
             # Cache ni yangilash
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
         return result
 
@@ -138,8 +165,7 @@ class PassengerManager:
 
         if result.get('success'):
             # Cache ni yangilash
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
         return result
 
@@ -187,8 +213,7 @@ class PassengerManager:
         if result.get('success'):
             # Barcha cache larni tozalash
             for telegram_id in telegram_ids:
-                cache_key = self._get_cache_key(str(telegram_id))
-                cache.delete(cache_key)
+                self._forget(telegram_id)
             cache.delete("passenger_active_list")
             cache.delete("passenger_stats")
 
@@ -206,8 +231,7 @@ class PassengerManager:
         Cache ni tozalash
         """
         if telegram_id:
-            cache_key = self._get_cache_key(str(telegram_id))
-            cache.delete(cache_key)
+            self._forget(telegram_id)
 
 
 # Singleton instance
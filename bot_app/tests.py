@@ -1,3 +1,450 @@
-from django.test import TestCase
+import concurrent.futures
+import socket
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+from unittest import skipIf
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from telebot.apihelper import ApiTelegramException
+
+from bot_app.core.dedupe import UpdateDeduplicator
+from bot_app.core.state_storage import StateRecord
+from bot_app.core.state_unit import StateUnit
+from bot_app.functions.dispatcher import MessageDispatcher, OutboundJob, SharedTokenBucket
+from bot_app.functions.outbound_store import RedisStreamStore
+from bot_app.functions.trip_screen import TripScreens
+from bot_app.middlewares.state_middleware import UnitOfWorkStateMiddleware
+from bot_app.models import TelegramUser
+from bot_app.repo.user_service import BotUserService
+from bot_app.services.api.aio import AsyncAPITransport
+from bot_app.services.api.transport import APITransport, CircuitBreaker, api_transport
+from msg_app.catalogue import catalogue
+from msg_app.models import BotMessage
+
+try:
+    import fakeredis
+except ImportError:  # ixtiyoriy: Redis'ga bog'liq testlar o'tkazib yuboriladi
+    fakeredis = None
+
+KEY = "state:1:100:100"
+
+
+def fake_redis(cls):
+    """Test klassi `default` cache/Redis o'rniga fakeredis bilan ishlaydi (har testdan oldin tozalanadi)."""
+    caches = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://fakeredis:6379/0",
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "CONNECTION_POOL_KWARGS": {"connection_class": getattr(fakeredis, "FakeConnection", None)},
+            },
+        }
+    }
+    set_up = cls.setUp
+
+    def setUp(self):
+        from django_redis import get_redis_connection
+        get_redis_connection("default").flushall()
+        set_up(self)
+
+    cls.setUp = setUp
+    return skipIf(fakeredis is None, "fakeredis o'rnatilmagan")(override_settings(CACHES=caches)(cls))
+
+
+class MemoryCASStorage:
+    """
+    `RedisStateStorage`ning CAS qismi xotirada: `COMPARE_AND_SET_LUA` bilan
+    bir xil qoida — rev mos kelmasa yozmaydi va joriy yozuvni qaytaradi.
+    Yozuvlar kodlangan holda saqlanadi, unit'lar bir-birining obyektini ko'rmaydi.
+    """
+
+    def __init__(self):
+        self.raw: Dict[str, bytes] = {}
+
+    def key_for(self, update, bot_id: int) -> str:
+        return KEY
+
+    def load(self, key: str) -> Optional[StateRecord]:
+        return StateRecord.decode(self.raw.get(key))
+
+    def compare_and_set(self, key: str, expected_rev: int, record: Optional[StateRecord]):
+        current = self.load(key)
+        if (current.rev if current else 0) != expected_rev:
+            return False, current
+        if record is None:
+            self.raw.pop(key, None)
+        else:
+            self.raw[key] = record.encode()
+        return True, record
+
+    def put(self, state: Optional[str], data: dict, rev: int = 1):
+        self.raw[KEY] = StateRecord(state, data, rev).encode()
+
+
+class StateUnitMergeTests(SimpleTestCase):
+    """Bir suhbatga ikki worker parallel yozganda `StateUnit.commit` birlashtirish qoidalari."""
+
+    def setUp(self):
+        self.storage = MemoryCASStorage()
+        self.bot = SimpleNamespace(bot_id=1, current_states=self.storage)
+        self.storage.put("menu", {"lang": "uz"})
+
+    def unit(self) -> StateUnit:
+        unit = StateUnit(SimpleNamespace(), self.bot)
+        unit.get()   # holatni yuklaydi — ikkala unit bir xil rev'ni ko'radi
+        return unit
+
+    def stored(self) -> Optional[StateRecord]:
+        return self.storage.load(KEY)
+
+    def test_add_data_merges_onto_concurrent_set(self):
+        first, second = self.unit(), self.unit()
+        first.set("trip")
+        self.assertTrue(first.commit())
+
+        second.add_data(phone="+998901234567")
+        self.assertTrue(second.commit())
+
+        record = self.stored()
+        self.assertEqual(record.state, "trip")
+        self.assertEqual(record.data, {"lang": "uz", "phone": "+998901234567"})
+        self.assertEqual(record.rev, 3)
+
+    def test_set_keeps_concurrent_add_data(self):
+        first, second = self.unit(), self.unit()
+        first.add_data(phone="+998901234567")
+        self.assertTrue(first.commit())
+
+        second.set("trip")
+        self.assertTrue(second.commit())
+
+        record = self.stored()
+        self.assertEqual(record.state, "trip")
+        self.assertEqual(record.data, {"lang": "uz", "phone": "+998901234567"})
+
+    def test_reset_data_then_add_data_drops_concurrent_keys(self):
+        first, second = self.unit(), self.unit()
+        first.add_data(draft="stale")
+        self.assertTrue(first.commit())
+
+        second.reset_data()
+        second.add_data(step=1)
+        self.assertTrue(second.commit())
+
+        record = self.stored()
+        self.assertEqual(record.state, "menu")
+        self.assertEqual(record.data, {"step": 1})
+
+    def test_data_write_does_not_resurrect_deleted_state(self):
+        first, second = self.unit(), self.unit()
+        self.assertTrue(first.delete())
+        self.assertTrue(first.commit())
+
+        second.add_data(step=1)
+        self.assertTrue(second.commit())
+
+        self.assertIsNone(self.stored())
+
+    def test_delete_wins_over_earlier_data_write(self):
+        first, second = self.unit(), self.unit()
+        first.add_data(step=1)
+        self.assertTrue(first.commit())
+
+        second.delete()
+        self.assertTrue(second.commit())
+
+        self.assertIsNone(self.stored())
+
+    def test_data_scope_changes_are_merged(self):
+        first, second = self.unit(), self.unit()
+        first.add_data(step=1)
+        self.assertTrue(first.commit())
+
+        with second.data() as data:
+            data.pop("lang")
+            data["seats"] = 2
+        self.assertTrue(second.commit())
+
+        self.assertEqual(self.stored().data, {"step": 1, "seats": 2})
+
+    def test_clean_unit_does_not_write(self):
+        unit = self.unit()
+        self.storage.raw.clear()
+        self.assertTrue(unit.commit())
+        self.assertIsNone(self.stored())
+
+
+class UnitOfWorkStateMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.storage = MemoryCASStorage()
+        self.storage.put("menu", {"lang": "uz"})
+        self.middleware = UnitOfWorkStateMiddleware(SimpleNamespace(bot_id=1, current_states=self.storage))
+
+    def handle(self, exception=None) -> dict:
+        data = {}
+        self.middleware.pre_process(SimpleNamespace(), data)
+        data["state"].set("trip")
+        data["state"].add_data(step=1)
+        self.middleware.post_process(SimpleNamespace(), data, exception)
+        return data
+
+    def test_handler_exception_discards_changes(self):
+        with self.assertLogs("bot_app.middlewares.state_middleware", "WARNING"):
+            self.handle(ValueError("handler"))
+
+        record = self.storage.load(KEY)
+        self.assertEqual((record.state, record.data, record.rev), ("menu", {"lang": "uz"}, 1))
+
+    def test_successful_handler_commits_once(self):
+        self.handle()
+
+        record = self.storage.load(KEY)
+        self.assertEqual((record.state, record.data, record.rev), ("trip", {"lang": "uz", "step": 1}, 2))
+
+
+@fake_redis
+class TripScreensTests(TestCase):
+
+    def setUp(self):
+        BotMessage.objects.create(
+            slug="trip_details", msg={"uz": "{passenger} {travel_class} {has_woman} {loc_begin}-{loc_end} {price}"}
+        )
+        BotMessage.objects.create(slug="economy", msg={"uz": "Ekonom"})
+        BotMessage.objects.create(slug="business", msg={"uz": "Biznes"})
+        catalogue.bump()
+        self.screens = TripScreens()
+
+    def test_known_class(self):
+        text, _markup = self.screens.render("uz", 2, "business", True, loc_begin="A", loc_end="B", price=100)
+        self.assertEqual(text, "2 Biznes ✅ A-B 100")
+
+    def test_unknown_class_falls_back_to_default(self):
+        # callback_data mijozdan keladi: "class:<ixtiyoriy>" KeyError bermasin
+        self.assertIs(self.screens.get("uz", 1, "platinum", False), self.screens.get("uz", 1, "economy", False))
+        text, _markup = self.screens.render("uz", 3, "", False, loc_begin="A", loc_end="B", price=100)
+        self.assertEqual(text, "3+ Ekonom ❌ A-B 100")
+
+
+class FakeTelegramBot:
+    """Dispatcher uchun Bot API o'rinbosari: yuborilganlarni yozib boradi, kerak bo'lsa xato beradi."""
+
+    def __init__(self, errors=()):
+        self.sent = []
+        self.errors = list(errors)
+
+    def send_message(self, chat_id, text, reply_markup=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+
+def wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@fake_redis
+class DispatcherTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = RedisStreamStore(partitions=1)
+        self.store.ensure_groups()
+        self.dispatchers = []
+
+    def tearDown(self):
+        for dispatcher in self.dispatchers:
+            dispatcher.shutdown(timeout=2)
+
+    def dispatcher(self, bot) -> MessageDispatcher:
+        dispatcher = MessageDispatcher(bot=bot, store=self.store, name=f"test{len(self.dispatchers)}")
+        self.dispatchers.append(dispatcher)
+        return dispatcher
+
+    def job(self, text: str) -> dict:
+        return OutboundJob("send", 7, text=text).to_dict()
+
+    def test_recovers_pending_entries_of_a_dead_consumer_in_order(self):
+        self.store.add_many([self.job(f"m{i}") for i in range(5)])
+        # Worker o'qidi va ACK qilmasdan o'ldi; lease'i yo'q — partition bo'sh
+        self.assertEqual(len(self.store.read("dead:1", [0], 10, 0)), 5)
+        self.store.add_many([self.job("m5")])
+
+        bot = FakeTelegramBot()
+        self.dispatcher(bot)
+
+        self.assertTrue(wait_until(lambda: len(bot.sent) == 6))
+        self.assertEqual([text for _, text in bot.sent], [f"m{i}" for i in range(6)])
+        self.assertTrue(wait_until(lambda: self.store.conn.xpending(self.store.stream(0), "outbound")["pending"] == 0))
+
+    def test_recovered_entry_already_delivered_is_not_sent_again(self):
+        job = self.job("once")
+        self.store.add_many([job])
+        self.store.read("dead:1", [0], 10, 0)
+        # Oldingi worker yuborgan, lekin ACK qilishga ulgurmagan
+        self.store.conn.set(f"{RedisStreamStore.DONE_PREFIX}{job['dedupe_key']}", 1)
+
+        bot = FakeTelegramBot()
+        self.dispatcher(bot)
+
+        self.assertTrue(wait_until(
+            lambda: self.store.conn.xpending(self.store.stream(0), "outbound")["pending"] == 0
+        ))
+        self.assertEqual(bot.sent, [])
+
+    def test_poison_entry_is_acked_and_dropped(self):
+        self.store.conn.xadd(self.store.stream(0), {"job": b"{not json"})
+        self.store.add_many([self.job("after")])
+
+        bot = FakeTelegramBot()
+        with self.assertLogs("bot_app.functions.dispatcher", "ERROR"):
+            self.dispatcher(bot)
+            self.assertTrue(wait_until(lambda: bot.sent == [(7, "after")]))
+        self.assertTrue(wait_until(lambda: self.store.conn.xlen(self.store.stream(0)) == 0))
+
+    def test_429_pauses_chat_and_shared_global_bucket(self):
+        retry_after = 1
+        error = ApiTelegramException("sendMessage", None, {
+            "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": retry_after},
+        })
+        bot = FakeTelegramBot(errors=[error])
+        dispatcher = self.dispatcher(bot)
+        other_worker = SharedTokenBucket(dispatcher.global_bucket.key, rate=30, capacity=30)
+
+        started_at = time.monotonic()
+        result, _shown_id = dispatcher._deliver(OutboundJob("send", 7, text="hi"))
+        elapsed = time.monotonic() - started_at
+
+        self.assertIsNotNone(result)
+        self.assertEqual(bot.sent, [(7, "hi")])
+        self.assertGreaterEqual(elapsed, retry_after * 0.9)
+        # Pauza Redis'da — boshqa worker ham kutadi
+        other_worker.pause(retry_after)
+        self.assertGreater(other_worker.reserve(), retry_after * 0.9)
+
+
+@fake_redis
+class UpdateDeduplicatorTests(SimpleTestCase):
+
+    def test_seen_forget_round_trip(self):
+        dedupe = UpdateDeduplicator()
+        self.assertFalse(dedupe.seen(70_001))
+        self.assertTrue(dedupe.seen(70_001))
+        self.assertFalse(dedupe.seen(70_002))
+
+        dedupe.forget(70_001)
+        self.assertFalse(dedupe.seen(70_001))
+        self.assertEqual(dedupe.total_hits(), 1)
+
+    def test_extract_update_id(self):
+        self.assertEqual(UpdateDeduplicator.extract_update_id(b'{"update_id": 42, "message": {}}'), 42)
+        self.assertIsNone(UpdateDeduplicator.extract_update_id(b'{"message": {}}'))
+
+
+@fake_redis
+class UserUpsertTests(TestCase):
+
+    def telegram_user(self, full_name: str = "Ali Valiyev", username: str = "ali"):
+        return SimpleNamespace(id=555, full_name=full_name, username=username)
+
+    def test_creates_missing_user(self):
+        user = BotUserService.upsert(self.telegram_user())
+
+        row = TelegramUser.objects.get(tg_id=555)
+        self.assertEqual((user.tg_id, user.full_name, user.username), (555, "Ali Valiyev", "ali"))
+        self.assertEqual(row.full_name, "Ali Valiyev")
+
+    def test_unchanged_user_is_not_rewritten(self):
+        BotUserService.upsert(self.telegram_user())
+        updated_at = TelegramUser.objects.get(tg_id=555).updated_at
+
+        # RETURNING bo'sh (WHERE o'zgargan) — yozuv SELECT bilan olinadi
+        with self.assertNumQueries(2):
+            user = BotUserService.upsert(self.telegram_user())
+
+        self.assertEqual(user.full_name, "Ali Valiyev")
+        self.assertEqual(TelegramUser.objects.get(tg_id=555).updated_at, updated_at)
+
+    def test_changed_user_is_updated_in_one_statement(self):
+        BotUserService.upsert(self.telegram_user())
+
+        with self.assertNumQueries(1):
+            user = BotUserService.upsert(self.telegram_user(full_name="Ali V.", username=None))
+
+        row = TelegramUser.objects.get(tg_id=555)
+        self.assertEqual((user.full_name, user.username), ("Ali V.", None))
+        self.assertEqual((row.full_name, row.username), ("Ali V.", None))
+        self.assertEqual(TelegramUser.objects.count(), 1)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def open_breaker(self) -> CircuitBreaker:
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.record_failure())
+        return breaker
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = self.open_breaker()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())    # sinov so'rovi
+        self.assertFalse(breaker.allow())   # sinov davomida boshqalari rad etiladi
+
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.allow())
+
+    def test_sync_probe_with_unexpected_error_is_released(self):
+        transport = APITransport()
+        url = "http://breaker.test/api/"
+        breaker = transport.breaker(url)
+        breaker.reset_timeout = 0
+        for _ in range(breaker.threshold):
+            breaker.record_failure()
+
+        def boom(*args, **kwargs):
+            raise RuntimeError("kutilmagan")
+
+        transport.session.request = boom
+        with self.assertRaises(RuntimeError):
+            transport.request("GET", url)
+        self.assertTrue(breaker.allow())   # keyingi so'rov yana sinov bo'la oladi
+
+    def test_cancelled_async_probe_is_released(self):
+        # Ulanishni qabul qiladi, lekin javob bermaydi — so'rov run() timeout'igacha osilib turadi
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        self.addCleanup(server.close)
+        url = f"http://127.0.0.1:{server.getsockname()[1]}/api/"
+
+        transport = AsyncAPITransport(read_timeout=5, max_retries=0)
+        self.addCleanup(transport.shutdown)
+        breaker = api_transport.breaker(url)   # sinxron transport bilan umumiy
+        breaker.reset_timeout = 0
+        for _ in range(breaker.threshold):
+            breaker.record_failure()
+
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            transport.run(transport.request("GET", url), timeout=0.2)
+        self.assertTrue(wait_until(lambda: not breaker._probing, timeout=2))
+        self.assertTrue(breaker.is_open)
+        self.assertTrue(breaker.allow())
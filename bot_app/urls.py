@@ -8,4 +8,5 @@ urlpatterns = [
     path("webhook/deploy/", views.telegram_passenger_bot),
     path("set_web/", views.set_web),
     path("set_web/deploy/", views.set_deploy),
+    path("metrics/", views.bot_metrics),
 ]
\ No newline at end of file
@@ -1,16 +1,23 @@
-from django.http import JsonResponse
+import hmac
+
+from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from telebot.types import Update
 
 from django.conf import settings
 
 from bot_app.core.loader import bot
+from bot_app.core.dedupe import deduplicator
+from bot_app.core.ingest import ingestor
+from bot_app.core.metrics import metrics
+from bot_app.repo.user_cache import user_cache
 import logging
+from contextvars import Context
 
 from .handlers import *
 
 from bot_app.middlewares.user_middleware import UserMiddleware
-bot.setup_middleware(UserMiddleware(flood_limit=0.87))
+bot.setup_middleware(UserMiddleware(bot))
 logger = logging.getLogger(__name__)
 
 
@@ -18,15 +25,67 @@ logger = logging.getLogger(__name__)
 @csrf_exempt
 def telegram_passenger_bot(request):
 
+    # Telegram retry qilgan update'ni JSON parse qilmasdan tashlaymiz
+    update_id = deduplicator.extract_update_id(request.body)
+    if update_id is not None and deduplicator.seen(update_id):
+        return JsonResponse({"status": "duplicate"})
+
+    if getattr(settings, "WEBHOOK_MODE", "queue") == "queue":
+        response = _enqueue_update(request)
+    else:
+        response = _process_update(request)
+
+    if update_id is not None and response.status_code >= 500:
+        deduplicator.forget(update_id)
+    return response
+
+
+def _process_update(request):
     try:
         update = Update.de_json(request.body.decode())
-        bot.process_new_updates([update])
+        Context().run(bot.process_new_updates, [update])
         return JsonResponse({"status": "ok"})
     except Exception as e:
         logger.exception("Passenger bot error: %s", e)
         return JsonResponse({"status": "error", "detail": str(e)}, status=500)
 
 
+def _enqueue_update(request):
+    """
+    Update'ni tekshirib navbatga qo'yadi va darhol 200 qaytaradi.
+    Navbat to'la bo'lsa 503 — Telegram update'ni keyinroq qayta yuboradi.
+    """
+    try:
+        accepted = ingestor.accept(request.body)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "detail": str(e)}, status=400)
+
+    if not accepted:
+        return JsonResponse({"status": "busy"}, status=503)
+    return JsonResponse({"status": "ok"})
+
+
+def _metrics_allowed(request) -> bool:
+    """Staff foydalanuvchi yoki `Authorization: Bearer <METRICS_TOKEN>`."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+
+
+def bot_metrics(request):
+    # Ichki ko'rsatkichlar ochiq emas — ruxsatsiz so'rovga endpoint yo'qdek 404
+    if not _metrics_allowed(request):
+        raise Http404
+    snapshot = metrics.snapshot()
+    snapshot["dedupe_hits_total"] = deduplicator.total_hits()
+    snapshot["user_cache_hit_ratio"] = user_cache.hit_ratios()
+    return JsonResponse(snapshot)
+
+
 @csrf_exempt
 def set_web(request):
 
@@ -0,0 +1,145 @@
+import logging
+import time
+from threading import Lock
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from msg_app.template import CompiledTemplate, TemplateError
+
+logger = logging.getLogger(__name__)
+
+# ================= GLOBAL SETTINGS ================= #
+CHECK_INTERVAL = getattr(settings, "MSG_CATALOGUE_CHECK_INTERVAL", 1.0)  # sekund
+
+
+class CatalogueSnapshot:
+    """
+    BotMessage jadvalining o'zgarmas (immutable) nusxasi: lang -> slug -> kompilyatsiya
+    qilingan shablon va teskari indeks lang -> matn -> slug (tugma matnidan slug topish uchun).
+    Bitta snapshot hech qachon o'zgartirilmaydi — yangilanishda butunlay almashtiriladi,
+    shuning uchun thread'lar uni lock'siz o'qiydi.
+    """
+    __slots__ = ("version", "templates", "slugs")
+
+    def __init__(self, version: int, rows):
+        self.version = version
+        templates = {lang: {} for lang in settings.BOT_LANGUAGE}
+        slugs = {lang: {} for lang in settings.BOT_LANGUAGE}
+        for slug, msg in rows:
+            for lang, text in (msg or {}).items():
+                if text:
+                    templates.setdefault(lang, {})[slug] = self._compile(text, f"{slug}:{lang}")
+                    # Bir xil matnli slug'lar — birinchisi (eng kichik id), avvalgi `.first()` kabi
+                    slugs.setdefault(lang, {}).setdefault(text, slug)
+        self.templates: Mapping[str, Mapping[str, CompiledTemplate]] = self._freeze(templates)
+        self.slugs: Mapping[str, Mapping[str, str]] = self._freeze(slugs)
+
+    @staticmethod
+    def _compile(text: str, name: str) -> CompiledTemplate:
+        try:
+            return CompiledTemplate.compile(text, name)
+        except TemplateError as e:
+            # set_message buni yuklashdan oldin to'xtatadi; admin'dan kelgan xato matn — o'zgarishsiz
+            logger.error("Noto'g'ri shablon: %s", e)
+            return CompiledTemplate.literal(text, name)
+
+    @staticmethod
+    def _freeze(index: dict) -> Mapping[str, Mapping]:
+        return MappingProxyType({lang: MappingProxyType(items) for lang, items in index.items()})
+
+    def template(self, lang: str, slug: str) -> Optional[CompiledTemplate]:
+        items = self.templates.get(lang)
+        return items.get(slug) if items is not None else None
+
+    def get(self, lang: str, slug: str) -> Optional[str]:
+        template = self.template(lang, slug)
+        return template.text if template is not None else None
+
+    def slug_for(self, lang: str, text: str) -> Optional[str]:
+        items = self.slugs.get(lang)
+        return items.get(text) if items is not None else None
+
+
+class MessageCatalogue:
+    """
+    Jarayon ichidagi BotMessage katalogi.
+
+    Butun jadval bitta so'rov bilan yuklanadi, keyingi `get` — oddiy dict
+    murojaati (Redis/DB'ga bormaydi). Yangilik Redis'dagi bitta versiya
+    hisoblagichi orqali: `bump` (signal, set_message) uni oshiradi, har bir
+    jarayon esa ko'pi bilan `CHECK_INTERVAL` da bir marta tekshirib, versiya
+    o'zgargan bo'lsa katalogni qayta yuklaydi.
+    """
+    VERSION_KEY = "msg:catalogue:version"
+
+    def __init__(self, alias: str = "default", check_interval: float = CHECK_INTERVAL):
+        self.alias = alias
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = Lock()
+
+    def current(self) -> CatalogueSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if not self.due():
+                return self._snapshot
+            return self._refresh(self._remote_version())
+
+    def due(self) -> bool:
+        """Versiyani Redis'dan qayta tekshirish vaqti keldimi."""
+        return self._snapshot is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def observe(self, raw_version):
+        """Boshqa joyda (masalan, prefetch pipeline'ida) o'qilgan versiya bilan yangilash."""
+        with self._lock:
+            self._refresh(int(raw_version or 0))
+
+    def get(self, lang: str, slug: str) -> Optional[str]:
+        return self.current().get(lang, slug)
+
+    def template(self, lang: str, slug: str) -> Optional[CompiledTemplate]:
+        return self.current().template(lang, slug)
+
+    def slug_for(self, lang: str, text: str) -> Optional[str]:
+        return self.current().slug_for(lang, text)
+
+    def bump(self):
+        """Katalog o'zgardi — barcha jarayonlar keyingi tekshiruvda qayta yuklaydi."""
+        try:
+            get_redis_connection(self.alias).incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.warning("Katalog versiyasini oshirib bo'lmadi: %s", e)
+        self._checked_at = 0.0
+
+    def _remote_version(self) -> Optional[int]:
+        try:
+            return int(get_redis_connection(self.alias).get(self.VERSION_KEY) or 0)
+        except Exception as e:
+            # Redis ishlamasa — mavjud katalog bilan davom etamiz
+            logger.warning("Katalog versiyasini o'qib bo'lmadi: %s", e)
+            return None
+
+    def _refresh(self, version: Optional[int]) -> CatalogueSnapshot:
+        if self._snapshot is None or (version is not None and version != self._snapshot.version):
+            self._snapshot = self._load(version or 0)
+        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    @staticmethod
+    def _load(version: int) -> CatalogueSnapshot:
+        from msg_app.models import BotMessage
+
+        snapshot = CatalogueSnapshot(version, BotMessage.objects.order_by("id").values_list("slug", "msg"))
+        logger.info("BotMessage katalogi yuklandi: v%s", version)
+        return snapshot
+
+
+# Singleton instance
+catalogue = MessageCatalogue()
@@ -0,0 +1,84 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from bot_app.core.metrics import percentiles
+from msg_app.catalogue import catalogue
+from msg_app.models import BotMessage
+
+
+def legacy_get_txt(lang: str, slug: str) -> str:
+    """Oldingi BotMessage.get_txt: har bir slug uchun Redis GET, miss'da DB."""
+    cache_key = f"msg:{slug}:{lang}"
+    text = cache.get(cache_key)
+    if not text:
+        msg_obj = BotMessage.objects.only("msg").filter(slug=slug).first()
+        if not msg_obj:
+            return slug
+        text = msg_obj.msg.get(lang) or slug
+        cache.set(cache_key, text, timeout=settings.CACHE_TIMEOUT)
+    return text
+
+
+class Command(BaseCommand):
+    help = "BotMessage matn olish: Redis/DB (eski) va jarayon ichidagi katalog."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--renders", type=int, default=2000)
+        parser.add_argument("--slugs-per-render", type=int, default=10, help="trip_details ekrani ~10 slug")
+
+    def handle(self, *args, **options):
+        slugs = list(BotMessage.objects.values_list("slug", flat=True))
+        if not slugs:
+            self.stdout.write(self.style.ERROR("❌ BotMessage bo'sh — avval set_message"))
+            return
+
+        per_render = options["slugs_per_render"]
+        langs = settings.BOT_LANGUAGE
+        renders = [
+            (langs[i % len(langs)], [slugs[(i + j) % len(slugs)] for j in range(per_render)])
+            for i in range(options["renders"])
+        ]
+
+        for label, lookup in (("redis/db", legacy_get_txt), ("catalogue", catalogue.get)):
+            for lang, render_slugs in renders[:50]:  # isitish (cache/katalog to'ladi)
+                for slug in render_slugs:
+                    lookup(lang, slug)
+
+            samples = []
+            started_at = time.perf_counter()
+            for lang, render_slugs in renders:
+                start = time.perf_counter()
+                for slug in render_slugs:
+                    lookup(lang, slug)
+                samples.append(time.perf_counter() - start)
+            total = time.perf_counter() - started_at
+
+            self.stdout.write(
+                f"{label:<10} {len(renders)} render x {per_render} slug: "
+                f"{total * 1000:.1f} ms, per render {percentiles(samples)}"
+            )
+
+        # Shablon to'ldirish: har safar str.format va kompilyatsiya qilingan shablon
+        # (ikkalasi ham format satrini parse qiladi — natija deyarli teng bo'lishi kutiladi)
+        templates = [
+            template
+            for lang in langs
+            for template in catalogue.current().templates[lang].values()
+            if template.required
+        ]
+        if not templates:
+            return
+        values = {field: 12_000 for template in templates for field in template.required}
+        for label, render in (
+                ("str.format", lambda template: template.text.format(**values)),
+                ("compiled", lambda template: template.render_map(values)),
+        ):
+            started_at = time.perf_counter()
+            for i in range(options["renders"] * per_render):
+                render(templates[i % len(templates)])
+            total = time.perf_counter() - started_at
+            self.stdout.write(f"{label:<10} {options['renders'] * per_render} shablon: {total * 1000:.1f} ms")
@@ -1,7 +1,10 @@
 import json
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from msg_app.catalogue import catalogue
 from msg_app.models import BotMessage
-from django.core.cache import cache
+from msg_app.template import CompiledTemplate, TemplateError
 from pathlib import Path
 
 
@@ -9,6 +12,7 @@ class Command(BaseCommand):
     help = "language.json faylidagi xabarlarni Message modeliga yuklaydi yoki yangilaydi."
 
     def handle(self, *args, **options):
+        started_at = time.perf_counter()
         data_path = Path(__file__).resolve().parent.parent.parent / "data" / "language.json"
 
         if not data_path.exists():
@@ -18,20 +22,39 @@ class Command(BaseCommand):
         with open(data_path, "r", encoding="utf-8") as f:
             messages = json.load(f)
 
-        added, updated = 0, 0
-
+        # Noto'g'ri shablonlar bazaga yozilmaydi — konteyner start'ida darhol ko'rinadi
+        errors = []
         for slug, msg_data in messages.items():
-            obj, created = BotMessage.objects.update_or_create(
-                slug=slug, defaults={"msg": msg_data}
-            )
-            for lang in ["uz", "en", "ru"]:
-                cache.delete(f"msg:{slug}:{lang}")  # eski cache ni tozalash
-
-            if created:
-                added += 1
-            else:
-                updated += 1
+            for lang, text in msg_data.items():
+                try:
+                    CompiledTemplate.compile(text, f"{slug}:{lang}")
+                except TemplateError as e:
+                    errors.append(str(e))
+        if errors:
+            raise CommandError("Noto'g'ri shablonlar:\n" + "\n".join(errors))
+
+        # Faqat yangi va o'zgargan slug'lar — bitta so'rov bilan solishtiriladi
+        existing = dict(BotMessage.objects.values_list("slug", "msg"))
+        changed = [
+            BotMessage(slug=slug, msg=msg_data)
+            for slug, msg_data in messages.items()
+            if existing.get(slug) != msg_data
+        ]
+        added = sum(1 for obj in changed if obj.slug not in existing)
+        updated = len(changed) - added
+
+        if changed:
+            # Bitta INSERT ... ON CONFLICT (slug) DO UPDATE; signal yubormaydi — bitta versiya oshiriladi
+            with transaction.atomic():
+                BotMessage.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=["slug"],
+                    update_fields=["msg"],
+                )
+                transaction.on_commit(catalogue.bump)  # barcha jarayonlar katalogni qayta yuklaydi
 
         self.stdout.write(self.style.SUCCESS(
-            f"✅ Yuklash tugadi. Yangi: {added}, Yangilangan: {updated}"
+            f"✅ Yuklash tugadi. Yangi: {added}, Yangilangan: {updated}, "
+            f"O'zgarishsiz: {len(messages) - len(changed)} ({(time.perf_counter() - started_at) * 1000:.0f} ms)"
         ))
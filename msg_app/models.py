@@ -1,7 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.core.cache import cache
 
-from django.conf import settings
+from msg_app.catalogue import catalogue
+from msg_app.template import CompiledTemplate, TemplateError
 
 
 class BotMessage(models.Model):
@@ -18,31 +19,25 @@ class BotMessage(models.Model):
     def __str__(self):
         return self.slug
 
+    def clean(self):
+        # Admin'da noto'g'ri shablon saqlanmasin
+        for lang, text in (self.msg or {}).items():
+            try:
+                CompiledTemplate.compile(text or "", f"{self.slug}:{lang}")
+            except TemplateError as e:
+                raise ValidationError({"msg": str(e)})
+
     @classmethod
     def get_txt(cls, lang: str, slug: str, **kwargs) -> str:
-        cache_key = f"msg:{slug}:{lang}"
-        text = cache.get(cache_key)
-        if not text:
-            msg_obj = cls.objects.only("msg").filter(slug=slug).first()
-            if not msg_obj:
-                return slug
-
-            text = msg_obj.msg.get(lang) or slug
-            cache.set(cache_key, text, timeout=settings.CACHE_TIMEOUT)
-        return text.format(**kwargs) if kwargs else text
+        template = catalogue.template(lang, slug)
+        if template is None:
+            return slug
+        return template.render_map(kwargs) if kwargs else template.text
 
     @classmethod
     def get_slug(cls, lang: str, text: str) -> str | None:
         """
         Berilgan lang va text asosida mos slugni topadi.
+        Katalogdagi teskari indeksdan — noma'lum matn uchun ham DB'ga bormaydi.
         """
-        cache_key = f"msg:slug:{lang}:{text}"
-        slug = cache.get(cache_key)
-        if slug:
-            return slug
-
-        msg_obj = cls.objects.filter(**{f"msg__{lang}": text}).only("slug").first()
-        if msg_obj:
-            cache.set(cache_key, msg_obj.slug, timeout=settings.CACHE_TIMEOUT)
-            return msg_obj.slug
-        return None
+        return catalogue.slug_for(lang, text)
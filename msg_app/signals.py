@@ -1,20 +1,21 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
+
+from .catalogue import catalogue
 from .models import BotMessage
 
 
-def clear_passenger_msg_cache(instance: BotMessage):
-    for lang in ["uz", "en", "ru"]:
-        cache_key = f"msg:{instance.slug}:{lang}"
-        cache.delete(cache_key)
+def bump_catalogue_version():
+    # Tranzaksiya commit bo'lgandan keyin — boshqa jarayonlar eski ma'lumotni yangi versiya bilan yuklamasin
+    transaction.on_commit(catalogue.bump)
 
 
 @receiver(post_save, sender=BotMessage)
 def passenger_message_saved(sender, instance, **kwargs):
-    clear_passenger_msg_cache(instance)
+    bump_catalogue_version()
 
 
 @receiver(post_delete, sender=BotMessage)
 def passenger_message_deleted(sender, instance, **kwargs):
-    clear_passenger_msg_cache(instance)
+    bump_catalogue_version()
@@ -14,7 +14,15 @@ DEPLOY_URL = "ridenowpassenger-production.up.railway.app"
 
 API_HOST = "https://ridemain-production.up.railway.app"
 API_VERSION = "api/v1"
-API_TIMEOUT = 3600  # sekund
+# ridemain API: host bo'yicha keep-alive pool, retry va circuit breaker (services/api/transport.py)
+API_POOL_SIZE = 16
+API_CONNECT_TIMEOUT = 3.05  # sekund
+API_READ_TIMEOUT = 10       # sekund
+API_MAX_RETRIES = 2         # faqat idempotent metodlar (ulanish xatosidan tashqari)
+API_BREAKER_THRESHOLD = 5   # ketma-ket xatolar
+API_BREAKER_RESET = 30      # sekund
+API_ASYNC_CONCURRENCY = 32  # async client'lar (aiohttp): jarayon bo'yicha bir vaqtdagi so'rovlar
+API_PREFETCH_TIMEOUT = 15   # sekund — handler parallel so'rovlarni shundan ortiq kutmaydi
 
 ALLOWED_HOSTS = [
     DEPLOY_URL,
@@ -150,3 +158,45 @@ CACHES = {
     }
 }
 
+# Webhook: "queue" — update navbatga qo'yiladi va darhol 200 qaytadi,
+# "inline" — update so'rov ichida qayta ishlanadi (eski rejim)
+WEBHOOK_MODE = "queue"
+WEBHOOK_WORKERS = 8
+WEBHOOK_QUEUE_SIZE = 1000
+WEBHOOK_DRAIN_TIMEOUT = 25  # sekund, gunicorn graceful_timeout'dan kichik
+
+# /bot/metrics/ — faqat staff yoki shu token bilan (Authorization: Bearer <token>); None — faqat staff
+METRICS_TOKEN = None
+
+# Telegram'ga chiquvchi xabarlar dispatcher'i
+OUTBOUND_SHARDS = 8
+OUTBOUND_QUEUE_SIZE = 3000
+OUTBOUND_MAX_RETRIES = 4
+# "redis" — doimiy navbat (Redis Streams), "local" — jarayon ichida (restart'da yo'qoladi)
+OUTBOUND_STORE = "redis"
+OUTBOUND_PARTITIONS = 16   # chat_id bo'yicha stream'lar; har birini bir vaqtda bitta worker o'qiydi
+TELEGRAM_GLOBAL_RATE = 30  # xabar/sekund, butun bot bo'yicha
+TELEGRAM_CHAT_RATE = 1     # xabar/sekund, bitta chat
+TELEGRAM_CHAT_BURST = 3    # chatga ketma-ket ruxsat etilgan xabarlar
+
+# Bot API HTTP ulanishlari (bitta keep-alive pool)
+TELEGRAM_HTTP_POOL_SIZE = 32     # OUTBOUND_SHARDS + WEBHOOK_WORKERS dan katta bo'lsin
+TELEGRAM_CONNECT_TIMEOUT = 3.05  # sekund
+TELEGRAM_READ_TIMEOUT = 10       # sekund
+
+# Suhbat holatlari (telebot states): "redis" — worker'lar uchun umumiy, "memory" — jarayon ichida
+STATE_STORAGE = "redis"
+STATE_TTL = 60 * 60 * 24  # sekund — tugallanmagan suhbat shundan keyin o'chadi
+
+# TelegramUser keshi: jarayon ichidagi LRU (Redis oldida)
+USER_CACHE_LOCAL_SIZE = 5000
+USER_CACHE_LOCAL_TTL = 30  # sekund — pub/sub uzilganda ham eskirish chegarasi
+# Profil o'zgarishlari (ism, username, til) bazaga write-behind bilan yoziladi
+USER_WRITE_BEHIND_INTERVAL = 1.0  # sekund
+USER_WRITE_BEHIND_MAX_BATCH = 500
+
+# Flood nazorati (token bucket): update turi -> (burst, sekundiga to'ldirish)
+FLOOD_LIMITS = {
+    "message": (3, 1.0),
+    "callback_query": (5, 2.0),
+}